@@ -3,7 +3,10 @@ import os
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH, FONT_SIZE
 from .input_box import InputBox
 from ui.button import Button
-from .register_screen import RegisterScreen
+from .register_screen import RegisterScreen, REGISTER_DONE
+from managers.password_hasher import password_hasher
+
+LOGIN_DONE = pygame.USEREVENT + 3  # Posted by the auth thread when a login attempt finishes
 
 
 class LoginScreen:
@@ -71,6 +74,7 @@ class LoginScreen:
         self.status_message = ""
         self.status_color = pygame.Color('white')
         self.font = pygame.font.Font(FONT_PATH, FONT_SIZE // 2)
+        self.pending_login = None  # Future of the login running on the auth thread
 
         # Create register screen
         self.register_screen = RegisterScreen(
@@ -120,7 +124,19 @@ class LoginScreen:
             self.status_message = "Login Failed: Please fill in both Email and Password."
             self.status_color = pygame.Color('red')
             return
-        success, message = self.auth_manager.login(email, password)
+        if self.pending_login is not None and not self.pending_login.done():
+            return  # Still checking the previous attempt
+
+        # Hashing the password takes a moment, so log in on the auth thread and keep drawing
+        self.status_message = "Logging in..."
+        self.status_color = pygame.Color('white')
+        self.pending_login = self.auth_manager.run_in_background(self.auth_manager.login, email, password)
+        self.pending_login.add_done_callback(lambda _: pygame.event.post(pygame.event.Event(LOGIN_DONE)))
+
+    def finish_login(self):
+        """Show the result of the login that just finished on the auth thread."""
+        success, message = self.pending_login.result()
+        self.pending_login = None
         if success:
             self.status_message = "Login successful!"
             self.status_color = pygame.Color('green')
@@ -152,10 +168,15 @@ class LoginScreen:
 
     def show(self):
         self.visible = True
+        password_hasher.warm_up()
 
     def handle_events(self, event):
-        # First check if register screen is visible
-        if self.register_screen.visible:
+        if event.type == LOGIN_DONE and self.pending_login is not None:
+            self.finish_login()
+            return
+
+        # First check if register screen is visible (it also gets its result after going back)
+        if self.register_screen.visible or event.type == REGISTER_DONE:
             self.register_screen.handle_events(event)
             return
 
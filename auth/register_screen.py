@@ -4,6 +4,8 @@ from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH, FONT_SIZE
 from .input_box import InputBox
 from ui.button import Button
 
+REGISTER_DONE = pygame.USEREVENT + 4  # Posted by the auth thread when a registration finishes
+
 
 class RegisterScreen:
     def __init__(self, screen, script_dir, auth_manager, audio_manager=None, on_close_callback=None,
@@ -80,6 +82,7 @@ class RegisterScreen:
         self.status_message = ""
         self.status_color = pygame.Color('white')
         self.font = pygame.font.Font(FONT_PATH, FONT_SIZE // 2)
+        self.pending_register = None  # Future of the registration running on the auth thread
 
     def load_assets(self):
         # Load panel background
@@ -127,8 +130,19 @@ class RegisterScreen:
             self.status_color = pygame.Color('red')
             return
 
-        # Attempt to register
-        success, message = self.auth_manager.register(email, password)
+        if self.pending_register is not None and not self.pending_register.done():
+            return  # Still working on the previous attempt
+
+        # Attempt to register on the auth thread, hashing the password takes a moment
+        self.status_message = "Registering..."
+        self.status_color = pygame.Color('white')
+        self.pending_register = self.auth_manager.run_in_background(self.auth_manager.register, email, password)
+        self.pending_register.add_done_callback(lambda _: pygame.event.post(pygame.event.Event(REGISTER_DONE)))
+
+    def finish_register(self):
+        """Show the result of the registration that just finished on the auth thread."""
+        success, message = self.pending_register.result()
+        self.pending_register = None
 
         if success:
             self.status_message = "Registration successful! You can now log in."
@@ -166,6 +180,10 @@ class RegisterScreen:
         self.visible = True
 
     def handle_events(self, event):
+        if event.type == REGISTER_DONE and self.pending_register is not None:
+            self.finish_register()
+            return
+
         if not self.visible:
             return
 
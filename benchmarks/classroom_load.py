@@ -0,0 +1,124 @@
+# Loopback load test for the classroom server.
+#
+#   python -m benchmarks.classroom_load --rooms 50 --clients 2000
+#
+# Starts a server in this process on 127.0.0.1, connects simulated students that
+# answer every question after a short random delay, plays every room to the end
+# and prints a JSON report with connect time and answer round-trip latency.
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from benchmarks.report import percentile
+from net import classroom_server, protocol
+
+
+async def student(port, room, name, is_host, max_delay, stats, start_room):
+    """One simulated student. Returns True if they won."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(protocol.hello(room, name, level_id=1))
+    sent_at = None
+    try:
+        while True:
+            message_type, payload = await protocol.read_frame(reader)
+            fields, strings = protocol.decode(message_type, payload)
+            if message_type == protocol.WELCOME:
+                stats["joined"] += 1
+                if is_host:
+                    await start_room.wait()
+                    writer.write(protocol.encode(protocol.START))
+            elif message_type == protocol.QUESTION:
+                question_id, _, choice_count = fields
+                await asyncio.sleep(random.uniform(0, max_delay))
+                sent_at = time.perf_counter()
+                writer.write(protocol.answer(question_id, random.randrange(choice_count)))
+            elif message_type == protocol.RESULT and sent_at is not None:
+                stats["latencies"].append((time.perf_counter() - sent_at) * 1000)
+                sent_at = None
+            elif message_type == protocol.END:
+                return fields[0]
+            elif message_type == protocol.ERROR:
+                raise RuntimeError(strings[0])
+    finally:
+        writer.close()
+
+
+async def run(rooms, clients, max_delay):
+    server = await classroom_server.ClassroomServer(SCRIPT_DIR).serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    stats = {"joined": 0, "latencies": []}
+    start_room = asyncio.Event()
+
+    connect_start = time.perf_counter()
+    tasks = []
+    for i in range(clients):
+        room = f"room{i % rooms}"
+        tasks.append(asyncio.create_task(student(port, room, f"student{i}", i < rooms, max_delay, stats, start_room)))
+    while stats["joined"] < clients:
+        await asyncio.sleep(0.01)
+    connect_ms = (time.perf_counter() - connect_start) * 1000
+
+    play_start = time.perf_counter()
+    start_room.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    play_s = time.perf_counter() - play_start
+    server.close()
+    await server.wait_closed()
+
+    errors = [str(r) for r in results if isinstance(r, Exception)]
+    latencies = sorted(stats["latencies"])
+    report = {
+        "rooms": rooms,
+        "clients": clients,
+        "connect_all_ms": round(connect_ms, 1),
+        "play_s": round(play_s, 2),
+        "answers": len(latencies),
+        "answers_per_s": round(len(latencies) / play_s, 1),
+        "wins": sum(1 for r in results if r is True),
+        "errors": len(errors),
+        "answer_ms_p50": round(percentile(latencies, 50), 3),
+        "answer_ms_p95": round(percentile(latencies, 95), 3),
+        "answer_ms_p99": round(percentile(latencies, 99), 3),
+        "answer_ms_max": round(latencies[-1], 3) if latencies else 0.0,
+    }
+    if errors:
+        report["first_error"] = errors[0]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Loopback load test for the classroom server.")
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--max-delay", type=float, default=0.5, help="Longest a student takes to answer (s)")
+    parser.add_argument("--round-gap", type=float, default=0.2, help="Pause between rounds (s)")
+    args = parser.parse_args(argv)
+
+    if resource is not None:
+        # Every client needs two sockets in this process
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = args.clients * 2 + 256
+        if soft < wanted:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+    classroom_server.ROUND_GAP = args.round_gap
+    report = asyncio.run(run(args.rooms, args.clients, args.max_delay))
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
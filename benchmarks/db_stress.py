@@ -0,0 +1,184 @@
+# Database stress test for AuthManager and CustomManager.
+#
+#   python -m benchmarks.db_stress --clients 50 --duration 30
+#   python -m benchmarks.db_stress --sqlite /tmp/stress.db --clients 40 --processes 4
+#
+# Recreates a class logging in at once. Every simulated client registers an
+# account and saves a question set, then loops over login, get_user_stats,
+# get_question_sets and get_question_set_by_name (saving another set now and
+# then) until the time is up. All clients start at the same moment. Runs against
+# the PostgreSQL in the managers' connection settings, or a SQLite file with
+# --sqlite. Prints a JSON report with throughput, latency percentiles and the
+# error rate of every operation.
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from benchmarks.report import percentile, save_report
+from managers import db
+from managers.auth_manager import AuthManager
+from managers.custom_manager import CustomManager
+from managers.password_hasher import password_hasher
+
+OPERATIONS = ["register", "login", "get_user_stats", "save_question_set", "get_question_sets",
+              "get_question_set_by_name"]
+SAVE_EVERY = 5  # A client saves another question set every this many loops
+PASSWORD = "stress-test-password"
+QUESTIONS = [{"question": f"Stress question {i}?", "answer": str(i)} for i in range(10)]
+
+
+class Recorder:
+    """Latencies and error counts of one worker's clients, per operation."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.errors = {name: 0 for name in OPERATIONS}
+
+    def timed(self, name, succeeded, function, *args):
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+            ok = succeeded(result)
+        except Exception as e:  # The managers catch their own errors, this is for anything they don't
+            print(f"{name} raised {e!r}")
+            result, ok = None, False
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.latencies[name].append(elapsed_ms)
+            if not ok:
+                self.errors[name] += 1
+        return result
+
+
+def run_client(recorder, run_id, client_id, deadline, think):
+    """One simulated student: sign up once, then play with their account until the deadline."""
+    auth = AuthManager()
+    custom = CustomManager()
+    email = f"stress-{run_id}-{client_id}@example.com"
+    set_name = f"stress-{run_id}-{client_id}"
+
+    recorder.timed("register", lambda r: r[0], auth.register, email, PASSWORD)
+    recorder.timed("login", lambda r: r[0], auth.login, email, PASSWORD)
+    user_id = auth.current_user["id"] if auth.current_user else None
+    recorder.timed("save_question_set", bool, custom.save_question_set, set_name, QUESTIONS, user_id)
+
+    loops = 0
+    while time.time() < deadline:
+        recorder.timed("login", lambda r: r[0], auth.login, email, PASSWORD)
+        recorder.timed("get_user_stats", lambda r: r is not None, auth.get_user_stats)
+        recorder.timed("get_question_sets", lambda r: set_name in r, custom.get_question_sets, user_id)
+        recorder.timed("get_question_set_by_name", lambda r: r is not None, custom.get_question_set_by_name, set_name)
+        loops += 1
+        if loops % SAVE_EVERY == 0:
+            recorder.timed("save_question_set", bool, custom.save_question_set, f"{set_name}-{loops}", QUESTIONS, user_id)
+        if think:
+            time.sleep(think)
+
+
+def run_worker(client_ids, run_id, start_at, duration, think, sqlite_path, kdf_n, verbose=False):
+    """Run some clients on threads in this process, all starting at `start_at` (wall clock)."""
+    if not verbose:
+        # The managers print a line for every saved set and every error, the report has the counts
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return run_worker(client_ids, run_id, start_at, duration, think, sqlite_path, kdf_n, True)
+    if sqlite_path:
+        db.use_sqlite(sqlite_path)
+    password_hasher.init(SCRIPT_DIR)
+    if kdf_n:
+        password_hasher.params["n"] = kdf_n
+    password_hasher.warm_up()
+
+    recorder = Recorder()
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + duration
+    threads = [threading.Thread(target=run_client, args=(recorder, run_id, client_id, deadline, think))
+               for client_id in client_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    password_hasher.shutdown()
+    return recorder.latencies, recorder.errors
+
+
+def summarize(latencies, errors, elapsed):
+    report = {}
+    for name in OPERATIONS:
+        ordered = sorted(latencies[name])
+        count = len(ordered)
+        report[name] = {
+            "count": count,
+            "ops_per_s": round(count / elapsed, 1),
+            "errors": errors[name],
+            "error_rate": round(errors[name] / count, 4) if count else 0.0,
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "p99_ms": round(percentile(ordered, 99), 2),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress the game database through AuthManager and CustomManager.")
+    parser.add_argument("--clients", type=int, default=20, help="Simulated clients in total")
+    parser.add_argument("--processes", type=int, default=1, help="Spread the clients over this many processes")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to keep every client busy")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds a client waits between loops")
+    parser.add_argument("--sqlite", help="Use this SQLite file instead of PostgreSQL")
+    parser.add_argument("--kdf-n", type=int, help="scrypt cost override, e.g. 1024 to leave the KDF out of the timings")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the managers' own log lines")
+    args = parser.parse_args(argv)
+
+    run_id = uuid.uuid4().hex[:8]  # Keeps accounts from different runs apart
+    processes = max(1, min(args.processes, args.clients))
+    chunks = [list(range(i, args.clients, processes)) for i in range(processes)]
+    start_at = time.time() + 1.0 + 0.5 * processes  # Time for every worker to start before the storm
+    worker_args = (run_id, start_at, args.duration, args.think, args.sqlite, args.kdf_n, args.verbose)
+
+    if processes == 1:
+        results = [run_worker(chunks[0], *worker_args)]
+    else:
+        # Spawn like the password hasher does, so workers start clean on every platform
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(run_worker, chunks, *[[arg] * processes for arg in worker_args]))
+    elapsed = time.time() - start_at
+
+    latencies = {name: [] for name in OPERATIONS}
+    errors = {name: 0 for name in OPERATIONS}
+    for worker_latencies, worker_errors in results:
+        for name in OPERATIONS:
+            latencies[name] += worker_latencies[name]
+            errors[name] += worker_errors[name]
+
+    total = sum(len(values) for values in latencies.values())
+    report = {
+        "backend": f"sqlite:{args.sqlite}" if args.sqlite else "postgresql",
+        "clients": args.clients,
+        "processes": processes,
+        "duration_s": round(elapsed, 2),
+        "total_ops": total,
+        "total_ops_per_s": round(total / elapsed, 1),
+        "total_error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "operations": summarize(latencies, errors, elapsed),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        save_report(report, args.output)
+    return 1 if sum(errors.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
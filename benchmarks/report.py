@@ -0,0 +1,77 @@
+import json
+
+# Metrics compared against a baseline; a higher value is always worse
+COMPARED_METRICS = ["frame_ms_mean", "frame_ms_p95", "frame_ms_p99", "startup_ms", "peak_rss_mb"]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize_frames(frame_times_ms):
+    """Turn a list of per-frame durations into summary statistics."""
+    ordered = sorted(frame_times_ms)
+    mean = sum(ordered) / len(ordered) if ordered else 0.0
+    return {
+        "frames": len(ordered),
+        "frame_ms_mean": round(mean, 3),
+        "frame_ms_p50": round(percentile(ordered, 50), 3),
+        "frame_ms_p95": round(percentile(ordered, 95), 3),
+        "frame_ms_p99": round(percentile(ordered, 99), 3),
+        "frame_ms_max": round(ordered[-1], 3) if ordered else 0.0,
+        "fps_mean": round(1000 / mean, 1) if mean else 0.0,
+    }
+
+
+def load_report(path):
+    """Load a previously saved benchmark report."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    """Write a benchmark report as pretty-printed JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def compare_reports(current, baseline, threshold=0.10):
+    """Compare two reports and return a list of regressions.
+
+    A metric regresses when it is more than `threshold` (fractional) above the baseline.
+    Scenes missing from either report, or that failed in either run, are skipped.
+    """
+    regressions = []
+    for scene, result in current.get("scenes", {}).items():
+        base = baseline.get("scenes", {}).get(scene)
+        if not base or "error" in result or "error" in base:
+            continue
+        for metric in COMPARED_METRICS:
+            new_value = result.get(metric)
+            old_value = base.get(metric)
+            if new_value is None or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            if change > threshold:
+                regressions.append({
+                    "scene": scene,
+                    "metric": metric,
+                    "baseline": old_value,
+                    "current": new_value,
+                    "change_pct": round(change * 100, 1),
+                })
+    return regressions
+
+
+def format_regressions(regressions):
+    """Human readable summary of the regressions found by compare_reports."""
+    if not regressions:
+        return "No regressions against baseline."
+    lines = [f"{len(regressions)} regression(s) against baseline:"]
+    for r in regressions:
+        lines.append(f"  {r['scene']:<20} {r['metric']:<14} {r['baseline']:>10} -> {r['current']:<10} (+{r['change_pct']}%)")
+    return "\n".join(lines)
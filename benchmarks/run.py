@@ -0,0 +1,166 @@
+# Headless scene benchmarks.
+#
+#   python -m benchmarks.run                                  # all scenes, JSON to stdout
+#   python -m benchmarks.run --scenes map battle --frames 300
+#   python -m benchmarks.run --output baseline.json           # store a baseline
+#   python -m benchmarks.run --baseline baseline.json         # exit code 1 on regressions
+#   SDL_RENDER_DRIVER=software python -m benchmarks.run --backend texture
+#   python -m benchmarks.run --scenes replay --replay saves/replays/battle-20261019-101500123-L3.fqr
+#
+# Every scene runs in its own process so startup latency and peak RSS are not
+# polluted by scenes that ran before it.
+import os
+import sys
+import time
+
+PROCESS_START = time.perf_counter()
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import subprocess
+import tempfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if it can't be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_scene(name, frames, seed=0, backend="software", replay=None):
+    """Boot a single scene in this process, drive it for N frames and return its metrics."""
+    import pygame
+    from benchmarks.report import summarize_frames
+    from benchmarks.scenes import SCENES
+
+    random.seed(seed)
+    pygame.init()
+    from managers.display import create_display
+    create_display(backend=backend)
+    from managers.asset_manager import assets
+    assets.init_atlases(SCRIPT_DIR)
+
+    driver = SCENES[name](SCRIPT_DIR)
+    driver.replay_path = replay
+    driver.setup()
+
+    # Startup latency covers interpreter start, imports, scene construction and the first frame
+    for event in driver.events_for_frame(0):
+        pygame.event.post(event)
+    driver.step(0)
+    startup_ms = (time.perf_counter() - PROCESS_START) * 1000
+
+    frame_times = []
+    for frame in range(1, frames + 1):
+        for event in driver.events_for_frame(frame):
+            pygame.event.post(event)
+        start = time.perf_counter()
+        driver.step(frame)
+        frame_times.append((time.perf_counter() - start) * 1000)
+
+    driver.teardown()
+    result = summarize_frames(frame_times)
+    result["startup_ms"] = round(startup_ms, 1)
+    result["peak_rss_mb"] = peak_rss_mb()
+    pygame.quit()
+    return result
+
+
+def run_scene_subprocess(name, frames, seed, timeout, backend="software", replay=None):
+    """Run one scene in a fresh interpreter and collect its result file."""
+    fd, result_path = tempfile.mkstemp(suffix=".json", prefix=f"bench_{name}_")
+    os.close(fd)
+    command = [sys.executable, "-m", "benchmarks.run", "--child", name,
+               "--frames", str(frames), "--seed", str(seed), "--backend", backend,
+               "--result-file", result_path]
+    if replay:
+        command += ["--replay", replay]
+    try:
+        proc = subprocess.run(command, cwd=SCRIPT_DIR, capture_output=True, text=True, timeout=timeout)
+        with open(result_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        if proc.returncode != 0 or not content:
+            tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["no output"]
+            return {"error": f"exit code {proc.returncode}: {tail[0]}"}
+        return json.loads(content)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    finally:
+        os.remove(result_path)
+
+
+def main(argv=None):
+    from benchmarks.report import compare_reports, format_regressions, load_report, save_report
+    from benchmarks.scenes import SCENES
+
+    parser = argparse.ArgumentParser(description="Headless frame-time benchmarks for Final Quiztasy scenes.")
+    parser.add_argument("--scenes", nargs="+", choices=sorted(SCENES), default=list(SCENES),
+                        help="Scenes to run (default: all)")
+    parser.add_argument("--frames", type=int, default=600, help="Frames to drive per scene")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed used by every scene")
+    parser.add_argument("--backend", choices=["software", "texture"], default="software",
+                        help="Renderer backend (use SDL_RENDER_DRIVER=software to test 'texture' headless)")
+    parser.add_argument("--replay", help="Battle replay (.fqr) for the replay scene, instead of a scripted battle")
+    parser.add_argument("--timeout", type=int, default=300, help="Per-scene timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="Compare against a stored report and flag regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed fractional slowdown before a metric counts as a regression")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        args.replay = os.path.abspath(args.replay)  # Relative to where it was run, not the game directory
+    os.chdir(SCRIPT_DIR)
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    if args.child:
+        result = run_scene(args.child, args.frames, args.seed, args.backend, args.replay)
+        with open(args.result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        return 0
+
+    report = {
+        "frames": args.frames,
+        "seed": args.seed,
+        "backend": args.backend,
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "scenes": {},
+    }
+    for name in args.scenes:
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        report["scenes"][name] = run_scene_subprocess(name, args.frames, args.seed, args.timeout, args.backend,
+                                                      args.replay)
+
+    if args.output:
+        save_report(report, args.output)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+
+    if args.baseline:
+        regressions = compare_reports(report, load_report(args.baseline), args.threshold)
+        print(format_regressions(regressions), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+import os
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from managers import display
+
+
+class ScriptedKeys:
+    """Stand-in for pygame.key.get_pressed() so scenes can be driven without a keyboard."""
+    def __init__(self):
+        self.pressed = set()
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class SceneDriver:
+    """Base class for a scene that the benchmark runner steps one frame at a time."""
+    def __init__(self, script_dir):
+        self.script_dir = script_dir
+        self.screen = display.create_display()
+
+    def make_audio_manager(self, music_path=None):
+        """Create an AudioManager pointing at the given OST and the shared click SFX."""
+        from managers.audio_manager import AudioManager
+        click_sfx = os.path.join(self.script_dir, "assets", "audio", "sfx", "click_sound_button.mp3")
+        return AudioManager(music_path, click_sfx)
+
+    def setup(self):
+        """Build the scene. Everything done here counts towards startup latency."""
+        raise NotImplementedError
+
+    def events_for_frame(self, frame):
+        """Return the scripted input events to post before the given frame."""
+        return sweep_mouse(frame)
+
+    def step(self, frame):
+        """Run one frame of the scene (events, update and draw)."""
+        raise NotImplementedError
+
+    def teardown(self):
+        """Release anything the scene holds on to."""
+        pass
+
+
+def sweep_mouse(frame, period=120):
+    """Move the mouse across the screen in a slow diagonal sweep."""
+    t = (frame % period) / period
+    pos = (int(t * (SCREEN_WIDTH - 1)), int(SCREEN_HEIGHT * 0.25 + t * SCREEN_HEIGHT * 0.5))
+    return [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))]
+
+
+class FinalQuiztasyScene(SceneDriver):
+    """Drives the menu screens owned by FinalQuiztasy through its own event/draw loop."""
+    screen_name = "main_menu"
+
+    def setup(self):
+        from main import FinalQuiztasy
+        self.game = FinalQuiztasy()
+        self.screen = self.game.screen
+        if self.screen_name == "game_modes":
+            self.game.main_menu.play_game()
+        elif self.screen_name == "hero_selection":
+            self.game.hero_selection.show()
+        elif self.screen_name == "pvp_hero_selection":
+            self.game.pvp_hero_selection.show()
+
+    def step(self, frame):
+        self.game.handle_events()
+        self.game.draw()
+        display.present()
+
+    def teardown(self):
+        self.game.background_menu.close()
+
+
+class MainMenuScene(FinalQuiztasyScene):
+    screen_name = "main_menu"
+
+
+class GameModesScene(FinalQuiztasyScene):
+    screen_name = "game_modes"
+
+
+class HeroSelectionScene(FinalQuiztasyScene):
+    screen_name = "hero_selection"
+
+
+class PVPHeroSelectionScene(FinalQuiztasyScene):
+    screen_name = "pvp_hero_selection"
+
+
+class MapScene(SceneDriver):
+    """Walks the hero around the map in a square using scripted arrow keys."""
+    route = [pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP]
+    leg_frames = 60
+
+    def setup(self):
+        from maps.map import Map
+        ost = os.path.join(self.script_dir, "assets", "audio", "ost", "boy", "boy_map_ost.mp3")
+        self.audio_manager = self.make_audio_manager(ost)
+        self.keys = ScriptedKeys()
+        self.original_get_pressed = pygame.key.get_pressed
+        pygame.key.get_pressed = lambda: self.keys
+        self.map = Map(self.screen, self.script_dir, None, self.audio_manager, hero_type="boy")
+
+    def events_for_frame(self, frame):
+        self.keys.pressed = {self.route[(frame // self.leg_frames) % len(self.route)]}
+        return []
+
+    def step(self, frame):
+        self.map.handle_events()
+        self.map.move_character()
+        self.map.update_character_animation()
+        self.map.draw()
+        display.present()
+
+    def teardown(self):
+        pygame.key.get_pressed = self.original_get_pressed
+        self.audio_manager.stop_music()
+
+
+class BattleScene(SceneDriver):
+    """Runs a level 1 battle while hovering over the answer buttons."""
+    def setup(self):
+        from gameplay.battle import Battle
+        from gameplay.levels import Level
+        self.audio_manager = self.make_audio_manager()
+        self.battle = Battle(self.screen, self.script_dir, Level(self.script_dir, 1), "boy", self.audio_manager)
+
+    def events_for_frame(self, frame):
+        buttons = self.battle.answer_buttons
+        if not buttons:
+            return []
+        pos = buttons[(frame // 15) % len(buttons)]['rect'].center
+        return [pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))]
+
+    def step(self, frame):
+        self.battle.handle_events()
+        self.battle.update_timer()
+        self.battle.draw()
+        display.present()
+
+    def teardown(self):
+        pygame.mixer.music.stop()
+
+
+class PVPBattleScene(BattleScene):
+    """Runs a hot-seat PVP battle, skipping the interactive coin toss."""
+    def setup(self):
+        from gameplay.pvp_battle import PVPBattle
+        self.audio_manager = self.make_audio_manager()
+        self.battle = PVPBattle(self.screen, self.script_dir, "boy", "girl", self.audio_manager)
+        self.battle.current_player = 1
+        self.battle.generate_new_question()
+
+
+class ReplayScene(SceneDriver):
+    """Plays a recorded battle (--replay) or a scripted one, with the same answers at the same times every run."""
+    replay_path = None  # Set by the runner
+
+    def setup(self):
+        from managers.replay import Replay, ReplayPlayer, load_replay, BATTLE, ANSWER
+        if self.replay_path:
+            replay = load_replay(self.replay_path)
+        else:
+            # Answer one of the buttons every 1.2 seconds, the seed decides whether it was the right one
+            replay = Replay(BATTLE, seed=0, level_id=1, heroes=("boy", ""))
+            replay.events = [(1200 * (i + 1), ANSWER, i % 4) for i in range(100)]
+        self.audio_manager = self.make_audio_manager()
+        # No 2 second pause after the final message, it would land in a single frame
+        self.player = ReplayPlayer(replay, headless=True)
+        self.battle = self.player.create_battle(self.screen, self.script_dir, self.audio_manager)
+
+    def events_for_frame(self, frame):
+        return []
+
+    def step(self, frame):
+        # Once the battle is over the last frame keeps being drawn
+        if self.battle.running:
+            self.player.step(self.battle)
+            self.battle.update_timer()
+        self.battle.draw()
+        display.present()
+
+    def teardown(self):
+        pygame.mixer.music.stop()
+
+
+class CoinTossScene(SceneDriver):
+    """Repeatedly flips the coin, restarting the toss once the result has been shown."""
+    cycle_frames = 120
+
+    def setup(self):
+        from gameplay.coin_toss import CoinToss
+        self.audio_manager = self.make_audio_manager()
+        self.coin_toss = CoinToss(self.screen, self.script_dir, self.audio_manager)
+
+    def events_for_frame(self, frame):
+        if frame % self.cycle_frames == 10:
+            self.coin_toss.toss_complete = False
+            self.coin_toss.player1_choice = "heads"
+            self.coin_toss.start_coin_animation()
+        return sweep_mouse(frame)
+
+    def step(self, frame):
+        for event in pygame.event.get():
+            self.coin_toss.handle_events(event)
+        self.coin_toss.update()
+        self.coin_toss.draw()
+        display.present()
+
+
+class CustomUIScene(SceneDriver):
+    """Scrolls through a long list of saved question sets in the custom mode UI."""
+    slot_count = 50
+
+    def setup(self):
+        from gameplay.custom_ui import CustomUI
+        self.audio_manager = self.make_audio_manager()
+        self.save_slots = [f"Questions - benchmark {i}" for i in range(self.slot_count)]
+        self.ui = CustomUI(self.screen, self.audio_manager, self.script_dir)
+        self.ui.show()
+        self.ui.update_max_scroll(self.save_slots)
+
+    def events_for_frame(self, frame):
+        direction = -1 if (frame // 90) % 2 == 0 else 1
+        return sweep_mouse(frame) + [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=direction, flipped=False)]
+
+    def step(self, frame):
+        for event in pygame.event.get():
+            self.ui.update(event, False, self.save_slots, None)
+        self.screen.fill((0, 0, 0))
+        self.ui.draw(False, self.save_slots, None, [])
+        display.present()
+
+
+SCENES = {
+    "main_menu": MainMenuScene,
+    "game_modes": GameModesScene,
+    "hero_selection": HeroSelectionScene,
+    "pvp_hero_selection": PVPHeroSelectionScene,
+    "map": MapScene,
+    "battle": BattleScene,
+    "pvp_battle": PVPBattleScene,
+    "replay": ReplayScene,
+    "coin_toss": CoinTossScene,
+    "custom_ui": CustomUIScene,
+}
@@ -1,18 +1,20 @@
 import pygame
-import os
 import random
 from settings import FONT_PATH
+from managers.battle_assets import battle_assets, MINI_VARIANTS
 
 class Enemy:
-    def __init__(self, script_dir, enemy_type="mini", level=1, hp=None, damage=None):
+    def __init__(self, script_dir, enemy_type="mini", level=1, hp=None, damage=None, variant=None):
         self.script_dir = script_dir
         self.enemy_type = enemy_type
         self.level = level
+        self.variant = variant  # Which mini-boss image to use, random if None
 
         # HP and damage will be set by the level, but we provide defaults here
         self.hp = hp if hp is not None else 5  # Default HP
         self.max_hp = self.hp
         self.damage = damage if damage is not None else 1  # Default damage
+        self.hp_font = pygame.font.Font(FONT_PATH, 20)
 
         # Load the appropriate enemy image
         self.load_image()
@@ -24,19 +26,12 @@ class Enemy:
 
     def load_image(self):
         """Loads the appropriate enemy image based on type"""
-        if self.enemy_type == "mini":
+        if self.enemy_type == "mini" and self.variant is None:
             # Randomly select one of the 19 mini-boss images
-            mini_id = random.randint(1, 19)
-            image_path = os.path.join(self.script_dir, "assets", "images", "battle", "enemy", "mini",f"mini_{mini_id}.png")
-        else:  # Boss type
-            image_path = os.path.join(self.script_dir, "assets", "images", "battle", "enemy", "boss", "boss.png")
+            self.variant = random.randint(1, MINI_VARIANTS)
 
-        self.image = pygame.image.load(image_path)
-
-        # Scale image if needed
-        scale_factor = 2.5  # Adjust based on your image size
-        self.image = pygame.transform.scale(self.image,(int(self.image.get_width() * scale_factor),int(self.image.get_height() * scale_factor)))
-        self.image = pygame.transform.flip(self.image, True, False)
+        # Scaled and mirrored once, then shared by every battle that uses this enemy
+        self.image = battle_assets.enemy_image(self.script_dir, self.enemy_type, self.variant)
 
     def take_damage(self, amount):
         """Applies damage to the enemy"""
@@ -67,14 +62,13 @@ class Enemy:
         pygame.draw.rect(screen, (0, 255, 0), (bar_x, bar_y, health_width, bar_height))
 
         # HP text
-        font = pygame.font.Font(FONT_PATH, 20)
-        hp_text = font.render(f"{self.hp}/{self.max_hp} HP", True, (255, 255, 255))
+        hp_text = self.hp_font.render(f"{self.hp}/{self.max_hp} HP", True, (255, 255, 255))
         screen.blit(hp_text, (bar_x + 10, bar_y + 2))
 
 
 class MiniBoss(Enemy):
-    def __init__(self, script_dir, level=1, hp=None, damage=None):
-        super().__init__(script_dir, "mini", level, hp, damage)
+    def __init__(self, script_dir, level=1, hp=None, damage=None, variant=None):
+        super().__init__(script_dir, "mini", level, hp, damage, variant)
 
 
 class Boss(Enemy):
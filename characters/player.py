@@ -1,6 +1,6 @@
 import pygame
-import os
 from settings import FONT_PATH
+from managers.battle_assets import battle_assets
 
 class Player:
     def __init__(self, script_dir, player_type="boy"):
@@ -9,14 +9,10 @@ class Player:
         self.hp = 10  # Universal HP for every level
         self.max_hp = 10
         self.show_health_bar = True  # Add a flag to control health bar visibility
+        self.hp_font = pygame.font.Font(FONT_PATH, 20)
 
-        # Load player image based on type (boy or girl)
-        image_path = os.path.join(script_dir, "assets", "images", "battle", self.player_type, f"{self.player_type}_stand.png")
-        self.image = pygame.image.load(image_path)
-
-        # Scale image if needed (adjust scale factor as appropriate)
-        scale_factor = 5  # Adjust this value based on your image size
-        self.image = pygame.transform.scale(self.image,(int(self.image.get_width() * scale_factor),int(self.image.get_height() * scale_factor)))
+        # Load the scaled player image based on type (boy or girl), shared across battles
+        self.image = battle_assets.player_image(script_dir, self.player_type)
 
         # Position the player on the left side of the screen
         self.rect = self.image.get_rect()
@@ -56,6 +52,5 @@ class Player:
             pygame.draw.rect(screen, (0, 255, 0), (bar_x, bar_y, health_width, bar_height))
 
             # HP text
-            font = pygame.font.Font(FONT_PATH, 20)
-            hp_text = font.render(f"{self.hp}/{self.max_hp} HP", True, (255, 255, 255))
+            hp_text = self.hp_font.render(f"{self.hp}/{self.max_hp} HP", True, (255, 255, 255))
             screen.blit(hp_text, (bar_x + 10, bar_y + 2))
\ No newline at end of file
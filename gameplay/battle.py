@@ -1,14 +1,20 @@
 import pygame
 import time
 import os
+import random
 from characters.player import Player
-from gameplay.questions import QuestionGenerator
-from managers.audio_manager import AudioManager
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, FONT_PATH
+from gameplay.questions import Question, QuestionGenerator
+from managers import display
+from managers.telemetry import telemetry, FrameStats
+from managers.replay import ReplayRecorder, BATTLE
+from managers.learner_model import learner_model, StudentSkills
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, FONT_PATH, ADAPTIVE_QUESTIONS
+from net import protocol
 from .pause import Pause
 
 class Battle:
-    def __init__(self, screen, script_dir, level, player_type="boy", audio_manager=None, game_instance=None):
+    def __init__(self, screen, script_dir, level, player_type="boy", audio_manager=None, game_instance=None,
+                 classroom=None, replay=None):
         self.screen = screen
         self.script_dir = script_dir
         self.level = level
@@ -32,6 +38,43 @@ class Battle:
         self.battle_message = ""
         self.message_timer = 0
 
+        # Played from a recording (see managers/replay.py): its clock and its seed replace the real ones
+        self.replay = replay
+        self.now = replay.now if replay else time.time
+
+        # Result stats reported to the save and the progress sync
+        self.correct_answers = 0
+        self.started_at = self.now()
+        self.paused_total = 0.0
+
+        # In classroom mode (see net/classroom_client.py) questions, timers and damage come from the server
+        self.classroom = classroom
+        self.question_id = 0
+        self.question_seconds = level.get_timer_seconds()
+        self.mode = "classroom" if classroom else "battle"  # Telemetry
+        self.sent_latency_ms = None  # When the classroom answer was sent, for its RESULT
+        self.frame_stats = FrameStats()
+
+        # Questions are picked for the student's skills. The battle updates its own copy and hands it back at the end
+        self.learner = None
+        if replay:
+            self.learner = StudentSkills.from_snapshot(replay.replay.skills) if replay.replay.skills else None
+        elif not classroom and ADAPTIVE_QUESTIONS:
+            self.learner = learner_model.current().copy()
+
+        # Every battle outside the classroom is recorded, the questions come from a seeded generator
+        seed = replay.replay.seed if replay else random.getrandbits(32)
+        self.rng = random.Random(seed)
+        self.recorder = None
+        if not classroom and not replay:
+            self.recorder = ReplayRecorder(BATTLE, seed, level_id=level.level_id, heroes=(player_type, ""),
+                                           difficulty=level.get_difficulty(), timer_seconds=level.get_timer_seconds(),
+                                           skills=self.learner.snapshot() if self.learner else None)
+
+        # Background, sprites, HP bars and the question box, composed into one surface
+        self.static_layer = None
+        self.static_layer_key = None
+
         # Save the current map OST for restoration later
         self.player_type = player_type
         self.map_ost = self.get_map_ost_path()
@@ -48,11 +91,11 @@ class Battle:
         # Initialize first question
         self.generate_new_question()
 
-        # Load and play battle music
+        # Crossfade to the battle music, and keep the map music ready for when the battle ends
         self.battle_music = self.load_battle_music()
-        if self.battle_music:
-            pygame.mixer.music.load(self.battle_music)
-            pygame.mixer.music.play(-1)  # Loop the battle music
+        if self.audio_manager and self.battle_music:
+            self.audio_manager.play_track(self.battle_music)
+            self.audio_manager.prepare_track(self.map_ost)
 
     def open_map_from_pause(self):
         """Handle opening map when selected from pause menu"""
@@ -83,19 +126,25 @@ class Battle:
         return None
 
     def stop_battle_music(self):
-        """Stop the battle music and restore map music."""
-        pygame.mixer.music.stop()
-        # Restore the map OST
-        pygame.mixer.music.load(self.map_ost)
-        pygame.mixer.music.play(-1)  # Loop the map music
+        """Stop the battle music and resume the map music where it left off."""
+        if self.audio_manager:
+            self.audio_manager.play_track(self.map_ost, resume=True)
 
     def generate_new_question(self):
         """Generates a new question for the battle"""
-        self.current_question = QuestionGenerator.get_random_question(self.level.get_difficulty())
-        self.timer_start = time.time()
+        if self.classroom:
+            self.wait_for_classroom("Waiting for the next question...")
+            return
+        self.current_question = QuestionGenerator.get_random_question(self.level.get_difficulty(), self.rng,
+                                                                      self.learner)
+        self.timer_start = self.now()
         self.time_left = self.level.get_timer_seconds()
         self.selected_answer = None
         self.create_answer_buttons()
+        telemetry.emit("question", self.mode, self.level.level_id, self.current_question.difficulty,
+                       self.current_question.question_text, self.current_question.answer)
+        if self.recorder:
+            self.recorder.question(self.battle_time_ms(), self.current_question.question_text)
 
     def create_answer_buttons(self):
         """Creates the answer buttons based on the current question"""
@@ -146,17 +195,76 @@ class Battle:
             # Always process pause menu events
             self.pause_menu.update(event)
 
+    def wait_for_classroom(self, text):
+        """Show a placeholder until the classroom server sends a question."""
+        self.current_question = Question()
+        self.current_question.question_text = text
+        self.question_id = 0
+        self.answer_buttons = []
+
+    def update_classroom(self):
+        """Apply whatever the classroom server sent since the last frame."""
+        for message_type, fields, strings in self.classroom.poll():
+            if message_type == protocol.QUESTION:
+                self.question_id, self.question_seconds, _ = fields
+                self.current_question = Question()
+                self.current_question.question_text = strings[0]
+                self.current_question.choices = strings[1:]
+                self.timer_start = self.now()
+                self.time_left = self.question_seconds
+                self.selected_answer = None
+                self.create_answer_buttons()
+                telemetry.emit("question", self.mode, self.level.level_id, None, strings[0], None)
+            elif message_type == protocol.RESULT:
+                _, correct, correct_choice, player_hp, enemy_hp = fields
+                telemetry.emit("answer", self.mode, self.level.level_id, "correct" if correct else "wrong",
+                               self.sent_latency_ms, None, enemy_hp if correct else player_hp)
+                self.sent_latency_ms = None
+                self.player.hp = int(player_hp) if player_hp.is_integer() else player_hp
+                self.enemy.hp = enemy_hp
+                if correct:
+                    self.correct_answers += 1
+                    self.battle_message = "Correct! Enemy takes damage!"
+                else:
+                    self.battle_message = f"Wrong! You take {self.enemy.get_damage_amount()} damage!"
+                self.message_timer = self.now()
+                self.wait_for_classroom("Waiting for the next question...")
+            elif message_type == protocol.END:
+                victory, _ = fields
+                self.battle_message = "Victory! You defeated the enemy!" if victory else "Defeat! You have been defeated!"
+                self.message_timer = self.now()
+                self.running = False
+            elif message_type == protocol.ERROR or message_type is None:
+                print(f"Classroom: {strings[0]}")
+                self.battle_message = strings[0]
+                self.message_timer = self.now()
+                self.running = False
+
     def check_answer(self):
         """Checks if the selected answer is correct"""
+        if self.classroom:
+            # The server judges the answer and replies with a RESULT
+            if self.question_id:
+                self.sent_latency_ms = self.answer_latency_ms()
+                self.classroom.send_answer(self.question_id, self.current_question.choices.index(self.selected_answer))
+                self.wait_for_classroom("Answer sent, waiting for the others...")
+            return
+
+        latency_ms = self.answer_latency_ms()
+        if self.recorder:
+            self.recorder.answer(self.battle_time_ms(), self.current_question.choices.index(self.selected_answer))
+        self.update_learner(self.selected_answer == self.current_question.answer)
         if self.selected_answer == self.current_question.answer:
             # Correct answer - enemy takes damage
             self.enemy.take_damage(1)
+            telemetry.emit("answer", self.mode, self.level.level_id, "correct", latency_ms, 1, self.enemy.hp)
+            self.correct_answers += 1
             self.battle_message = "Correct! Enemy takes damage!"
 
             if self.enemy.hp <= 0:
                 self.battle_message = "Victory! You defeated the enemy!"
                 # Wait a bit before ending the battle
-                pygame.time.delay(2000)
+                self.pause_on_result()
                 self.running = False  # End the battle
             else:
                 # Generate a new question
@@ -164,19 +272,21 @@ class Battle:
         else:
             # Wrong answer - player takes damage
             self.player.take_damage(self.enemy.get_damage_amount())
+            telemetry.emit("answer", self.mode, self.level.level_id, "wrong", latency_ms,
+                           self.enemy.get_damage_amount(), self.player.hp)
             self.battle_message = f"Wrong! You take {self.enemy.get_damage_amount()} damage!"
 
             if self.player.hp <= 0:
                 self.battle_message = "Defeat! You have been defeated!"
                 # Wait a bit before ending the battle
-                pygame.time.delay(2000)
+                self.pause_on_result()
                 self.running = False  # End the battle
             else:
                 # Generate a new question
                 self.generate_new_question()
 
         # Set message timer
-        self.message_timer = time.time()
+        self.message_timer = self.now()
 
     def update_timer(self):
         """Updates the time left to answer the question"""
@@ -188,36 +298,105 @@ class Battle:
         paused_time = self.pause_menu.get_total_paused_time()
         if paused_time > 0:
             self.timer_start += paused_time  # Move the start time forward by paused duration
+            self.paused_total += paused_time
 
         # Calculate remaining time
-        elapsed = time.time() - self.timer_start
+        elapsed = self.now() - self.timer_start
+        if self.classroom:
+            # Just the countdown, the server's timer decides when time is up
+            self.time_left = max(0, self.question_seconds - elapsed) if self.question_id else 0
+            return
         self.time_left = max(0, self.level.get_timer_seconds() - elapsed)
 
-        # If time runs out, treat as wrong answer
-        if self.time_left <= 0 and self.running:
-            self.battle_message = "Time's up! You take damage!"
-            self.player.take_damage(self.enemy.get_damage_amount())
+        # If time runs out, treat as wrong answer. A replay times out when the recording did
+        if self.time_left <= 0 and self.running and not self.replay:
+            self.time_out()
+
+    def time_out(self):
+        """The question's time ran out: the player takes damage as for a wrong answer."""
+        if self.recorder:
+            self.recorder.timeout(self.battle_time_ms())
+        self.update_learner(False)
+        self.battle_message = "Time's up! You take damage!"
+        self.player.take_damage(self.enemy.get_damage_amount())
+        telemetry.emit("answer", self.mode, self.level.level_id, "timeout", self.answer_latency_ms(),
+                       self.enemy.get_damage_amount(), self.player.hp)
+
+        if self.player.hp <= 0:
+            self.battle_message = "Defeat! You have been defeated!"
+            # Wait a bit before ending the battle
+            self.pause_on_result()
+            self.running = False  # End the battle
+        else:
+            # Generate a new question
+            self.generate_new_question()
 
-            if self.player.hp <= 0:
-                self.battle_message = "Defeat! You have been defeated!"
-                # Wait a bit before ending the battle
-                pygame.time.delay(2000)
-                self.running = False  # End the battle
-            else:
-                # Generate a new question
-                self.generate_new_question()
+        # Set message timer
+        self.message_timer = self.now()
+
+    def update_learner(self, correct):
+        """Move the student's skill for the current question's operation."""
+        if self.learner:
+            self.learner.record(self.current_question.operation, self.current_question.difficulty, correct)
+
+    def pause_on_result(self):
+        """Keep the final message on screen for a moment, except when a replay is fast-forwarded."""
+        if not (self.replay and self.replay.headless):
+            pygame.time.delay(2000)
+
+    def battle_time_ms(self):
+        """Time since the battle started, not counting time spent paused. Replays are timed with it."""
+        paused = self.paused_total + self.pause_menu.total_paused_time
+        return int((self.now() - self.started_at - paused) * 1000)
+
+    def replay_result(self):
+        """1 if the player won, 2 if the enemy won, 0 while undecided."""
+        return 1 if self.enemy.hp <= 0 else 2 if self.player.hp <= 0 else 0
+
+    def answer_latency_ms(self):
+        """How long the current question has been on screen, not counting time spent paused."""
+        return int((self.now() - self.timer_start) * 1000)
+
+    def get_score(self):
+        """100 points per correct answer plus 10 per remaining HP."""
+        return self.correct_answers * 100 + int(self.player.hp * 10)
 
-            # Set message timer
-            self.message_timer = time.time()
+    def get_duration_ms(self):
+        """How long the battle took, not counting time spent paused."""
+        return int((self.now() - self.started_at - self.paused_total) * 1000)
+
+    def build_static_layer(self):
+        """Compose everything that only changes when someone takes damage into one surface."""
+        layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.level.draw_background(layer)
+
+        # Player and enemy sprites with their HP bars
+        self.player.draw(layer)
+        self.enemy.draw(layer)
+
+        # Question box
+        question_box = pygame.Rect(50, SCREEN_HEIGHT - 300, SCREEN_WIDTH - 100, 200)
+        pygame.draw.rect(layer, (0, 0, 0, 200), question_box)
+        pygame.draw.rect(layer, (255, 255, 255), question_box, 3)
+        return layer
+
+    def draw_static_layer(self):
+        """Draw the static layer, rebuilding it only after an HP change."""
+        key = (self.player.hp, self.enemy.hp)
+        if self.static_layer is None or key != self.static_layer_key:
+            self.static_layer = self.build_static_layer()
+            self.static_layer_key = key
+        display.draw_background(self.static_layer)
 
     def draw(self):
         """Draws the battle screen"""
-        # Draw background
-        self.level.draw_background(self.screen)
+        # While paused only the menu changes, drawn over a cached snapshot of the battle
+        if self.pause_menu.has_backdrop():
+            self.pause_menu.draw()
+            return
 
-        # Draw player and enemy
-        self.player.draw(self.screen)
-        self.enemy.draw(self.screen)
+        # Draw background, player, enemy and question box in one blit
+        self.draw_static_layer()
 
         # Draw timer
         timer_text = self.font.render(f"Time: {int(self.time_left)}", True, (255, 255, 255))
@@ -227,11 +406,6 @@ class Battle:
                           timer_rect.width + 20, timer_rect.height + 20))
         self.screen.blit(timer_text, timer_rect)
 
-        # Draw question box
-        question_box = pygame.Rect(50, SCREEN_HEIGHT - 300, SCREEN_WIDTH - 100, 200)
-        pygame.draw.rect(self.screen, (0, 0, 0, 200), question_box)
-        pygame.draw.rect(self.screen, (255, 255, 255), question_box, 3)
-
         # Draw question text
         question_text = self.font.render(self.current_question.question_text, True, (255, 255, 255))
         question_rect = question_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 250))
@@ -248,7 +422,7 @@ class Battle:
                 self.screen.blit(text, text_rect)
 
         # Draw battle message
-        if self.battle_message and time.time() - self.message_timer < 2:
+        if self.battle_message and self.now() - self.message_timer < 2:
             message_text = self.font.render(self.battle_message, True, (255, 255, 0))
             message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
             pygame.draw.rect(self.screen, (0, 0, 0),
@@ -266,19 +440,33 @@ class Battle:
             self.handle_events()
 
             # Update timer
+            if self.classroom:
+                self.update_classroom()
             self.update_timer()
+            if self.audio_manager:
+                self.audio_manager.update()
 
             # Draw battle
             self.draw()
 
             # Update display
-            pygame.display.flip()
+            display.present()
 
             # Cap the frame rate
             self.clock.tick(FPS)
+            self.frame_stats.add(self.clock)
 
         # Stop battle music and restore map music when the battle ends
         self.stop_battle_music()
 
+        result = "victory" if self.enemy.hp <= 0 else "defeat" if self.player.hp <= 0 else "quit"
+        telemetry.emit("battle_end", self.mode, self.level.level_id, result, self.get_score(),
+                       self.get_duration_ms(), *self.frame_stats.values())
+        if self.recorder:
+            self.recorder.end(self.battle_time_ms(), self.replay_result())
+            self.recorder.save(self.script_dir)
+        if self.learner and not self.replay:
+            learner_model.update(self.learner)
+
         # Return result (True for victory, False for defeat)
         return self.enemy.hp <= 0
\ No newline at end of file
@@ -0,0 +1,94 @@
+import os
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH, CLASSROOM, CLASSROOM_PORT, CLASSROOM_LEVEL
+from managers.asset_manager import assets
+from managers import display
+from .battle import Battle
+from .levels import Level
+
+class Classroom:
+    def __init__(self, game_instance):
+        """Initialize the classroom quiz mode (see CLASSROOM in settings.py)."""
+        self.game_instance = game_instance
+        self.screen = game_instance.screen
+        self.script_dir = game_instance.script_dir
+        self.audio_manager = game_instance.audio_manager
+        self.font = pygame.font.Font(FONT_PATH, 24)
+
+    def player_name(self, hero):
+        """The logged in player's email name, or the hero for guests."""
+        user = self.game_instance.main_menu.auth_manager.get_current_user()
+        return user["email"].split("@")[0] if user else hero
+
+    def start_battle(self, hero):
+        """Join the classroom room, wait in its lobby and fight the room's battle."""
+        from net.classroom_client import ClassroomClient
+        host, room = CLASSROOM
+        client = ClassroomClient(host, CLASSROOM_PORT, room, self.player_name(hero), CLASSROOM_LEVEL)
+        # Load the battle first, the server's timer starts as soon as the host starts the room
+        self.game_instance.show_loading(assets.preload("battle", self.script_dir, hero=hero))
+        result = None
+        try:
+            client.connect()
+        except OSError as e:
+            print(f"Could not join the classroom at {host}:{CLASSROOM_PORT}: {e}")
+        else:
+            if self.wait_in_lobby(client):
+                battle = Battle(self.screen, self.script_dir, Level(self.script_dir, client.level_id), hero,
+                                self.audio_manager, game_instance=self.game_instance, classroom=client)
+                self.game_instance.battle = battle
+                result = battle.run()
+                self.game_instance.battle = None
+        client.close()
+
+        print("Classroom quiz won!" if result else "Classroom quiz ended.")
+        # Back to the menu music and the game modes screen
+        if self.audio_manager:
+            self.audio_manager.play_track(os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3"),
+                                          resume=True)
+        self.game_instance.game_modes.show()
+        return result
+
+    def wait_in_lobby(self, client):
+        """Show who is in the room until the quiz starts. False if it was cancelled or failed."""
+        if self.game_instance.loading_screen is None:
+            from ui.loading_screen import LoadingScreen
+            self.game_instance.loading_screen = LoadingScreen(self.screen)
+
+        clock = pygame.time.Clock()
+        while not client.started:
+            if client.failed:
+                print(f"Classroom: {client.failed}")
+                return False
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.event.post(event)  # Let the main loop close the game
+                    return False
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        return False
+                    if event.key == pygame.K_RETURN and client.is_host:
+                        client.start_room()
+            if self.audio_manager:
+                self.audio_manager.update()
+
+            if client.is_host:
+                label = f"Room {client.room}: press Enter to start, Esc to leave"
+            else:
+                label = f"Room {client.room}: waiting for the host to start (Esc to leave)"
+            self.game_instance.loading_screen.draw(0, label)
+            self.draw_roster(list(client.roster.values()))
+            display.present()
+            clock.tick(30)
+        return True
+
+    def draw_roster(self, names):
+        """List the players in the room under the lobby label."""
+        y = SCREEN_HEIGHT // 2 + 120
+        for name in names[:12]:
+            text = self.font.render(name, True, (255, 255, 255))
+            self.screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, y)))
+            y += 36
+        if len(names) > 12:
+            text = self.font.render(f"and {len(names) - 12} more", True, (180, 180, 180))
+            self.screen.blit(text, text.get_rect(center=(SCREEN_WIDTH // 2, y)))
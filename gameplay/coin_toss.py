@@ -3,15 +3,19 @@ import random
 import time
 import os
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH
+from managers.asset_manager import assets
+from managers import display
 
 
 class CoinToss:
-    def __init__(self, screen, script_dir, audio_manager=None, battle_instance=None):
+    def __init__(self, screen, script_dir, audio_manager=None, battle_instance=None, netplay=None):
         """Initialize the coin toss screen."""
         self.screen = screen
         self.script_dir = script_dir
         self.audio_manager = audio_manager
         self.battle_instance = battle_instance  # Store reference to battle instance
+        # In a LAN match the host makes the call and the shared seed decides the toss on both machines
+        self.netplay = netplay
         self.font = pygame.font.Font(FONT_PATH, 50)
         self.result_font = pygame.font.Font(FONT_PATH, 60)
         self.small_font = pygame.font.Font(FONT_PATH, 30)
@@ -22,16 +26,16 @@ class CoinToss:
         self.overlay.set_alpha(180)  # Set transparency (0-255)
 
         # Load coin images
-        self.heads_img = pygame.image.load(os.path.join(script_dir, "assets", "images", "coin", "heads.png"))
-        self.tails_img = pygame.image.load(os.path.join(script_dir, "assets", "images", "coin", "tails.png"))
+        self.heads_img = assets.load_image(os.path.join(script_dir, "assets", "images", "coin", "heads.png"))
+        self.tails_img = assets.load_image(os.path.join(script_dir, "assets", "images", "coin", "tails.png"))
 
         # Scale coin images
         scale_factor = 0.5
         self.heads_img = pygame.transform.scale(self.heads_img,(int(self.heads_img.get_width() * scale_factor),int(self.heads_img.get_height() * scale_factor)))
         self.tails_img = pygame.transform.scale(self.tails_img,(int(self.tails_img.get_width() * scale_factor),int(self.tails_img.get_height() * scale_factor)))
 
-        # Load coin flip sound
-        self.coin_flip_sound = pygame.mixer.Sound(os.path.join(script_dir, "assets", "audio", "sfx", "coin_flip.mp3"))
+        # Coin flip sound, decoded once by the audio manager's sound bank
+        self.coin_flip_sound = os.path.join(script_dir, "assets", "audio", "sfx", "coin_flip.mp3")
 
         # Button areas
         self.heads_button = pygame.Rect(SCREEN_WIDTH // 4 - 100, SCREEN_HEIGHT // 2 + 100, 275, 80)
@@ -49,9 +53,12 @@ class CoinToss:
         self.max_flips = 10
         self.last_flip_time = 0
         self.flip_delay = 0.1  # seconds between flips
+        self.complete_time = 0
 
     def handle_events(self, event):
         """Handle user input during coin toss."""
+        if self.netplay and not self.netplay.is_host:
+            return  # Player 1 calls it on the other machine
         if event.type == pygame.MOUSEBUTTONDOWN and not self.animation_running and self.player1_choice is None:
             mouse_pos = pygame.mouse.get_pos()
 
@@ -65,10 +72,13 @@ class CoinToss:
                 self.player1_choice = "tails"
                 self.start_coin_animation()
 
+            if self.netplay and self.player1_choice:
+                self.netplay.send_toss(self.player1_choice)
+
     def start_coin_animation(self):
         """Start the coin flip animation."""
-        if self.audio_manager and self.audio_manager.audio_enabled:
-            self.coin_flip_sound.play()
+        if self.audio_manager:
+            self.audio_manager.play_sound(self.coin_flip_sound, "combat", priority=1)
 
         self.animation_running = True
         self.animation_start_time = time.time()
@@ -76,10 +86,15 @@ class CoinToss:
         self.last_flip_time = time.time()
 
         # Determine the actual result
-        self.toss_result = random.choice(["heads", "tails"])
+        rng = self.netplay.rng("coin toss") if self.netplay else random
+        self.toss_result = rng.choice(["heads", "tails"])
 
     def update(self):
         """Update the coin toss animation."""
+        if self.netplay and not self.netplay.is_host and self.player1_choice is None and self.netplay.toss_choice:
+            self.player1_choice = self.netplay.toss_choice
+            self.start_coin_animation()
+
         if self.animation_running:
             current_time = time.time()
 
@@ -98,6 +113,7 @@ class CoinToss:
             if self.flip_count >= self.max_flips:
                 self.animation_running = False
                 self.toss_complete = True
+                self.complete_time = current_time
 
                 # Set the final image to match the result
                 self.current_coin_img = self.heads_img if self.toss_result == "heads" else self.tails_img
@@ -125,7 +141,9 @@ class CoinToss:
         self.screen.blit(title_text, title_rect)
 
         # Draw instruction
-        if not self.player1_choice:
+        if not self.player1_choice and self.netplay and not self.netplay.is_host:
+            instruction_text = self.font.render("Waiting for Player 1 to call it...", True, (255, 255, 0))
+        elif not self.player1_choice:
             instruction_text = self.font.render("Player 1: Choose Heads or Tails", True, (255, 255, 0))
         else:
             instruction_text = self.font.render(f"Player 1 chose {self.player1_choice.upper()}", True, (255, 255, 0))
@@ -137,7 +155,7 @@ class CoinToss:
         self.screen.blit(self.current_coin_img, coin_rect)
 
         # Draw buttons if choice not yet made
-        if not self.player1_choice:
+        if not self.player1_choice and (not self.netplay or self.netplay.is_host):
             # Heads button
             pygame.draw.rect(self.screen, (50, 50, 200), self.heads_button)
             pygame.draw.rect(self.screen, (255, 255, 255), self.heads_button, 2)
@@ -183,9 +201,16 @@ class CoinToss:
 
                 self.handle_events(event)
 
+            if self.netplay:
+                if self.netplay.failed:
+                    return None
+                # Both machines move on together instead of waiting for a key press
+                if self.toss_complete and time.time() - self.complete_time > 2:
+                    running = False
+
             self.update()
             self.draw()
-            pygame.display.flip()
+            display.present()
             clock.tick(60)
 
         return self.first_player
\ No newline at end of file
@@ -3,6 +3,11 @@ import os
 import time
 from ui.button import Button
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH
+from managers.asset_manager import assets
+from managers import display
+
+BACKDROP_BLUR = 8  # Downscale factor used to blur the paused scene
+BACKDROP_DARKEN = (128, 128, 128)  # Multiplied into the blurred scene, about a 50% black overlay
 
 class Pause:
     def __init__(self, screen, script_dir, audio_manager=None, scale=1, map_callback=None, menu_callback=None):
@@ -16,6 +21,7 @@ class Pause:
         self.show_confirmation = False
         self.confirmation_type = None  # 'menu' or 'map'
         self.confirmation_buttons = []
+        self.backdrop = None  # Blurred snapshot of the scene, built on the first paused frame
 
         # Callbacks for menu and map actions
         self.map_callback = map_callback
@@ -189,26 +195,25 @@ class Pause:
 
     def load_scaled_image(self, path, scale=None):
         """Load an image and scale it. If scale is None, use self.scale"""
-        image = pygame.image.load(path).convert_alpha()
         scale_factor = scale if scale is not None else self.scale
         if scale_factor != 1.0:
-            new_width = int(image.get_width() * scale_factor)
-            new_height = int(image.get_height() * scale_factor)
-            return pygame.transform.scale(image, (new_width, new_height))
-        return image
+            # Cached, so reopening the pause menu in a later battle doesn't rescale anything
+            return assets.load_scaled(path, scale=scale_factor)
+        return assets.load_image(path)
 
     def toggle_pause(self):
         """Toggle pause state and play click sound"""
         self.paused = not self.paused
+        self.backdrop = None
         if self.audio_manager:
             self.audio_manager.play_sfx()
 
             if self.paused:
                 self.pause_start_time = time.time()
-                pygame.mixer.music.pause()
+                self.audio_manager.pause_music()
             else:
                 self.total_paused_time += time.time() - self.pause_start_time
-                pygame.mixer.music.unpause()
+                self.audio_manager.unpause_music()
 
     def return_to_menu(self):
         """Return to main menu function"""
@@ -228,13 +233,26 @@ class Pause:
         self.total_paused_time = 0
         return paused_time
 
+    def build_backdrop(self):
+        """Blur and darken a snapshot of the scene currently on screen."""
+        scene = display.snapshot()
+        width, height = scene.get_size()
+        small = pygame.transform.smoothscale(scene, (max(1, width // BACKDROP_BLUR), max(1, height // BACKDROP_BLUR)))
+        backdrop = pygame.transform.smoothscale(small, (width, height))
+        backdrop.fill(BACKDROP_DARKEN, special_flags=pygame.BLEND_RGB_MULT)
+        return backdrop.convert()
+
+    def has_backdrop(self):
+        """True once the paused scene is cached, so the caller can skip redrawing it."""
+        return self.paused and self.backdrop is not None
+
     def draw_pause_overlay(self):
         """Draw the pause overlay when game is paused"""
         if self.paused:
-            # Create semi-transparent overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))
-            self.screen.blit(overlay, (0, 0))
+            # The scene under the menu doesn't change while paused, so snapshot it once
+            if self.backdrop is None:
+                self.backdrop = self.build_backdrop()
+            self.screen.blit(self.backdrop, (0, 0))
 
             if not self.show_confirmation:
                 # Draw normal pause menu
@@ -256,6 +274,7 @@ class Pause:
     def draw(self):
         """Draw the pause button (always visible) and overlay when paused"""
         if not self.paused:
+            self.backdrop = None
             self.pause_button.draw(self.screen)
         self.draw_pause_overlay()
 
@@ -1,6 +1,8 @@
 import os
 import pygame
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, PVP_NETPLAY, PVP_PORT
+from managers.asset_manager import assets
+from managers import display
 from .pvp_battle import PVPBattle
 
 class PVP:
@@ -14,6 +16,9 @@ class PVP:
 
     def start_battle(self):
         """Start a PVP battle with selected heroes."""
+        if PVP_NETPLAY is not None:
+            return self.start_lan_battle()
+
         # No level parameter needed
 
         # Ensure heroes are selected
@@ -21,6 +26,10 @@ class PVP:
             print("Error: Heroes not selected!")
             return None
 
+        # Wait for the coin toss and battle assets (preloaded during hero selection)
+        self.game_instance.show_loading(assets.preload(
+            "pvp_battle", self.script_dir, p1_hero=self.game_instance.p1_hero, p2_hero=self.game_instance.p2_hero))
+
         # Create and run the PVP battle
         battle = PVPBattle(
             self.screen,
@@ -34,19 +43,75 @@ class PVP:
         # Run the battle and get the result
         result = battle.run()
 
-        # Explicitly restart menu music
-        if self.audio_manager:
-            self.audio_manager.stop_music()  # Make sure all music is stopped
-            self.audio_manager.music_path = os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3")
-            if hasattr(self.audio_manager, 'audio_enabled') and self.audio_manager.audio_enabled:
-                self.audio_manager.play_music()
-                print("Menu music restarted after battle")
-
         # Handle the result
         self.handle_battle_result(result)
 
         return result
 
+    def start_lan_battle(self):
+        """Host or join a match against another machine (see PVP_NETPLAY in settings.py)."""
+        from net.pvp_netplay import NetplaySession
+        is_host = PVP_NETPLAY == "host"
+        hero = getattr(self.game_instance, "p1_hero" if is_host else "p2_hero", None)
+        if hero is None:
+            print("Error: Hero not selected!")
+            return None
+
+        netplay = NetplaySession("host" if is_host else "join", hero, "" if is_host else PVP_NETPLAY, PVP_PORT)
+        result = None
+        try:
+            netplay.start()
+        except OSError as e:
+            print(f"Could not host a LAN match on port {PVP_PORT}: {e}")
+        else:
+            if self.wait_for_opponent(netplay):
+                # The handshake told each side the other player's hero
+                self.game_instance.p1_hero, self.game_instance.p2_hero = netplay.heroes[1], netplay.heroes[2]
+                self.game_instance.show_loading(assets.preload(
+                    "pvp_battle", self.script_dir, p1_hero=netplay.heroes[1], p2_hero=netplay.heroes[2]))
+                battle = PVPBattle(
+                    self.screen,
+                    self.script_dir,
+                    p1_hero=netplay.heroes[1],
+                    p2_hero=netplay.heroes[2],
+                    audio_manager=self.audio_manager,
+                    game_instance=self.game_instance,
+                    netplay=netplay
+                )
+                result = battle.run()
+        netplay.close()
+
+        self.handle_battle_result(result)
+        return result
+
+    def wait_for_opponent(self, netplay):
+        """Show a waiting screen until the other machine has connected. False if it was cancelled or failed."""
+        if self.game_instance.loading_screen is None:
+            from ui.loading_screen import LoadingScreen
+            self.game_instance.loading_screen = LoadingScreen(self.screen)
+        if netplay.is_host:
+            label = f"Waiting for Player 2 on port {netplay.address[1]}... (Esc to cancel)"
+        else:
+            label = f"Joining the match at {PVP_NETPLAY}... (Esc to cancel)"
+
+        clock = pygame.time.Clock()
+        while not netplay.ready:
+            if netplay.failed:
+                print(f"LAN match failed: {netplay.failed}")
+                return False
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.event.post(event)  # Let the main loop close the game
+                    return False
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return False
+            if self.audio_manager:
+                self.audio_manager.update()
+            self.game_instance.loading_screen.draw(0, label)
+            display.present()
+            clock.tick(30)
+        return True
+
     def handle_battle_result(self, result):
         """Handle the result of the battle."""
         if result == 1:
@@ -58,11 +123,9 @@ class PVP:
         else:
             print("Battle was interrupted or ended without a winner.")
 
-        # Restart the menu music
+        # Make sure the menu music is playing (PVPBattle already fades back to it)
         if self.audio_manager:
-            self.audio_manager.music_path = os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3")
-            if self.audio_manager.audio_enabled:
-                self.audio_manager.play_music()
+            self.audio_manager.play_track(os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3"), resume=True)
 
         # Return to the main menu or game modes screen
         if hasattr(self.game_instance, 'game_modes'):
@@ -4,13 +4,17 @@ import os
 import random
 from characters.player import Player
 from gameplay.questions import QuestionGenerator
+from managers import display
+from managers.telemetry import telemetry, FrameStats
+from managers.replay import ReplayRecorder, PVP
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, FONT_PATH
 from .pause import Pause
 from .coin_toss import CoinToss
 
 
 class PVPBattle:
-    def __init__(self, screen, script_dir, p1_hero="boy", p2_hero="girl", audio_manager=None, game_instance=None):
+    def __init__(self, screen, script_dir, p1_hero="boy", p2_hero="girl", audio_manager=None, game_instance=None,
+                 netplay=None, replay=None):
         self.screen = screen
         self.script_dir = script_dir
         self.running = True
@@ -24,6 +28,26 @@ class PVPBattle:
         self.timer_seconds = 15  # Default time for questions
         self.difficulty = 1
 
+        # Played from a recording (see managers/replay.py): its clock replaces the real one
+        self.replay = replay
+        self.now = replay.now if replay else time.time
+        self.recorder = None
+        self.paused_total = 0.0
+
+        # LAN match (see net/pvp_netplay.py): the host's game judges every answer and sends the guest the result
+        self.netplay = netplay
+        self.turn = 0
+        self.deadline = 0  # When the current turn runs out on the host, used by the guest's countdown
+        self.last_update = self.now()
+        self.mode = "lan" if netplay else "pvp"  # Telemetry
+        self.frame_stats = FrameStats()
+        self.started_at = self.now()
+        if netplay:
+            self.timer_seconds = netplay.timer_seconds
+            self.difficulty = netplay.difficulty
+        # Questions come from this seed and the turn number, a LAN match uses the seed both games share
+        self.seed = netplay.seed if netplay else replay.replay.seed if replay else random.getrandbits(32)
+
         # Initialize players with their chosen heroes
         self.player1 = Player(script_dir, p1_hero)
         self.player2 = Player(script_dir, p2_hero)
@@ -41,7 +65,7 @@ class PVPBattle:
         self.player2.image = pygame.transform.flip(self.player2.image, True, False)
 
         # Determine which player goes first with a coin toss
-        self.coin_toss = CoinToss(screen, script_dir, audio_manager, battle_instance=self)
+        self.coin_toss = CoinToss(screen, script_dir, audio_manager, battle_instance=self, netplay=netplay)
         self.first_player = None  # Will be set after coin toss
 
         # Battle state
@@ -82,8 +106,9 @@ class PVPBattle:
         return os.path.join(self.script_dir, "assets", "audio", "ost", "battle", f"pvp_battle_ost_{random_track}.mp3")
 
     def stop_battle_music(self):
-        """Stop the battle music."""
-        pygame.mixer.music.stop()
+        """Fade the battle music back into the menu music."""
+        if self.audio_manager:
+            self.audio_manager.play_track(os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3"), resume=True)
 
     def start_battle(self):
         """Start the PVP battle with a coin toss to determine first player."""
@@ -94,22 +119,46 @@ class PVPBattle:
             return
 
         self.current_player = self.first_player
+        self.started_at = self.now()
+
+        # The host's game records a LAN match, the guest's only shows it
+        if self.netplay is None or self.netplay.is_host:
+            self.recorder = ReplayRecorder(PVP, self.seed, heroes=(self.player1.player_type, self.player2.player_type),
+                                           first_player=self.first_player, difficulty=self.difficulty,
+                                           timer_seconds=self.timer_seconds)
 
-        # Play battle music
-        if self.battle_music:
-            pygame.mixer.music.load(self.battle_music)
-            pygame.mixer.music.play(-1)  # Loop the battle music
+        # Crossfade from the menu music to the battle music
+        if self.audio_manager and self.battle_music:
+            self.audio_manager.play_track(self.battle_music)
 
         # Generate the first question
         self.generate_new_question()
+        if self.netplay and self.netplay.is_host:
+            self.send_state()
+
+    def start_replay(self):
+        """Start where the recording starts, after the coin toss."""
+        replay = self.replay.replay
+        self.difficulty = replay.difficulty
+        self.timer_seconds = replay.timer_seconds
+        self.first_player = self.current_player = replay.first_player
+        self.started_at = self.now()
+        self.generate_new_question()
 
     def generate_new_question(self):
         """Generates a new question for the battle"""
-        self.current_question = QuestionGenerator.get_random_question(self.difficulty)  # Use self.difficulty
-        self.timer_start = time.time()
+        # Both games of a LAN match generate the same question for a turn from the shared seed (see NetplaySession.rng)
+        rng = random.Random(f"{self.seed}:question {self.turn}")
+        self.current_question = QuestionGenerator.get_random_question(self.difficulty, rng)  # Use self.difficulty
+        self.timer_start = self.now()
+        self.deadline = self.timer_start + self.timer_seconds
         self.time_left = self.timer_seconds  # Use self.timer_seconds
         self.selected_answer = None
         self.create_answer_buttons()
+        telemetry.emit("question", self.mode, None, self.difficulty, self.current_question.question_text,
+                       self.current_question.answer)
+        if self.recorder:
+            self.recorder.question(self.battle_time_ms(), self.current_question.question_text)
 
     def create_answer_buttons(self):
         """Creates the answer buttons based on the current question"""
@@ -149,7 +198,7 @@ class PVPBattle:
                     for button in self.answer_buttons:
                         button['hovered'] = button['rect'].collidepoint(mouse_pos)
 
-                elif event.type == pygame.MOUSEBUTTONDOWN:
+                elif event.type == pygame.MOUSEBUTTONDOWN and self.is_local_turn():
                     # Check if an answer button was clicked
                     mouse_pos = pygame.mouse.get_pos()
                     for button in self.answer_buttons:
@@ -160,81 +209,168 @@ class PVPBattle:
             # Always process pause menu events
             self.pause_menu.update(event)
 
+    def is_local_turn(self):
+        """Whether the player at this machine answers the current question."""
+        return self.netplay is None or self.current_player == self.netplay.player
+
     def check_answer(self):
         """Checks if the selected answer is correct"""
-        current = self.player1 if self.current_player == 1 else self.player2
-        opponent = self.player2 if self.current_player == 1 else self.player1
-
-        if self.selected_answer == self.current_question.answer:
-            # Correct answer - opponent takes damage
-            opponent.take_damage(1)
-            self.battle_message = f"Correct! Player {3 - self.current_player} takes damage!"
-
-            if opponent.hp <= 0:
-                self.battle_message = f"Victory! Player {self.current_player} wins!"
-                # Wait a bit before ending the battle
-                pygame.time.delay(2000)
-                self.running = False  # End the battle
-        else:
-            # Wrong answer - current player takes damage
-            current.take_damage(1)
-            self.battle_message = f"Wrong! Player {self.current_player} takes damage!"
-
-            if current.hp <= 0:
-                self.battle_message = f"Victory! Player {3 - self.current_player} wins!"
-                # Wait a bit before ending the battle
-                pygame.time.delay(2000)
-                self.running = False  # End the battle
-
-        # Set message timer
-        self.message_timer = time.time()
-
-        # Switch to the other player's turn
-        self.current_player = 3 - self.current_player  # Toggle between 1 and 2
-
-        # Generate a new question for the next player
-        self.generate_new_question()
+        if self.netplay and not self.netplay.is_host:
+            # The host judges the answer and replies with the new state
+            elapsed = self.timer_seconds - (self.deadline - self.now())
+            self.netplay.send_answer(self.turn, self.current_question.choices.index(self.selected_answer), elapsed)
+            self.answer_buttons = []
+            return
+        self.resolve_turn("correct" if self.selected_answer == self.current_question.answer else "wrong")
+
+    @staticmethod
+    def outcome_message(outcome, player):
+        if outcome == "correct":
+            return f"Correct! Player {3 - player} takes damage!"
+        if outcome == "wrong":
+            return f"Wrong! Player {player} takes damage!"
+        return f"Time's up! Player {player} takes damage!"
+
+    def resolve_turn(self, outcome):
+        """Apply the current player's answer ("correct", "wrong" or "timeout") and pass the turn."""
+        answering = self.current_player
+        if self.recorder:
+            if outcome == "timeout":
+                self.recorder.timeout(self.battle_time_ms())
+            else:
+                self.recorder.answer(self.battle_time_ms(), self.current_question.choices.index(self.selected_answer))
+        # A correct answer damages the opponent, anything else the player who answered
+        loser = self.player2 if (answering == 1) == (outcome == "correct") else self.player1
+        loser.take_damage(1)
+        telemetry.emit("answer", self.mode, None, outcome, int((self.now() - self.timer_start) * 1000), 1, loser.hp)
+        self.battle_message = self.outcome_message(outcome, answering)
+        self.message_timer = self.now()
+
+        winner = None
+        if loser.hp <= 0:
+            winner = 2 if loser is self.player1 else 1
+            self.battle_message = f"Victory! Player {winner} wins!"
+            self.running = False  # End the battle
+
+        # Switch to the other player's turn with a new question
+        self.current_player = 3 - answering
+        self.turn += 1
+        if winner is None:
+            self.generate_new_question()
+        if self.netplay:
+            self.send_state(outcome, winner)
+        if winner is not None:
+            # Wait a bit before ending the battle
+            self.pause_on_result()
 
     def update_timer(self):
         """Updates the time left to answer the question"""
-        # If paused, don't update anything
-        if self.pause_menu.is_paused():
-            return
+        now = self.now()
+        if self.netplay:
+            # A LAN match doesn't stop for the pause menu, only while the players are reconnecting
+            if not self.netplay.connected:
+                self.timer_start += now - self.last_update
+                self.deadline += now - self.last_update
+                self.paused_total += now - self.last_update
+            self.last_update = now
+            if not self.netplay.is_host:
+                # Just the countdown, the host decides when time is up
+                self.time_left = max(0, self.deadline - now)
+                return
+        else:
+            # If paused, don't update anything
+            if self.pause_menu.is_paused():
+                return
 
-        # Adjust timer for any time spent paused
-        paused_time = self.pause_menu.get_total_paused_time()
-        if paused_time > 0:
-            self.timer_start += paused_time  # Move the start time forward by paused duration
+            # Adjust timer for any time spent paused
+            paused_time = self.pause_menu.get_total_paused_time()
+            if paused_time > 0:
+                self.timer_start += paused_time  # Move the start time forward by paused duration
+                self.paused_total += paused_time
 
         # Calculate remaining time
-        elapsed = time.time() - self.timer_start
+        elapsed = now - self.timer_start
         self.time_left = max(0, self.timer_seconds - elapsed)
 
-        # If time runs out, treat as wrong answer
-        if self.time_left <= 0 and self.running:
-            current = self.player1 if self.current_player == 1 else self.player2
-
-            self.battle_message = f"Time's up! Player {self.current_player} takes damage!"
-            current.take_damage(1)
-
-            if current.hp <= 0:
-                self.battle_message = f"Victory! Player {3 - self.current_player} wins!"
-                # Wait a bit before ending the battle
-                pygame.time.delay(2000)
-                self.running = False  # End the battle
-            else:
-                # Switch to the other player's turn
-                self.current_player = 3 - self.current_player
-                # Generate a new question for the next player
-                self.generate_new_question()
-
-            # Set message timer
-            self.message_timer = time.time()
+        # If time runs out, treat as wrong answer. The guest's answer takes a moment to get here, so wait that much longer.
+        # A replay times out when the recording did
+        limit = self.timer_seconds if self.is_local_turn() else self.timer_seconds + self.netplay.grace()
+        if elapsed >= limit and self.running and not self.replay:
+            self.time_out()
+
+    def time_out(self):
+        self.resolve_turn("timeout")
+
+    def pause_on_result(self):
+        """Keep the final message on screen for a moment, except when a replay is fast-forwarded."""
+        if not (self.replay and self.replay.headless):
+            pygame.time.delay(2000)
+
+    def battle_time_ms(self):
+        """Time since the coin toss, not counting time spent paused or reconnecting. Replays are timed with it."""
+        paused = self.paused_total + self.pause_menu.total_paused_time
+        return int((self.now() - self.started_at - paused) * 1000)
+
+    def replay_result(self):
+        """The winning player, 0 while undecided."""
+        return 1 if self.player2.hp <= 0 else 2 if self.player1.hp <= 0 else 0
+
+    def send_state(self, outcome=None, winner=None):
+        """Host: tell the guest's game where the match stands."""
+        time_left = max(0, self.timer_seconds - (self.now() - self.timer_start))
+        self.netplay.send_state(self.turn, self.current_player, self.player1.hp, self.player2.hp, outcome, winner, time_left)
+
+    def update_netplay(self):
+        """Exchange answers and state with the other player's game."""
+        net = self.netplay
+        if net.failed:
+            self.battle_message = net.failed
+            self.message_timer = self.now()
+            self.running = False
+            return
+        if not net.connected:
+            self.battle_message = "Connection lost, reconnecting..."
+            self.message_timer = self.now()
+
+        if net.is_host:
+            if net.take_resync():
+                self.send_state()
+            answer = net.take_answer(self.turn)
+            if answer and not self.is_local_turn():
+                choice, claimed, received_at = answer
+                if net.answer_time(claimed, received_at - self.timer_start) > self.timer_seconds:
+                    self.resolve_turn("timeout")
+                elif 0 <= choice < len(self.current_question.choices):
+                    self.selected_answer = self.current_question.choices[choice]
+                    self.check_answer()
+        else:
+            state = net.take_state()
+            if state:
+                self.apply_state(state)
+
+    def apply_state(self, state):
+        """Guest: show the state the host sent."""
+        turn, current_player, p1_hp, p2_hp, outcome, winner, time_left, received_at = state
+        self.player1.hp, self.player2.hp = p1_hp, p2_hp
+        if outcome:
+            self.battle_message = self.outcome_message(outcome, 3 - current_player)
+            self.message_timer = self.now()
+        if winner:
+            self.battle_message = f"Victory! Player {winner} wins!"
+            self.running = False
+            self.pause_on_result()
+            return
+        self.current_player = current_player
+        if turn != self.turn:
+            self.turn = turn
+            self.generate_new_question()
+        # The state spent about half a round trip on the way here
+        self.deadline = received_at + time_left - self.netplay.rtt / 2
 
     def draw_background_for_coin_toss(self):
         """Draws only the background for the coin toss, without UI elements that need game state."""
         # Draw background
-        self.screen.fill((50, 50, 100))
+        display.clear((50, 50, 100))
 
         # Draw players with their correct positions
         self.player1.draw(self.screen)
@@ -246,8 +382,13 @@ class PVPBattle:
 
     def draw(self):
         """Draws the battle screen"""
+        # While paused only the menu changes, drawn over a cached snapshot of the battle
+        if self.pause_menu.has_backdrop():
+            self.pause_menu.draw()
+            return
+
         # Draw background
-        self.screen.fill((50, 50, 100))
+        display.clear((50, 50, 100))
 
         # Draw players in their proper positions
         self.player1.draw(self.screen)
@@ -286,7 +427,7 @@ class PVPBattle:
                 self.screen.blit(text, text_rect)
 
         # Draw battle message
-        if self.battle_message and time.time() - self.message_timer < 2:
+        if self.battle_message and self.now() - self.message_timer < 2:
             message_text = self.font.render(self.battle_message, True, (255, 255, 0))
             message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
             pygame.draw.rect(self.screen, (0, 0, 0),(message_rect.x - 10, message_rect.y - 10, message_rect.width + 20, message_rect.height + 20))
@@ -336,33 +477,35 @@ class PVPBattle:
             self.handle_events()
 
             # Update timer
+            if self.netplay:
+                self.update_netplay()
             self.update_timer()
+            if self.audio_manager:
+                self.audio_manager.update()
 
             # Draw battle
             self.draw()
 
             # Update display
-            pygame.display.flip()
+            display.present()
 
             # Cap the frame rate
             self.clock.tick(FPS)
+            self.frame_stats.add(self.clock)
 
-        # Stop battle music when the battle ends
+        # Back to the menu music when the battle ends
         self.stop_battle_music()
 
-        # Explicitly restart menu music if game_instance is available
-        if self.game_instance and hasattr(self.game_instance, 'audio_manager'):
-            self.game_instance.audio_manager.music_path = os.path.join(self.script_dir, "assets", "audio", "ost",
-                                                                       "menuOst.mp3")
-            if hasattr(self.game_instance.audio_manager,
-                       'audio_enabled') and self.game_instance.audio_manager.audio_enabled:
-                self.game_instance.audio_manager.play_music()
-                print("Menu music restarted in battle class")
-
         # Return result (1 for player 1 victory, 2 for player 2 victory)
         if self.player2.hp <= 0:
-            return 1
+            result = 1
         elif self.player1.hp <= 0:
-            return 2
+            result = 2
         else:
-            return None  # Battle was interrupted
\ No newline at end of file
+            result = None  # Battle was interrupted
+        telemetry.emit("battle_end", self.mode, None, f"player {result}" if result else "quit", None,
+                       int((self.now() - self.started_at) * 1000), *self.frame_stats.values())
+        if self.recorder:
+            self.recorder.end(self.battle_time_ms(), self.replay_result())
+            self.recorder.save(self.script_dir)
+        return result
\ No newline at end of file
@@ -13,11 +13,18 @@ class Question:
         return user_answer == self.answer
 
 class MathQuestion(Question):
-    def __init__(self, difficulty=1):
+    def __init__(self, difficulty=1, rng=None, operation=None):
         super().__init__()
         self.difficulty = difficulty
+        self.operation = operation  # Picked at random from the difficulty's operations if None
+        self.rng = rng or random  # A seeded random.Random gives the same question on every machine
         self.generate_question()
 
+    @staticmethod
+    def operations(difficulty):
+        """The operations asked at a difficulty: no division at difficulty 1."""
+        return ['+', '-', '*'] if difficulty == 1 else ['+', '-', '*', '/']
+
     def generate_question(self):
         """Generates a random math question based on difficulty"""
         # Select operation
@@ -31,27 +38,26 @@ class MathQuestion(Question):
         # Adjust ranges based on difficulty
         if self.difficulty == 1:
             num_range = (1, 10)
-            ops = ['+', '-', '*']
         elif self.difficulty == 2:
             num_range = (1, 20)
-            ops = ['+', '-', '*', '/']
         else:
             num_range = (1, 100)
-            ops = ['+', '-', '*', '/']
+        ops = self.operations(self.difficulty)
 
         # Select operation
-        op_symbol = random.choice(ops)
+        op_symbol = self.operation or self.rng.choice(ops)
+        self.operation = op_symbol
         operation = operations[op_symbol]
 
         # Generate numbers
-        num1 = random.randint(*num_range)
+        num1 = self.rng.randint(*num_range)
 
         # For division, ensure we get clean integer results
         if op_symbol == '/':
-            num2 = random.randint(1, 10)
-            num1 = num2 * random.randint(1, 10)
+            num2 = self.rng.randint(1, 10)
+            num1 = num2 * self.rng.randint(1, 10)
         else:
-            num2 = random.randint(*num_range)
+            num2 = self.rng.randint(*num_range)
 
         # Calculate answer
         result = operation(num1, num2)
@@ -74,8 +80,8 @@ class MathQuestion(Question):
         # Generate 3 wrong answers
         while len(self.choices) < 4:
             # Create wrong answers that are close to the correct one
-            offset = random.randint(1, max(5, abs(self  .answer) // 2))
-            if random.choice([True, False]):
+            offset = self.rng.randint(1, max(5, abs(self  .answer) // 2))
+            if self.rng.choice([True, False]):
                 wrong_answer = self.answer + offset
             else:
                 wrong_answer = self.answer - offset
@@ -84,15 +90,45 @@ class MathQuestion(Question):
                 self.choices.append(wrong_answer)
 
         # Shuffle choices
-        random.shuffle(self.choices)
+        self.rng.shuffle(self.choices)
 
         # Find the index of the correct answer
         self.correct_choice = self.choices.index(self.answer)
 
 
+class CustomQuestion(Question):
+    def __init__(self, entry, other_answers=()):
+        """A question from a custom set ({"question": ..., "answer": ...}).
+
+        Wrong choices are taken from the answers of the other questions in the set.
+        """
+        super().__init__()
+        self.question_text = entry["question"]
+        self.answer = entry["answer"]
+
+        wrong_answers = [a for a in dict.fromkeys(other_answers) if a != self.answer]
+        self.choices = [self.answer] + random.sample(wrong_answers, min(3, len(wrong_answers)))
+        random.shuffle(self.choices)
+        self.correct_choice = self.choices.index(self.answer)
+
+
 class QuestionGenerator:
     @staticmethod
-    def get_random_question(difficulty=1):
-        """Factory method to get a random question"""
+    def get_random_question(difficulty=1, rng=None, learner=None):
+        """Factory method to get a random question
+
+        With a learner (see managers/learner_model.py) the operation and number range are
+        chosen for that student among the operations of `difficulty`, which is then the
+        lowest range to use.
+        """
         # Currently only generates math questions, but can be expanded
-        return MathQuestion(difficulty)
\ No newline at end of file
+        if learner is not None:
+            operation, difficulty = learner.pick(rng or random, difficulty, MathQuestion.operations(difficulty))
+            return MathQuestion(difficulty, rng, operation)
+        return MathQuestion(difficulty, rng)
+
+    @staticmethod
+    def get_custom_question(question_set):
+        """A random question from a custom question set"""
+        entry = random.choice(question_set)
+        return CustomQuestion(entry, [q["answer"] for q in question_set])
\ No newline at end of file
@@ -1,47 +1,145 @@
+import time
+
+STARTUP_TIME = time.perf_counter()
+
 import pygame
 import os
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
 from managers.audio_manager import AudioManager
+from managers.asset_manager import assets
+from managers.game_clock import FramePacer
+from managers import display
+from managers.display import create_display
+from managers.save_manager import save_manager
+from managers.sync_queue import sync_queue
+from managers.password_hasher import password_hasher
+from managers.leaderboard import leaderboard
+from managers.telemetry import telemetry
+from managers.learner_model import learner_model
 from ui.menu_background import MenuBackground
 from ui.main_menu import MainMenu
-from ui.game_modes import GameModes
-from ui.hero_selection import HeroSelection
-from ui.pvp_hero_selection import PVPHeroSelection
-from maps.map import Map
-from gameplay.battle import Battle
-from gameplay.pvp import PVP
-from gameplay.custom import CustomMode
 
 class FinalQuiztasy:
     def __init__(self):
+        # Startup timing report, printed once the first menu frame is on screen
+        self.startup_marks = [("imports", time.perf_counter())]
+        self.startup_reported = False
+
         pygame.init()
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption('Final Quiztasy')
+        self.screen = create_display('Final Quiztasy')
 
         # Set window icon
         icon_path = os.path.join(self.script_dir, "images", "logo", "logo.png")
         if os.path.exists(icon_path):
             window_icon = pygame.image.load(icon_path)
             pygame.display.set_icon(window_icon)
+        assets.init_atlases(self.script_dir)
+        self.mark_startup("display")
 
         # Game state
         self.running = True
 
-        # Initialize game components
+        # Initialize game components. Only the main menu is built up front, every other
+        # screen is created the first time it is needed (see get_screen)
+        self.screens = {}
         self.setup_background()
+        self.mark_startup("background")
         self.setup_audio()
+        self.mark_startup("audio")
         self.main_menu = MainMenu(self.screen, self.audio_manager, self.script_dir, exit_callback=self.exit_game, game_instance=self)
-        self.hero_selection = HeroSelection(self, self.background_menu)
-        self.pvp_hero_selection = PVPHeroSelection(self, self.background_menu)
-        self.game_modes = GameModes(self.screen, self.audio_manager, self.script_dir, scale=1.0, game_instance=self)
-        self.custom_mode = CustomMode(self.screen, self.audio_manager, self.script_dir, game_instance=self)
+        self.mark_startup("main menu")
+        save_manager.init(self.script_dir, self.main_menu.auth_manager)
+        sync_queue.init(self.script_dir, self.main_menu.auth_manager)
+        password_hasher.init(self.script_dir)
+        leaderboard.init(self.main_menu.auth_manager)
+        telemetry.init(self.script_dir, self.main_menu.auth_manager)
+        learner_model.init(self.script_dir, self.main_menu.auth_manager)
+        self.save_data = None  # Set by "Continue" in the game modes menu
         self.lspu_map = None
         self.battle = None
-        self.pvp = PVP(self)
+        self.loading_screen = None
 
         # Clock for controlling frame rate
-        self.clock = pygame.time.Clock()
+        self.clock = FramePacer()  # Drops the menus to a low frame rate while idle
+
+    def mark_startup(self, label):
+        """Record how long startup took to reach this point."""
+        self.startup_marks.append((label, time.perf_counter()))
+
+    def report_startup(self):
+        """Print the startup timing report."""
+        print("Startup timing:")
+        previous = STARTUP_TIME
+        for label, timestamp in self.startup_marks:
+            print(f"  {label:<12} {(timestamp - previous) * 1000:7.1f} ms")
+            previous = timestamp
+        print(f"  {'total':<12} {(previous - STARTUP_TIME) * 1000:7.1f} ms")
+        telemetry.emit("scene", "startup", round((previous - STARTUP_TIME) * 1000, 1))
+        self.startup_reported = True
+
+    def create_screen(self, name):
+        """Build one of the lazily created screens."""
+        if name == "hero_selection":
+            from ui.hero_selection import HeroSelection
+            return HeroSelection(self, self.background_menu)
+        if name == "pvp_hero_selection":
+            from ui.pvp_hero_selection import PVPHeroSelection
+            return PVPHeroSelection(self, self.background_menu)
+        if name == "game_modes":
+            from ui.game_modes import GameModes
+            return GameModes(self.screen, self.audio_manager, self.script_dir, scale=1.0, game_instance=self)
+        if name == "custom_mode":
+            from gameplay.custom import CustomMode
+            return CustomMode(self.screen, self.audio_manager, self.script_dir, game_instance=self)
+        if name == "pvp":
+            from gameplay.pvp import PVP
+            return PVP(self)
+        if name == "classroom":
+            from gameplay.classroom import Classroom
+            return Classroom(self)
+        raise KeyError(name)
+
+    def get_screen(self, name):
+        """Return a screen, building it the first time it is requested."""
+        if name not in self.screens:
+            start = time.perf_counter()
+            self.screens[name] = self.create_screen(name)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"Built {name} in {elapsed_ms:.1f} ms")
+            telemetry.emit("scene", name, round(elapsed_ms, 1))
+        return self.screens[name]
+
+    def visible_screen(self, name):
+        """Return the screen if it has already been built and is visible, without building it."""
+        screen = self.screens.get(name)
+        if screen is not None and screen.visible:
+            return screen
+        return None
+
+    @property
+    def hero_selection(self):
+        return self.get_screen("hero_selection")
+
+    @property
+    def pvp_hero_selection(self):
+        return self.get_screen("pvp_hero_selection")
+
+    @property
+    def game_modes(self):
+        return self.get_screen("game_modes")
+
+    @property
+    def custom_mode(self):
+        return self.get_screen("custom_mode")
+
+    @property
+    def pvp(self):
+        return self.get_screen("pvp")
+
+    @property
+    def classroom(self):
+        return self.get_screen("classroom")
 
     def setup_background(self):
         # Initialize background video
@@ -63,30 +161,50 @@ class FinalQuiztasy:
         if not hasattr(self, "selected_hero") or not self.selected_hero:
             self.selected_hero = "boy"  # Default to boy if no hero was selected
 
-        # Stop the main menu music
-        if self.audio_manager:
-            self.audio_manager.stop_music()
+        # Crossfade from the main menu music to the hero's map OST
+        menu_ost_path = os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3")
+        self.audio_manager.play_track(hero_ost_path, resume=True)
+        self.audio_manager.prepare_track(menu_ost_path)
 
-        # Update the AudioManager with the new OST instead of creating a new instance
-        self.audio_manager.music_path = hero_ost_path
-        if self.audio_manager.audio_enabled:
-            self.audio_manager.play_music()
+        # Make sure the map assets (usually preloaded during hero selection) are ready
+        self.show_loading(assets.preload("map", self.script_dir, hero=self.selected_hero))
 
         # Create the LSPU map
+        from maps.map import Map
         self.lspu_map = Map(self.screen, self.script_dir, self.return_to_main_menu, self.audio_manager, self.selected_hero, game_instance=self)
         self.hero_selection.hide()
         self.lspu_map.run()
 
-        # Stop hero-specific map music when exiting
-        self.audio_manager.stop_music()
+        # Back to the main menu music when exiting
+        self.audio_manager.play_track(menu_ost_path, resume=True)
 
-        # Resume main menu music when returning
-        self.audio_manager.music_path = os.path.join(self.script_dir, "assets", "audio", "ost", "menuOst.mp3")
-        if self.audio_manager.audio_enabled:
-            self.audio_manager.play_music()
+    def continue_game(self, save):
+        """Load the map with the hero and unlocked levels from a save."""
+        self.selected_hero = save.hero
+        self.save_data = save
+        hero_ost_path = os.path.join(self.script_dir, "assets", "audio", "ost", save.hero, f"{save.hero}_map_ost.mp3")
+        self.map(hero_ost_path)
+
+    def show_loading(self, scene_key, label="Loading..."):
+        """Show a loading screen until every asset of a preloaded scene is ready."""
+        if assets.is_ready(scene_key):
+            return
+        if self.loading_screen is None:
+            from ui.loading_screen import LoadingScreen
+            self.loading_screen = LoadingScreen(self.screen)
+        start = time.perf_counter()
+        while not assets.is_ready(scene_key):
+            pygame.event.pump()
+            assets.update(budget_ms=12)
+            self.audio_manager.update()
+            self.loading_screen.draw(assets.progress(scene_key), label)
+            display.present()
+            self.clock.tick(animating=True)
+        telemetry.emit("scene", f"loading {scene_key[0]}", round((time.perf_counter() - start) * 1000, 1))
 
     def start_battle(self, level, player_type):
         """Starts the battle when entering a level"""
+        from gameplay.battle import Battle
         self.battle = Battle(self.screen, self.script_dir, level, player_type, self.audio_manager, game_instance=self)
         self.battle.run()
 
@@ -103,46 +221,54 @@ class FinalQuiztasy:
 
     def handle_events(self):
         for event in pygame.event.get():
+            self.clock.note_event(event)
             if event.type == pygame.QUIT:
                 self.running = False
             # Pass events to the appropriate screen based on visibility
-            if hasattr(self, 'hero_selection') and self.hero_selection.visible:
-                self.hero_selection.update(event)
-            elif hasattr(self, 'pvp_hero_selection') and self.pvp_hero_selection.visible:
-                self.pvp_hero_selection.update(event)
-            elif hasattr(self, 'custom_mode') and self.custom_mode.visible:  # Add this check
-                self.custom_mode.update(event)
-            elif hasattr(self, 'game_modes') and self.game_modes.visible:
-                self.game_modes.update(event)
+            active_screen = self.active_screen()
+            if active_screen:
+                active_screen.update(event)
             else:
                 self.main_menu.handle_events(event)
 
     def draw(self):
         # Draw background
-        frame_surface = self.background_menu.get_frame()
-        frame_surface = pygame.transform.scale(frame_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.screen.blit(frame_surface, (0, 0))
+        frame_surface = self.background_menu.get_frame(self.clock.frame_scale())
+        display.draw_background(frame_surface, size=(SCREEN_WIDTH, SCREEN_HEIGHT), static=False)
 
         # Draw the appropriate UI screen based on visibility
-        if hasattr(self, 'hero_selection') and self.hero_selection.visible:
-            self.hero_selection.draw()
-        elif hasattr(self, 'pvp_hero_selection') and self.pvp_hero_selection.visible:
-            self.pvp_hero_selection.draw()
-        elif hasattr(self, 'custom_mode') and self.custom_mode.visible:  # Add this check
-            self.custom_mode.draw()
-        elif hasattr(self, 'game_modes') and self.game_modes.visible:
-            self.game_modes.draw()
+        active_screen = self.active_screen()
+        if active_screen:
+            active_screen.draw()
         else:
             self.main_menu.draw()
 
+    def active_screen(self):
+        """Return the visible screen that should receive events and drawing, if any."""
+        for name in ("hero_selection", "pvp_hero_selection", "custom_mode", "game_modes"):
+            screen = self.visible_screen(name)
+            if screen:
+                return screen
+        return None
+
     def run(self):
         # Main game loop
         while self.running:
             self.handle_events()
             self.draw()
-            pygame.display.update()
-            self.clock.tick(FPS)
+            display.present()
+            # Finish any background preloading in small slices
+            assets.update()
+            self.audio_manager.update()
+            if not self.startup_reported:
+                self.mark_startup("first frame")
+                self.report_startup()
+            # Full frame rate while assets stream in or music fades, otherwise idle when nobody is playing
+            self.clock.tick(animating=assets.is_busy() or self.audio_manager.is_fading())
         # Clean up resources
+        save_manager.flush()  # Don't lose an autosave that hasn't been written yet
+        telemetry.flush()
+        password_hasher.shutdown()
         self.background_menu.close()
         pygame.quit()
 
@@ -0,0 +1,335 @@
+import io
+import os
+import queue
+import threading
+import time
+import pygame
+from managers.atlas import AtlasIndex
+from managers.level_data import get_level_table
+
+
+def _asset(script_dir, *parts):
+    return os.path.join(script_dir, "assets", *parts)
+
+
+def _pause_menu_images(script_dir):
+    """Images used by the battle pause menu (see gameplay/pause.py)."""
+    pause_dir = ("images", "battle", "pause")
+    paths = [
+        _asset(script_dir, *pause_dir, "pause", "pause_icon_img.png"),
+        _asset(script_dir, *pause_dir, "pause", "pause_icon_hover.png"),
+        _asset(script_dir, *pause_dir, "pause_border.png"),
+        _asset(script_dir, *pause_dir, "confirmation", "yesorno_border.png"),
+    ]
+    for name in ("menu", "map", "resume"):
+        paths.append(_asset(script_dir, *pause_dir, name, f"{name}_icon_img.png"))
+        paths.append(_asset(script_dir, *pause_dir, name, f"{name}_icon_hover.png"))
+    for name in ("yes", "no"):
+        paths.append(_asset(script_dir, *pause_dir, "confirmation", f"{name}_btn_img.png"))
+        paths.append(_asset(script_dir, *pause_dir, "confirmation", f"{name}_btn_hover.png"))
+    return paths
+
+
+def map_manifest(script_dir, hero="boy"):
+    """Everything the LSPU map needs for the given hero."""
+    images = [_asset(script_dir, "images", "map", "lspu_map.png")]
+    images += [_asset(script_dir, "images", "levels", f"{name}.png")
+               for _, name, _, _, _ in get_level_table(script_dir).stage_rows()]
+
+    animation_dir = ("images", "map", "animation", hero)
+    for folder, frames in (("back and walk", ["back_stand", "back_walkl", "back_walkr"]),
+                           ("front and walk", ["front_stand", "front_walkl", "front_walkr"]),
+                           ("sideway and walk", ["left_stand", "left_walk", "right_stand", "right_walk"])):
+        images += [_asset(script_dir, *animation_dir, folder, f"{hero}_{frame}.png") for frame in frames]
+
+    images += [
+        _asset(script_dir, "images", "buttons", "enter level", "enter_btn_img.png"),
+        _asset(script_dir, "images", "buttons", "enter level", "enter_btn_hover.png"),
+        _asset(script_dir, "images", "buttons", "back button", "back_btn_img.png"),
+        _asset(script_dir, "images", "buttons", "back button", "back_btn_hover.png"),
+    ]
+    music = [_asset(script_dir, "audio", "ost", hero, f"{hero}_map_ost.mp3")]
+    return {"images": images, "sounds": [], "music": music}
+
+
+def battle_manifest(script_dir, hero="boy"):
+    """Everything a single player battle needs for the given hero."""
+    images = [
+        _asset(script_dir, "images", "battle", "backgrounds", "level1_bg.png"),
+        _asset(script_dir, "images", "battle", hero, f"{hero}_stand.png"),
+    ]
+    images += [_asset(script_dir, "images", "battle", "enemy", "mini", f"mini_{i}.png") for i in range(1, 20)]
+    images += _pause_menu_images(script_dir)
+    music = [_asset(script_dir, "audio", "ost", "battle", f"{hero}_battle_ost.mp3")]
+    return {"images": images, "sounds": [], "music": music}
+
+
+def coin_toss_manifest(script_dir):
+    """Coin images and flip sound used by the PVP coin toss."""
+    return {
+        "images": [_asset(script_dir, "images", "coin", "heads.png"),
+                   _asset(script_dir, "images", "coin", "tails.png")],
+        "sounds": [_asset(script_dir, "audio", "sfx", "coin_flip.mp3")],
+        "music": [],
+    }
+
+
+def pvp_battle_manifest(script_dir, p1_hero="boy", p2_hero="girl"):
+    """Both heroes, the coin toss and the PVP battle OSTs."""
+    coin_toss = coin_toss_manifest(script_dir)
+    images = [_asset(script_dir, "images", "battle", hero, f"{hero}_stand.png") for hero in {p1_hero, p2_hero}]
+    images += coin_toss["images"] + _pause_menu_images(script_dir)
+    music = [_asset(script_dir, "audio", "ost", "battle", f"pvp_battle_ost_{i}.mp3") for i in range(1, 4)]
+    return {"images": images, "sounds": coin_toss["sounds"], "music": music}
+
+
+SCENE_MANIFESTS = {
+    "map": map_manifest,
+    "battle": battle_manifest,
+    "coin_toss": coin_toss_manifest,
+    "pvp_battle": pvp_battle_manifest,
+}
+
+
+class AssetManager:
+    """Shared cache of images, sounds and music files with background preloading.
+
+    A loader thread reads files and decodes images into plain surfaces. The main
+    thread finishes the work in small slices from update(): converting surfaces to
+    the display format and creating mixer Sounds. Anything requested before it has
+    been preloaded is simply loaded synchronously, so callers never have to care
+    whether a scene was preloaded.
+
+    Images packed into a texture atlas (see managers/atlas.py) are returned as
+    subsurfaces of their sheet, so each sheet is opened and converted only once.
+
+    Scaled and flipped copies (battle backgrounds, enemy and hero sprites) are
+    cached too, and can be prefetched so they are built in spare frame time
+    instead of when a battle starts.
+    """
+    def __init__(self):
+        self.images = {}  # path -> converted surface
+        self.sounds = {}  # path -> pygame.mixer.Sound
+        self.music = {}  # path -> raw file bytes
+        self.derived = {}  # (path, size, scale, flip_x) -> scaled surface
+        self.derived_jobs = {}  # derived key -> (path, size, scale, flip_x) waiting for update()
+        self.scenes = {}  # scene key -> list of (kind, path)
+        self.failed = set()
+        self.released = set()  # sounds handed over to the sound bank
+        self.atlas = None
+        self.script_dir = None
+
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.decoded = queue.Queue()  # (kind, path, payload) waiting for the main thread
+        self.pending = set()
+        self.loader = None
+
+    @staticmethod
+    def normalize(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def init_atlases(self, script_dir):
+        """Load the texture atlas index if the atlases have been built."""
+        self.script_dir = script_dir
+        self.atlas = AtlasIndex.load(script_dir)
+        if self.atlas:
+            print(f"Using texture atlases ({len(self.atlas.sprites)} sprites in {len(self.atlas.pages)} sheets)")
+
+    def source_path(self, path):
+        """The file that actually has to be read for an image: its atlas sheet, if it has one."""
+        if self.atlas:
+            entry = self.atlas.lookup(path)
+            if entry:
+                return entry[0]
+        return path
+
+    def scene_key(self, scene, **params):
+        return (scene,) + tuple(sorted(params.items()))
+
+    # ----- Preloading -----
+
+    def preload(self, scene, script_dir, **params):
+        """Queue every asset in a scene's manifest for background loading."""
+        key = self.scene_key(scene, **params)
+        if key in self.scenes:
+            return key
+
+        manifest = SCENE_MANIFESTS[scene](script_dir, **params)
+        entries = [("images", self.normalize(self.source_path(path))) for path in manifest["images"]]
+        for kind in ("sounds", "music"):
+            entries += [(kind, self.normalize(path)) for path in manifest[kind]]
+        # Several sprites can share one atlas sheet
+        self.scenes[key] = entries = list(dict.fromkeys(entries))
+        self.queue_files(entries)
+        return key
+
+    def preload_music(self, path):
+        """Read a single music track into memory in the background."""
+        self.queue_files([("music", self.normalize(path))])
+
+    def queue_files(self, entries):
+        with self.lock:
+            for kind, path in entries:
+                if path in self.pending or self.is_loaded(kind, path):
+                    continue
+                self.pending.add(path)
+                self.requests.put((kind, path))
+        self.start_loader()
+
+    def start_loader(self):
+        # One loader for the whole run. It blocks on the queue while idle, so a request can
+        # never arrive between it deciding to exit and the check for a live loader
+        with self.lock:
+            if self.loader is None or not self.loader.is_alive():
+                self.loader = threading.Thread(target=self.loader_loop, daemon=True)
+                self.loader.start()
+
+    def loader_loop(self):
+        """Background thread: read files and decode images as they are requested."""
+        while True:
+            kind, path = self.requests.get()
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                payload = pygame.image.load(io.BytesIO(data), path) if kind == "images" else data
+                self.decoded.put((kind, path, payload))
+            except (OSError, pygame.error) as e:
+                print(f"Could not preload {path}: {e}")
+                with self.lock:
+                    self.pending.discard(path)
+                    self.failed.add(path)
+
+    def update(self, budget_ms=4):
+        """Finish decoded assets on the main thread, stopping once the time budget is used up."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while time.perf_counter() < deadline:
+            try:
+                kind, path, payload = self.decoded.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                if kind == "images":
+                    self.images[path] = self.convert(payload)
+                elif kind == "sounds":
+                    self.sounds[path] = pygame.mixer.Sound(file=io.BytesIO(payload))
+                else:
+                    self.music[path] = payload
+            except pygame.error as e:
+                print(f"Could not preload {path}: {e}")
+                self.failed.add(path)
+            with self.lock:
+                self.pending.discard(path)
+        self.build_derived(deadline)
+
+    def build_derived(self, deadline):
+        """Build prefetched scaled images whose source has finished loading."""
+        for key, job in list(self.derived_jobs.items()):
+            if time.perf_counter() >= deadline:
+                break
+            if self.normalize(self.source_path(job[0])) in self.pending:
+                continue
+            del self.derived_jobs[key]
+            try:
+                self.load_scaled(*job)
+            except (OSError, pygame.error) as e:
+                print(f"Could not prefetch {job[0]}: {e}")
+
+    def is_loaded(self, kind, path):
+        return path in getattr(self, kind) or path in self.failed or path in self.released
+
+    def progress(self, key):
+        """Fraction (0.0 - 1.0) of a preloaded scene that is ready to use."""
+        entries = self.scenes.get(key)
+        if not entries:
+            return 1.0
+        done = sum(1 for kind, path in entries if self.is_loaded(kind, path))
+        return done / len(entries)
+
+    def is_busy(self):
+        """True while anything is still being loaded in the background."""
+        return bool(self.pending or self.derived_jobs)
+
+    def is_ready(self, key):
+        return self.progress(key) >= 1.0
+
+    # ----- Access -----
+
+    def convert(self, surface):
+        """Convert a surface to the display format if a display exists."""
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha()
+
+    def load_image(self, path):
+        """Return a shared surface for the image. Don't draw onto or modify it."""
+        key = self.normalize(path)
+        image = self.images.get(key)
+        if image is None:
+            entry = self.atlas.lookup(path) if self.atlas else None
+            if entry:
+                sheet_path, rect = entry
+                image = self.load_image(sheet_path).subsurface(rect)
+            else:
+                image = self.convert(pygame.image.load(path))
+            self.images[key] = image
+        return image
+
+    def load_scaled(self, path, size=None, scale=None, flip_x=False):
+        """Return a shared scaled (and optionally mirrored) copy of an image.
+
+        Pass either an exact size or a scale factor. Don't draw onto the result.
+        """
+        key = (self.normalize(path), size, scale, flip_x)
+        image = self.derived.get(key)
+        if image is None:
+            image = self.load_image(path)
+            if scale is not None:
+                size = (int(image.get_width() * scale), int(image.get_height() * scale))
+            if size is not None:
+                image = pygame.transform.scale(image, size)
+            if flip_x:
+                image = pygame.transform.flip(image, True, False)
+            self.derived[key] = image
+        return image
+
+    def prefetch_scaled(self, path, size=None, scale=None, flip_x=False):
+        """Queue a scaled copy to be built by update() once its source image is loaded."""
+        key = (self.normalize(path), size, scale, flip_x)
+        if key in self.derived or key in self.derived_jobs:
+            return
+        self.queue_files([("images", self.normalize(self.source_path(path)))])
+        self.derived_jobs[key] = (path, size, scale, flip_x)
+
+    def get_sprite(self, name):
+        """Look up an image by its path relative to assets/images, e.g. "coin/heads.png"."""
+        return self.load_image(os.path.join(self.script_dir, "assets", "images", *name.split("/")))
+
+    def load_sound(self, path):
+        """Return a shared Sound for the file, decoding it once."""
+        key = self.normalize(path)
+        sound = self.sounds.get(key)
+        if sound is None:
+            sound = pygame.mixer.Sound(path)
+            self.sounds[key] = sound
+        return sound
+
+    def take_sound(self, path):
+        """Hand a preloaded Sound over to the caller and drop it from this cache, or return None."""
+        key = self.normalize(path)
+        sound = self.sounds.pop(key, None)
+        if sound is not None:
+            self.released.add(key)
+        return sound
+
+    def load_music(self, path):
+        """Load a music track into pygame.mixer.music, from memory if it was preloaded."""
+        data = self.music.get(self.normalize(path))
+        if data is not None:
+            pygame.mixer.music.load(io.BytesIO(data), os.path.splitext(path)[1].lstrip("."))
+        else:
+            pygame.mixer.music.load(path)
+
+
+# Shared by every scene
+assets = AssetManager()
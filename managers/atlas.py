@@ -0,0 +1,169 @@
+# Texture atlas builder and index.
+#
+# Build the sheets once after changing any of the images below:
+#
+#   python -m managers.atlas
+#
+# This writes assets/atlases/<group>_<page>.png plus assets/atlases/index.json.
+# At runtime AssetManager.load_image() transparently returns a subsurface of the
+# right sheet for any image listed in the index, and falls back to the single PNG
+# when the atlases haven't been built.
+import glob
+import json
+import os
+import sys
+import pygame
+
+ATLAS_VERSION = 1
+MAX_PAGE_SIZE = 4096
+PADDING = 2
+
+# Group name -> globs relative to assets/images. Each group is packed into its own
+# sheets so a screen only loads the sheets it actually uses.
+ATLAS_GROUPS = {
+    "map_boy": ["map/animation/boy/**/*.png"],
+    "map_girl": ["map/animation/girl/**/*.png"],
+    "enemy_mini": ["battle/enemy/mini/*.png"],
+    "levels": ["levels/*.png"],
+    "coin": ["coin/*.png"],
+    "pause": ["battle/pause/**/*.png"],
+    "menu": ["buttons/menu/*.png", "buttons/back button/*.png", "buttons/exit/*.png",
+             "buttons/settings/*.png", "buttons/enter level/*.png"],
+    "game_modes": ["buttons/game modes/**/*.png"],
+}
+
+# Large dialog panels are loaded on their own, packing them would only waste sheet space
+EXCLUDED_KEYWORDS = ("border",)
+
+
+def images_dir(script_dir):
+    return os.path.join(script_dir, "assets", "images")
+
+
+def atlas_dir(script_dir):
+    return os.path.join(script_dir, "assets", "atlases")
+
+
+def sprite_name(script_dir, path):
+    """Name of an image inside the index: its path relative to assets/images, with forward slashes."""
+    return os.path.relpath(os.path.abspath(path), images_dir(script_dir)).replace(os.sep, "/")
+
+
+def collect_group(script_dir, patterns):
+    """Sorted list of sprite names matched by a group's glob patterns."""
+    names = set()
+    for pattern in patterns:
+        for path in glob.glob(os.path.join(images_dir(script_dir), pattern), recursive=True):
+            name = sprite_name(script_dir, path)
+            if not any(keyword in os.path.basename(name) for keyword in EXCLUDED_KEYWORDS):
+                names.add(name)
+    return sorted(names)
+
+
+def pack_shelves(sizes, max_size=MAX_PAGE_SIZE, padding=PADDING):
+    """Pack rectangles into as few pages as possible using a simple shelf packer.
+
+    Returns (placements, page_sizes) where placements[i] is (page, x, y) for sizes[i].
+    Tallest rectangles go first so each shelf wastes little height.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True)
+    placements = [None] * len(sizes)
+    page_sizes = []
+    page = -1
+    x = y = shelf_height = page_width = 0
+
+    for i in order:
+        width, height = sizes[i]
+        if width + padding > max_size or height + padding > max_size:
+            raise ValueError(f"Image of size {width}x{height} does not fit in a {max_size}px atlas page")
+
+        if page < 0 or x + width + padding > max_size:
+            # Start a new shelf, and a new page if the shelf doesn't fit
+            y += shelf_height
+            x = 0
+            shelf_height = 0
+            if page < 0 or y + height + padding > max_size:
+                if page >= 0:
+                    page_sizes.append((page_width, y))
+                page += 1
+                y = 0
+                page_width = 0
+
+        placements[i] = (page, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+        page_width = max(page_width, x)
+
+    if page >= 0:
+        page_sizes.append((page_width, y + shelf_height))
+    return placements, page_sizes
+
+
+def build_atlases(script_dir, groups=ATLAS_GROUPS, max_size=MAX_PAGE_SIZE):
+    """Pack every group into sheets and write them together with index.json."""
+    output_dir = atlas_dir(script_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    index = {"version": ATLAS_VERSION, "pages": {}, "sprites": {}}
+
+    for group, patterns in groups.items():
+        names = collect_group(script_dir, patterns)
+        if not names:
+            continue
+        images = [pygame.image.load(os.path.join(images_dir(script_dir), name)) for name in names]
+        placements, page_sizes = pack_shelves([image.get_size() for image in images], max_size)
+
+        sheets = [pygame.Surface(size, pygame.SRCALPHA) for size in page_sizes]
+        for sheet in sheets:
+            sheet.fill((0, 0, 0, 0))
+        for name, image, (page, x, y) in zip(names, images, placements):
+            page_name = f"{group}_{page}"
+            sheets[page].blit(image, (x, y))
+            index["sprites"][name] = {"page": page_name, "rect": [x, y, image.get_width(), image.get_height()]}
+
+        for page, sheet in enumerate(sheets):
+            page_name = f"{group}_{page}"
+            pygame.image.save(sheet, os.path.join(output_dir, f"{page_name}.png"))
+            index["pages"][page_name] = f"{page_name}.png"
+        print(f"Packed {len(names)} images from '{group}' into {len(sheets)} sheet(s)")
+
+    with open(os.path.join(output_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    return index
+
+
+class AtlasIndex:
+    """Lookup from image paths to the atlas sheet and rectangle that contain them."""
+    def __init__(self, script_dir, index):
+        self.script_dir = script_dir
+        self.pages = index.get("pages", {})
+        self.sprites = index.get("sprites", {})
+
+    @classmethod
+    def load(cls, script_dir):
+        """Load the built index, or return None if the atlases haven't been built."""
+        path = os.path.join(atlas_dir(script_dir), "index.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read atlas index: {e}")
+            return None
+        if index.get("version") != ATLAS_VERSION:
+            print("Atlas index is out of date, run 'python -m managers.atlas' to rebuild it")
+            return None
+        return cls(script_dir, index)
+
+    def lookup(self, path):
+        """Return (sheet path, pygame.Rect) for an image, or None if it isn't in an atlas."""
+        entry = self.sprites.get(sprite_name(self.script_dir, path))
+        if entry is None:
+            return None
+        sheet_path = os.path.join(atlas_dir(self.script_dir), self.pages[entry["page"]])
+        return sheet_path, pygame.Rect(entry["rect"])
+
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    build_atlases(sys.argv[1] if len(sys.argv) > 1 else root)
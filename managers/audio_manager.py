@@ -1,12 +1,229 @@
+# Audio: looping background music plus a bank of sound effects.
+#
+# Sound effects are decoded once and kept in an LRU cache. Decoding MP3s is the
+# slow part, so they can optionally be converted to WAV once after changing any
+# of them:
+#
+#   python -m managers.audio_manager
+#
+# This writes assets/audio/wav/..., which the bank prefers over the MP3s when present,
+# and the length of every music track to assets/audio/wav/music_lengths.json, so
+# looping tracks can resume at the right spot without decoding them. A track
+# missing from that file is measured once in the background and added to it.
+import json
+import os
+import sys
+import threading
+import wave
+from collections import OrderedDict
 import pygame
+from managers.asset_manager import assets
+from managers.save_manager import write_atomic
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Channel group -> number of reserved mixer channels
+CHANNEL_GROUPS = {
+    "ui": 2,
+    "voice": 2,
+    "combat": 4,
+}
+MAX_CHANNELS = 16  # Channels above the reserved groups are left for plain Sound.play()
+SOUND_MEMORY_CAP = 32 * 1024 * 1024  # Bytes of decoded sample data kept in the bank
+
+MUSIC_VOLUME = 0.75
+MUSIC_FADE_MS = 500
+
+# Sound effects converted by build_wav_cache()
+WAV_SOURCES = ["sfx", "voiceline"]
+
+
+def wav_dir(script_dir):
+    return os.path.join(script_dir, "assets", "audio", "wav")
+
+
+def wav_path(script_dir, path):
+    """Where the prebuilt WAV of an audio file lives (whether it exists or not)."""
+    audio_dir = os.path.join(script_dir, "assets", "audio")
+    relative = os.path.relpath(os.path.abspath(path), audio_dir)
+    return os.path.join(wav_dir(script_dir), os.path.splitext(relative)[0] + ".wav")
+
+
+def music_lengths_path(script_dir):
+    return os.path.join(wav_dir(script_dir), "music_lengths.json")
+
+
+def music_key(script_dir, path):
+    """A track's entry in music_lengths.json: its path relative to assets/audio."""
+    return os.path.relpath(os.path.abspath(path), os.path.join(script_dir, "assets", "audio")).replace(os.sep, "/")
+
+
+def load_music_lengths(script_dir):
+    """music_lengths.json as {key: [file size, seconds]}, empty if it hasn't been built."""
+    try:
+        with open(music_lengths_path(script_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def measure_music(path):
+    """[file size, seconds] of a track. Decodes the whole file, so only done offline or once per track."""
+    return [os.path.getsize(path), round(pygame.mixer.Sound(path).get_length(), 3)]
+
+
+def build_music_lengths(script_dir):
+    """Measure every music track and store the lengths in music_lengths.json."""
+    pygame.mixer.init()
+    lengths = {}
+    for folder, _, files in os.walk(os.path.join(script_dir, "assets", "audio", "ost")):
+        for file in files:
+            if file.endswith(".mp3"):
+                path = os.path.join(folder, file)
+                lengths[music_key(script_dir, path)] = measure_music(path)
+    write_atomic(music_lengths_path(script_dir), json.dumps(lengths, indent=1, sort_keys=True).encode("utf-8"))
+    print(f"Measured {len(lengths)} music track(s)")
+
+
+def build_wav_cache(script_dir):
+    """Decode every sound effect and voiceline once and store it as WAV."""
+    pygame.mixer.init()
+    frequency, size, channels = pygame.mixer.get_init()
+    count = 0
+    for source in WAV_SOURCES:
+        for folder, _, files in os.walk(os.path.join(script_dir, "assets", "audio", source)):
+            for file in files:
+                if not file.endswith(".mp3"):
+                    continue
+                path = os.path.join(folder, file)
+                target = wav_path(script_dir, path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with wave.open(target, "wb") as f:
+                    f.setnchannels(channels)
+                    f.setsampwidth(abs(size) // 8)
+                    f.setframerate(frequency)
+                    f.writeframes(pygame.mixer.Sound(path).get_raw())
+                count += 1
+    print(f"Converted {count} sound(s) to WAV")
+
+
+class SoundBank:
+    """Decodes each sound effect once and plays it on a reserved channel group.
+
+    Decoded sounds are kept in an LRU cache limited to memory_cap bytes. When
+    every channel of a group is busy, the sound with the lowest priority (the
+    oldest one on a tie) is cut off, unless it outranks the new sound.
+    """
+    def __init__(self, groups=CHANNEL_GROUPS, memory_cap=SOUND_MEMORY_CAP, script_dir=ROOT_DIR):
+        self.script_dir = script_dir
+        self.memory_cap = memory_cap
+        self.memory_used = 0
+        self.cache = OrderedDict()  # path -> (Sound, size in bytes), least recently used first
+
+        # Reserve the first channels so plain Sound.play() calls never take them
+        reserved = sum(groups.values())
+        pygame.mixer.set_num_channels(max(MAX_CHANNELS, reserved))
+        pygame.mixer.set_reserved(reserved)
+        self.groups = {}
+        first = 0
+        for name, count in groups.items():
+            self.groups[name] = [pygame.mixer.Channel(i) for i in range(first, first + count)]
+            first += count
+        self.playing = {}  # (group, channel index) -> (priority, play counter)
+        self.play_count = 0
+
+    def resolve(self, path):
+        """Prefer the prebuilt WAV over decoding the MP3."""
+        prebuilt = wav_path(self.script_dir, path)
+        return prebuilt if os.path.exists(prebuilt) else path
+
+    def sound_size(self, sound):
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+    def get(self, path):
+        """Return the decoded Sound for a file, loading it on a cache miss."""
+        key = assets.normalize(path)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.cache.move_to_end(key)
+            return entry[0]
+
+        # Use the copy decoded by a scene preload if there is one
+        sound = assets.take_sound(path)
+        if sound is None:
+            sound = pygame.mixer.Sound(self.resolve(path))
+        size = self.sound_size(sound)
+        self.cache[key] = (sound, size)
+        self.memory_used += size
+
+        while self.memory_used > self.memory_cap and len(self.cache) > 1:
+            _, (_, evicted_size) = self.cache.popitem(last=False)
+            self.memory_used -= evicted_size
+        return sound
+
+    def find_channel(self, group, priority):
+        """Index of a free channel in the group, or of the one playing the least important sound."""
+        channels = self.groups[group]
+        for index, channel in enumerate(channels):
+            if not channel.get_busy():
+                return index
+        # (priority, play counter) sorts the least important, oldest sound first
+        index = min(range(len(channels)), key=lambda i: self.playing.get((group, i), (0, 0)))
+        if self.playing.get((group, index), (0, 0))[0] > priority:
+            return None
+        channels[index].stop()
+        return index
+
+    def play(self, path, group="ui", priority=0, volume=1.0):
+        """Play a sound effect and return its channel, or None if it was dropped."""
+        try:
+            sound = self.get(path)
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Could not play {path}: {e}")
+            return None
+        index = self.find_channel(group, priority)
+        if index is None:
+            return None
+        self.play_count += 1
+        self.playing[(group, index)] = (priority, self.play_count)
+        channel = self.groups[group][index]
+        channel.play(sound)
+        channel.set_volume(volume)
+        return channel
+
+    def stop(self, group=None):
+        """Stop every channel of a group, or of all groups."""
+        for name, channels in self.groups.items():
+            if group is None or name == group:
+                for channel in channels:
+                    channel.stop()
+
 
 class AudioManager:
+    """Owns all music and sound effects.
+
+    Music changes go through play_track(): the old track fades out, the new one is
+    read from memory when it was preloaded and fades in, and the position of every
+    track is remembered so it can resume where it left off. Call update() once per
+    frame so a pending track starts as soon as the fade out finishes.
+    """
     def __init__(self, music_path, click_sfx_path):
         pygame.mixer.init()
         self.music_path = music_path
-        self.click_sfx = None if click_sfx_path is None else pygame.mixer.Sound(click_sfx_path)
+        self.click_sfx_path = click_sfx_path
+        self.sound_bank = SoundBank()
         self.is_playing = False
 
+        # Music controller state
+        self.current_track = None
+        self.track_offset = 0.0  # Seconds into the track where the current play() started
+        self.next_track = None  # (path, loops, start, fade_ms) waiting for the fade out to end
+        self.positions = {}  # track -> last playback position in seconds
+        self.music_lengths = load_music_lengths(ROOT_DIR)  # See build_music_lengths
+        self.lengths_lock = threading.Lock()
+        self.measuring = set()  # Tracks missing from music_lengths.json, being measured
+
         # Single audio state for both music and sound effects
         self.audio_enabled = True
 
@@ -15,20 +232,118 @@ class AudioManager:
         self.prev_sound_volume = 1.0
 
     def play_music(self):
-        if self.audio_enabled and not self.is_playing:
-            pygame.mixer.music.load(self.music_path)
-            pygame.mixer.music.play(-1)  # Loop indefinitely
-            pygame.mixer.music.set_volume(0.75)
-            self.is_playing = True
+        """Play the track at music_path, if it isn't already playing."""
+        self.play_track(self.music_path)
 
-    def stop_music(self):
-        if self.is_playing:
+    def play_track(self, path, loops=-1, resume=False, fade_ms=MUSIC_FADE_MS):
+        """Crossfade to a music track, optionally resuming it from its last position."""
+        self.music_path = path
+        if not self.audio_enabled or path is None:
+            return
+        if self.is_playing and path == self.current_track and self.next_track is None:
+            return
+
+        assets.preload_music(path)
+        self.remember_position()
+        start = self.positions.get(path, 0.0) if resume else 0.0
+        self.next_track = (path, loops, start, fade_ms)
+        if self.is_playing and pygame.mixer.music.get_busy():
+            pygame.mixer.music.fadeout(fade_ms)
+        else:
             pygame.mixer.music.stop()
+        self.is_playing = True
+        self.update()
+
+    def prepare_track(self, path):
+        """Read a track into memory in the background so switching to it later doesn't block."""
+        assets.preload_music(path)
+
+    def remember_position(self):
+        if self.current_track and pygame.mixer.music.get_busy():
+            # get_pos() keeps counting across loops, so wrap it into the track
+            position = self.track_offset + max(pygame.mixer.music.get_pos(), 0) / 1000
+            length = self.track_length(self.current_track)
+            self.positions[self.current_track] = position % length if length else position
+
+    def track_length(self, path):
+        """Length of a track in seconds from music_lengths.json, None if it isn't (correctly) listed."""
+        entry = self.music_lengths.get(music_key(ROOT_DIR, path))
+        try:
+            if entry and entry[0] == os.path.getsize(path):
+                return entry[1]
+        except OSError:
+            pass
+        return None
+
+    def measure_track(self, path):
+        """Background thread: measure a track music_lengths.json doesn't have and add it to the file."""
+        try:
+            entry = measure_music(path)
+        except (OSError, pygame.error) as e:
+            print(f"Could not measure {path}: {e}")
+            return
+        with self.lengths_lock:
+            self.music_lengths[music_key(ROOT_DIR, path)] = entry
+            try:
+                write_atomic(music_lengths_path(ROOT_DIR),
+                             json.dumps(self.music_lengths, indent=1, sort_keys=True).encode("utf-8"))
+            except OSError as e:
+                print(f"Could not save the music lengths: {e}")
+
+    def update(self):
+        """Start the pending track once the previous one has faded out."""
+        if self.next_track is None or pygame.mixer.music.get_busy():
+            return
+        path, loops, start, fade_ms = self.next_track
+        self.next_track = None
+        length = self.track_length(path)
+        if length:
+            start %= length  # Remembered before the length was known
+        elif path not in self.measuring:
+            self.measuring.add(path)
+            threading.Thread(target=self.measure_track, args=(path,), daemon=True).start()
+        assets.load_music(path)
+        try:
+            pygame.mixer.music.play(loops, start=start, fade_ms=fade_ms)
+        except pygame.error as e:
+            # Not every format supports seeking, fall back to the beginning
+            print(f"Could not resume {path} at {start:.1f}s: {e}")
+            start = 0.0
+            pygame.mixer.music.play(loops, fade_ms=fade_ms)
+        pygame.mixer.music.set_volume(MUSIC_VOLUME)
+        self.current_track = path
+        self.track_offset = start
+
+    def is_fading(self):
+        return self.next_track is not None
+
+    def stop_music(self, fade_ms=0):
+        if self.is_playing:
+            self.remember_position()
+            if fade_ms:
+                pygame.mixer.music.fadeout(fade_ms)
+            else:
+                pygame.mixer.music.stop()
             self.is_playing = False
+            self.next_track = None
+            self.current_track = None
+
+    def pause_music(self):
+        self.remember_position()
+        pygame.mixer.music.pause()
+
+    def unpause_music(self):
+        pygame.mixer.music.unpause()
+
+    def play_sound(self, path, group="ui", priority=0):
+        """Play a sound effect through the sound bank. Returns the channel, or None."""
+        if not self.audio_enabled:
+            return None
+        return self.sound_bank.play(path, group, priority, self.prev_sound_volume)
 
     def play_sfx(self):
-        if self.audio_enabled and self.click_sfx:
-            self.click_sfx.play()
+        if self.click_sfx_path:
+            self.play_sound(self.click_sfx_path, "ui")
 
     def toggle_audio(self):
         """Toggles all audio (both music and sound effects)."""
@@ -39,13 +354,16 @@ class AudioManager:
                 self.play_music()
             else:
                 pygame.mixer.music.set_volume(self.prev_music_volume)
-            if self.click_sfx:
-                self.click_sfx.set_volume(self.prev_sound_volume)
         else:
             # Mute all audio
             pygame.mixer.music.set_volume(0)
-            if self.click_sfx:
-                self.click_sfx.set_volume(0)
+            self.sound_bank.stop()
 
         print(f"Audio Enabled: {self.audio_enabled}")
-        return self.audio_enabled
\ No newline at end of file
+        return self.audio_enabled
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else ROOT_DIR
+    build_wav_cache(root)
+    build_music_lengths(root)
@@ -1,10 +1,14 @@
-import psycopg2
 import re
-import hashlib
-import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from managers import db, leaderboard
+from managers.password_hasher import password_hasher
+from managers.telemetry import telemetry
+from managers.session_store import SessionStore, new_token, token_hash
 
 class AuthManager:
-    def __init__(self):
+    def __init__(self, script_dir=None):
         self.conn_params = {
             'dbname': 'finalquiztasy',
             'user': 'postgres',
@@ -13,12 +17,20 @@ class AuthManager:
             'port': '5432'
         }
         self.current_user = None
-        self.init_database()
+        # The tables are created on the first query so the main menu doesn't wait on PostgreSQL
+        self.database_initialized = False
+        self.init_lock = threading.Lock()  # The sync worker, auth thread and leaderboard all connect
+        self.executor = None  # Runs login/register off the render thread
+
+        # Log back in from the remembered session, the database check happens in the background
+        self.sessions = SessionStore(script_dir) if script_dir else None
+        self.session_token = None
+        self.restore_session()
 
     def init_database(self):
-        """Initialize database and create tables if they don't exist"""
+        """Initialize database and create tables if they don't exist. Returns whether it succeeded."""
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = db.connect(self.conn_params)
             cursor = conn.cursor()
 
             cursor.execute('''CREATE TABLE IF NOT EXISTS users
@@ -33,16 +45,67 @@ class AuthManager:
                 level INTEGER DEFAULT 1,
                 last_login TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
 
+            # Per stage progress, written in batches by managers/sync_queue.py
+            cursor.execute(''' CREATE TABLE IF NOT EXISTS stage_progress
+            (user_id INTEGER REFERENCES users (id),
+                stage_id INTEGER NOT NULL,
+                cleared BOOLEAN DEFAULT FALSE,
+                attempts INTEGER DEFAULT 0,
+                best_score INTEGER DEFAULT 0,
+                best_time_ms INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, stage_id))''')
+
+            # Remembered logins, see managers/session_store.py
+            cursor.execute(''' CREATE TABLE IF NOT EXISTS sessions
+            (token_hash VARCHAR (64) PRIMARY KEY,
+                user_id INTEGER REFERENCES users (id),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                expires_at TIMESTAMP NOT NULL,
+                revoked BOOLEAN DEFAULT FALSE)''')
+
+            # Skill ratings per operation, see managers/learner_model.py
+            cursor.execute(''' CREATE TABLE IF NOT EXISTS learner_skills
+            (user_id INTEGER REFERENCES users (id),
+                operation VARCHAR (1) NOT NULL,
+                rating INTEGER NOT NULL,
+                answers INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, operation))''')
             conn.commit()
+
+            # Leaderboard summary tables, kept up to date by a trigger on stage_progress
+            if db.sqlite_path is None:
+                leaderboard.create_tables(cursor)
+                conn.commit()
+
             cursor.close()
             conn.close()
             print("Database initialized successfully")
+            return True
         except Exception as e:
             print(f"Database initialization error: {e}")
+            return False
+
+    def _connect(self):
+        """Open a database connection, creating the tables on first use"""
+        if not self.database_initialized:
+            # Only one thread runs the DDL, the others wait until the tables exist. A failed
+            # attempt (e.g. PostgreSQL not up yet) is retried by the next connection
+            with self.init_lock:
+                if not self.database_initialized:
+                    self.database_initialized = self.init_database()
+        return db.connect(self.conn_params)
 
     def _hash_password(self, password):
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Salted scrypt hash, computed in the hasher's worker process"""
+        return password_hasher.hash(password)
+
+    def run_in_background(self, method, *args):
+        """Run a blocking call such as login or register on the auth thread and return its Future."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        return self.executor.submit(method, *args)
 
     def validate_email(self, email):
         """Validate email format using regex"""
@@ -58,7 +121,7 @@ class AuthManager:
     def check_email_exists(self, email):
         """Check if an email already exists in the database"""
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
             result = cursor.fetchone() is not None
@@ -80,7 +143,7 @@ class AuthManager:
             return False, password_message
 
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
             # Check if email already exists
@@ -114,27 +177,45 @@ class AuthManager:
 
     def login(self, email, password):
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
-            hashed_password = self._hash_password(password)
             cursor.execute(
-                "SELECT id, email FROM users WHERE email = %s AND password_hash = %s",
-                (email, hashed_password)
+                "SELECT id, email, password_hash FROM users WHERE email = %s",
+                (email,)
             )
             user = cursor.fetchone()
+            matches, needs_rehash = password_hasher.verify(password, user[2]) if user else (False, False)
 
-            if user:
+            if matches:
                 self.current_user = {"id": user[0], "email": user[1]}
+                telemetry.set_user(user[0])
+
+                # Upgrade old SHA-256 hashes (or an outdated cost) now that we know the password
+                if needs_rehash:
+                    cursor.execute(
+                        "UPDATE users SET password_hash = %s WHERE id = %s",
+                        (self._hash_password(password), user[0])
+                    )
 
                 # Update last login time
                 cursor.execute(
                     "UPDATE player_stats SET last_login = CURRENT_TIMESTAMP WHERE user_id = %s",
                     (user[0],)
                 )
+
+                # Remember the login so the next launch starts logged in
+                token, expires_at = new_token()
+                cursor.execute(
+                    "INSERT INTO sessions (token_hash, user_id, expires_at) VALUES (%s, %s, to_timestamp(%s))",
+                    (token_hash(token), user[0], expires_at)
+                )
                 conn.commit()
                 cursor.close()
                 conn.close()
+                self.session_token = token
+                if self.sessions:
+                    self.sessions.save(self.current_user, token, expires_at)
                 return True, "Login successful"
             else:
                 cursor.close()
@@ -148,11 +229,80 @@ class AuthManager:
         """Log out the current user"""
         try:
             self.current_user = None
+            telemetry.set_user(None)
+            token, self.session_token = self.session_token, None
+            if self.sessions:
+                self.sessions.clear()
+            if token:
+                self.run_in_background(self.revoke_session, token)
             return True
         except Exception as e:
             print(f"Error during logout: {e}")
             return False
 
+    def restore_session(self):
+        """Log in from the remembered session without waiting on the network."""
+        session = self.sessions.load() if self.sessions else None
+        if session is None:
+            return
+        self.current_user = {"id": session["id"], "email": session["email"]}
+        telemetry.set_user(session["id"])
+        self.session_token = session["token"]
+        print(f"Welcome back, {session['email']}")
+        threading.Thread(target=self.validate_session, args=(session["token"],), daemon=True).start()
+
+    def validate_session(self, token):
+        """Background thread: check a restored session against the database, retrying until it is reachable."""
+        delay = 5
+        while self.session_token == token:
+            try:
+                conn = self._connect()
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT u.id, u.email FROM sessions s JOIN users u ON u.id = s.user_id "
+                    "WHERE s.token_hash = %s AND NOT s.revoked AND s.expires_at > CURRENT_TIMESTAMP",
+                    (token_hash(token),)
+                )
+                user = cursor.fetchone()
+                if user:
+                    cursor.execute(
+                        "UPDATE player_stats SET last_login = CURRENT_TIMESTAMP WHERE user_id = %s",
+                        (user[0],)
+                    )
+                    conn.commit()
+                cursor.close()
+                conn.close()
+            except Exception as e:
+                # Stay logged in offline and try again later
+                print(f"Could not check the remembered login yet: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, 300)
+                continue
+
+            if self.session_token != token:
+                return  # Logged out or in as someone else meanwhile
+            if user:
+                self.current_user = {"id": user[0], "email": user[1]}  # Picks up a changed email
+            else:
+                print("Remembered login has expired or was revoked, logging out")
+                self.current_user = None
+                telemetry.set_user(None)
+                self.session_token = None
+                self.sessions.clear()
+            return
+
+    def revoke_session(self, token):
+        """Mark a session as logged out in the database."""
+        try:
+            conn = self._connect()
+            cursor = conn.cursor()
+            cursor.execute("UPDATE sessions SET revoked = TRUE WHERE token_hash = %s", (token_hash(token),))
+            conn.commit()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            print(f"Could not revoke session: {e}")
+
     def get_current_user(self):
         """Get current logged in user"""
         return self.current_user
@@ -162,7 +312,7 @@ class AuthManager:
         if not self.current_user:
             return None
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
             cursor.execute(
@@ -0,0 +1,64 @@
+import os
+import random
+from managers.asset_manager import assets
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+PLAYER_SCALE = 5
+ENEMY_SCALE = 2.5
+MINI_VARIANTS = 19  # mini_1.png ... mini_19.png
+
+
+def background_path(script_dir, level_id):
+    # Every level shares the same background for now
+    return os.path.join(script_dir, "assets", "images", "battle", "backgrounds", "level1_bg.png")
+
+
+def enemy_path(script_dir, enemy_type, variant=None):
+    if enemy_type == "mini":
+        return os.path.join(script_dir, "assets", "images", "battle", "enemy", "mini", f"mini_{variant}.png")
+    return os.path.join(script_dir, "assets", "images", "battle", "enemy", "boss", "boss.png")
+
+
+def player_path(script_dir, hero):
+    return os.path.join(script_dir, "assets", "images", "battle", hero, f"{hero}_stand.png")
+
+
+class BattleAssets:
+    """Scaled battle backgrounds and sprites, shared by every Level and Battle.
+
+    The scaled copies live in the AssetManager's cache, so they are built once and
+    kept across battles. While the player walks the map the next stage is
+    prefetched: its enemy variant is picked in advance and the scaled images are
+    built in spare frame time, so entering the level doesn't load or scale anything.
+    """
+    def __init__(self):
+        self.next_variants = {}  # level id -> mini variant picked in advance
+
+    def prefetch_level(self, script_dir, level_id, hero):
+        """Pick the level's enemy and queue its scaled images. Cheap to call every frame."""
+        if level_id is None or level_id in self.next_variants:
+            return
+        variant = random.randint(1, MINI_VARIANTS)
+        self.next_variants[level_id] = variant
+        assets.prefetch_scaled(background_path(script_dir, level_id), size=(SCREEN_WIDTH, SCREEN_HEIGHT))
+        assets.prefetch_scaled(enemy_path(script_dir, "mini", variant), scale=ENEMY_SCALE, flip_x=True)
+        if hero is not None:
+            assets.prefetch_scaled(player_path(script_dir, hero), scale=PLAYER_SCALE)
+
+    def enemy_variant(self, level_id):
+        """The prefetched enemy variant for a level, or a random one. Each pick is used once."""
+        variant = self.next_variants.pop(level_id, None)
+        return variant if variant is not None else random.randint(1, MINI_VARIANTS)
+
+    def background(self, script_dir, level_id):
+        return assets.load_scaled(background_path(script_dir, level_id), size=(SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    def enemy_image(self, script_dir, enemy_type, variant=None):
+        return assets.load_scaled(enemy_path(script_dir, enemy_type, variant), scale=ENEMY_SCALE, flip_x=True)
+
+    def player_image(self, script_dir, hero):
+        return assets.load_scaled(player_path(script_dir, hero), scale=PLAYER_SCALE)
+
+
+# Shared by every Level and Battle
+battle_assets = BattleAssets()
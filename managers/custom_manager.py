@@ -1,6 +1,7 @@
-import psycopg2
 import datetime
 import json
+import threading
+from managers import db
 
 
 class CustomManager:
@@ -12,12 +13,14 @@ class CustomManager:
             'host': 'localhost',
             'port': '5432'
         }
-        self.init_database()
+        # The table is created on the first query so opening custom mode doesn't wait on PostgreSQL
+        self.database_initialized = False
+        self.init_lock = threading.Lock()  # The classroom server queries from a thread pool
 
     def init_database(self):
-        """Initialize database and create custom_questions table if it doesn't exist"""
+        """Initialize database and create custom_questions table if it doesn't exist. Returns whether it succeeded."""
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = db.connect(self.conn_params)
             cursor = conn.cursor()
 
             # Create custom_questions table if it doesn't exist
@@ -32,12 +35,22 @@ class CustomManager:
             cursor.close()
             conn.close()
             print("Custom questions table initialized successfully")
+            return True
         except Exception as e:
             print(f"Database initialization error: {e}")
+            return False
+
+    def _connect(self):
+        """Open a database connection, creating the table on first use"""
+        if not self.database_initialized:
+            with self.init_lock:
+                if not self.database_initialized:
+                    self.database_initialized = self.init_database()
+        return db.connect(self.conn_params)
 
     def save_question_set(self, name, questions, user_id=None):
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
             # Convert questions list to JSON string
@@ -66,7 +79,7 @@ class CustomManager:
 
     def get_question_sets(self, user_id=None):
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
             if user_id:
@@ -94,7 +107,7 @@ class CustomManager:
 
     def get_question_set_by_name(self, name):
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
             cursor.execute(
@@ -107,7 +120,9 @@ class CustomManager:
             conn.close()
 
             if result:
-                return json.loads(result[0])
+                # psycopg2 already decodes JSONB columns, other drivers hand back the text
+                questions = result[0]
+                return json.loads(questions) if isinstance(questions, str) else questions
             return None
         except Exception as e:
             print(f"Error retrieving question set: {e}")
@@ -115,7 +130,7 @@ class CustomManager:
 
     def delete_question_set(self, name, user_id=None):
         try:
-            conn = psycopg2.connect(**self.conn_params)
+            conn = self._connect()
             cursor = conn.cursor()
 
             if user_id:
@@ -0,0 +1,80 @@
+# Database connections for the managers.
+#
+# The game talks to PostgreSQL through psycopg2. Tools can call use_sqlite() to
+# run the managers' queries against a local SQLite file instead (the stress
+# harness in benchmarks/db_stress.py does), which needs no server. The stand-in
+# rewrites the PostgreSQL-only bits of the SQL the managers use, it is not a
+# general translator.
+import re
+import sqlite3
+from functools import lru_cache
+
+sqlite_path = None  # Set by use_sqlite()
+
+SQLITE_REWRITES = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\bSERIAL PRIMARY KEY\b"), "INTEGER PRIMARY KEY AUTOINCREMENT"),
+    (re.compile(r"\bJSONB\b"), "TEXT"),
+    (re.compile(r"to_timestamp\(\?\)"), "datetime(?, 'unixepoch')"),
+]
+
+
+def use_sqlite(path):
+    """Send every manager query to the SQLite file at `path` from now on."""
+    global sqlite_path
+    sqlite_path = path
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")  # Readers don't wait for the writer
+    conn.close()
+
+
+@lru_cache(maxsize=None)
+def to_sqlite(sql):
+    for pattern, replacement in SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(to_sqlite(sql), params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def close(self):
+        self.cursor.close()
+
+
+class SQLiteConnection:
+    """The part of a psycopg2 connection the managers use, on top of sqlite3."""
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA foreign_keys=ON")
+
+    def cursor(self):
+        return SQLiteCursor(self.conn.cursor())
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def connect(conn_params):
+    """Open a connection to the game database."""
+    if sqlite_path is not None:
+        return SQLiteConnection(sqlite_path)
+    import psycopg2
+    return psycopg2.connect(**conn_params)
@@ -0,0 +1,223 @@
+import os
+from collections import OrderedDict
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, WINDOW_SIZE, SCALE_QUALITY, RENDER_BACKEND
+
+MAX_CACHED_TEXTURES = 16
+
+# Window events that show or hide the game
+HIDING_EVENTS = {pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN}
+SHOWING_EVENTS = {pygame.WINDOWRESTORED, pygame.WINDOWSHOWN, pygame.WINDOWMAXIMIZED, pygame.WINDOWEXPOSED}
+
+# The backend everything is presented through, set up by create_display()
+_backend = None
+
+
+class SoftwareBackend:
+    """Plain pygame: everything is blitted onto the display surface."""
+    name = "software"
+
+    def __init__(self, screen):
+        self.screen = screen
+
+    def clear(self, color=(0, 0, 0)):
+        self.screen.fill(color)
+
+    def draw_background(self, surface, pos=(0, 0), size=None, static=True):
+        if size and tuple(size) != surface.get_size():
+            surface = pygame.transform.scale(surface, size)
+        self.screen.blit(surface, pos)
+
+    def snapshot(self):
+        return self.screen.copy()
+
+    def present(self):
+        pygame.display.flip()
+
+    def is_active(self):
+        return pygame.display.get_active()
+
+    def note_event(self, event):
+        pass
+
+
+class TextureBackend:
+    """GPU backend built on pygame._sdl2: large backgrounds are drawn as textures.
+
+    Everything else is still drawn with Surface.blit onto `screen`, a transparent
+    layer that is uploaded and drawn over the backgrounds once per frame. A hidden
+    1x1 display mode is kept open so convert() and convert_alpha() keep working.
+    """
+    name = "texture"
+
+    def __init__(self, caption, window_size=None):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        self.Texture = Texture
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        self.window = Window(caption, window_size or (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.renderer = Renderer(self.window)
+        # Draw in canvas coordinates, SDL scales to the window and maps the mouse back
+        self.renderer.logical_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+        self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.screen.fill((0, 0, 0, 0))
+        self.layer = Texture(self.renderer, (SCREEN_WIDTH, SCREEN_HEIGHT), streaming=True)
+        self.layer.blend_mode = 1  # SDL_BLENDMODE_BLEND
+        self.textures = OrderedDict()  # id(surface) -> (surface, Texture), least recently used first
+        self.streams = {}  # size -> streaming Texture for backgrounds that change every frame
+        # pygame.display.get_active() only knows the hidden display window, so the real
+        # window's state is followed through its events
+        self.active = True
+        self.clear()
+
+    def clear(self, color=(0, 0, 0)):
+        self.renderer.draw_color = tuple(color) + (255,)
+        self.renderer.clear()
+
+    def texture_for(self, surface, static):
+        if not static:
+            stream = self.streams.get(surface.get_size())
+            if stream is None:
+                stream = self.Texture(self.renderer, surface.get_size(), streaming=True)
+                self.streams[surface.get_size()] = stream
+            stream.update(surface)
+            return stream
+
+        # Keep a reference to the surface so its id can't be reused while cached
+        key = id(surface)
+        entry = self.textures.get(key)
+        if entry is not None:
+            self.textures.move_to_end(key)
+            return entry[1]
+        texture = self.Texture.from_surface(self.renderer, surface)
+        self.textures[key] = (surface, texture)
+        if len(self.textures) > MAX_CACHED_TEXTURES:
+            self.textures.popitem(last=False)
+        return texture
+
+    def draw_background(self, surface, pos=(0, 0), size=None, static=True):
+        """Draw a large image under the UI layer. Pass static=False for images that change every frame."""
+        texture = self.texture_for(surface, static)
+        texture.draw(dstrect=pygame.Rect(pos, size or surface.get_size()))
+
+    def flush_layer(self):
+        """Composite the UI layer onto the renderer and start a new, empty one."""
+        self.layer.update(self.screen)
+        self.layer.draw()
+        self.screen.fill((0, 0, 0, 0))
+
+    def snapshot(self):
+        self.flush_layer()
+        return self.renderer.to_surface()
+
+    def present(self):
+        self.flush_layer()
+        self.renderer.present()
+        self.clear()
+
+    def is_active(self):
+        """Whether the game window is shown and not minimized."""
+        return self.active
+
+    def note_event(self, event):
+        window = getattr(event, "window", None)
+        if window is not None and getattr(window, "id", None) != self.window.id:
+            return  # The hidden display window
+        if event.type in HIDING_EVENTS:
+            self.active = False
+        elif event.type in SHOWING_EVENTS:
+            self.active = True
+
+
+def get_backend():
+    """The active backend, falling back to software drawing on the current display surface."""
+    global _backend
+    if _backend is None or (_backend.name == "software" and _backend.screen is not pygame.display.get_surface()):
+        _backend = SoftwareBackend(pygame.display.get_surface())
+    return _backend
+
+
+def clear(color=(0, 0, 0)):
+    """Fill the frame with a solid color, underneath everything else drawn this frame."""
+    get_backend().clear(color)
+
+
+def draw_background(surface, pos=(0, 0), size=None, static=True):
+    """Draw a large background image, scaled to `size` if given."""
+    get_backend().draw_background(surface, pos, size, static)
+
+
+def snapshot():
+    """A copy of everything drawn so far this frame."""
+    return get_backend().snapshot()
+
+
+def present():
+    """Show the finished frame (replaces pygame.display.flip()/update())."""
+    get_backend().present()
+
+
+def is_active():
+    """Whether the game window is visible, i.e. worth drawing at full frame rate."""
+    return get_backend().is_active()
+
+
+def note_event(event):
+    """Let the backend follow window events (see FramePacer.note_event)."""
+    if event.type in HIDING_EVENTS or event.type in SHOWING_EVENTS:
+        get_backend().note_event(event)
+
+
+def create_display(caption="Final Quiztasy", window_size=WINDOW_SIZE, backend=RENDER_BACKEND):
+    """Open the game window (or reuse the open one) and return the surface everything is drawn on.
+
+    The game always draws on a SCREEN_WIDTH x SCREEN_HEIGHT canvas. With a
+    window_size set, SDL's SCALED mode presents that canvas in a window of that
+    size, scaling it once per frame on the GPU, and maps mouse positions back to
+    canvas coordinates, so buttons and the map keep working at any window size.
+
+    This is window scaling only: every screen lays out in absolute canvas pixels,
+    so there is no smaller internal render target, and on the software backend the
+    extra scaling pass makes frames slower, not faster.
+    """
+    global _backend
+    if _backend is not None and _backend.name == "texture":
+        return _backend.screen
+    if backend == "texture":
+        try:
+            _backend = TextureBackend(caption, window_size)
+            return _backend.screen
+        except (ImportError, pygame.error) as e:
+            print(f"Texture renderer unavailable ({e}), falling back to software rendering")
+
+    # Re-creating a SCALED window is unreliable in SDL, so reuse the one that is already open
+    screen = pygame.display.get_surface()
+    if screen is not None and screen.get_size() == (SCREEN_WIDTH, SCREEN_HEIGHT):
+        pygame.display.set_caption(caption)
+        return screen
+
+    screen = None
+    if window_size and tuple(window_size) != (SCREEN_WIDTH, SCREEN_HEIGHT):
+        # "nearest" keeps pixel art crisp, "linear" is smoother when scaling by odd factors
+        os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", SCALE_QUALITY)
+        try:
+            screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED | pygame.RESIZABLE)
+            set_window_size(window_size)
+        except pygame.error as e:
+            print(f"Scaled display unavailable ({e}), using a {SCREEN_WIDTH}x{SCREEN_HEIGHT} window")
+            screen = None
+    if screen is None:
+        # Canvas-sized window, nothing to scale
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(caption)
+    return screen
+
+
+def set_window_size(size):
+    """Resize the window without changing the canvas size."""
+    try:
+        from pygame._sdl2.video import Window
+    except ImportError:
+        print("Window resizing is not supported by this pygame build")
+        return
+    Window.from_display_module().size = size
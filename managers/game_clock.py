@@ -0,0 +1,105 @@
+import time
+import pygame
+from managers import display
+from settings import FPS, TICK_RATE, IDLE_FPS, IDLE_AFTER
+
+# Events that mean someone is using the game
+INPUT_EVENTS = {
+    pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT,
+    pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL,
+    pygame.WINDOWFOCUSGAINED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED,
+}
+
+
+class GameClock:
+    """Fixed-timestep clock: the simulation always advances in steps of 1 / TICK_RATE seconds.
+
+    Each frame call tick(), then run one simulation step for every step in steps()
+    and draw using alpha() to interpolate between the last two simulation states.
+    Gameplay then behaves the same whether the game renders at 30, 60 or 144 FPS.
+    """
+    def __init__(self, fps=FPS, tick_rate=TICK_RATE, max_steps=5):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.step = 1.0 / tick_rate
+        self.max_steps = max_steps  # Avoid a spiral of death after a long hitch (e.g. loading)
+        self.accumulator = 0.0
+
+    def tick(self):
+        """Wait for the next frame and bank the elapsed time. Returns the frame time in seconds."""
+        dt = self.clock.tick(self.fps) / 1000
+        self.accumulator = min(self.accumulator + dt, self.step * self.max_steps)
+        return dt
+
+    def steps(self):
+        """Yield once for every whole simulation step that is due."""
+        while self.accumulator >= self.step:
+            self.accumulator -= self.step
+            yield self.step
+
+    def alpha(self):
+        """How far (0.0 - 1.0) rendering is between the previous and the current simulation state."""
+        return self.accumulator / self.step
+
+    def reset(self):
+        """Forget banked time, e.g. after returning from another screen."""
+        self.clock.tick()
+        self.accumulator = 0.0
+
+    def get_fps(self):
+        return self.clock.get_fps()
+
+
+class FramePacer:
+    """Frame limiter for menus that drops to a low frame rate while nobody is using them.
+
+    After IDLE_AFTER seconds without input (or while the window is minimized) frames
+    are only drawn IDLE_FPS times per second. Instead of sleeping, the idle wait
+    blocks in pygame.event.wait(), so any input wakes the game up immediately.
+    """
+    def __init__(self, fps=FPS, idle_fps=IDLE_FPS, idle_after=IDLE_AFTER):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.last_input = time.perf_counter()
+        self.last_frame = time.perf_counter()
+        self.idle = False
+
+    def note_event(self, event):
+        """Call for every event handled, so input resets the idle timer."""
+        display.note_event(event)
+        if event.type in INPUT_EVENTS:
+            self.last_input = time.perf_counter()
+
+    def is_idle(self):
+        if not display.is_active():
+            return True
+        return time.perf_counter() - self.last_input > self.idle_after
+
+    def tick(self, animating=False):
+        """Wait for the next frame. Stays at full rate while something is animating."""
+        self.idle = not animating and self.is_idle()
+        if not self.idle:
+            self.clock.tick(self.fps)
+        else:
+            remaining_ms = int((1.0 / self.idle_fps - (time.perf_counter() - self.last_frame)) * 1000)
+            if remaining_ms > 0:
+                event = pygame.event.wait(remaining_ms)
+                if event.type != pygame.NOEVENT:
+                    # Put it back for the next handle_events()
+                    pygame.event.post(event)
+                    self.note_event(event)
+            self.clock.tick()
+        self.last_frame = time.perf_counter()
+
+    def frame_scale(self):
+        """How many full-rate frames the last frame stood for, so animations keep their speed while idle."""
+        return self.fps / self.idle_fps if self.idle else 1.0
+
+    def get_fps(self):
+        return self.clock.get_fps()
+
+
+def lerp(previous, current, alpha):
+    return previous + (current - previous) * alpha
@@ -0,0 +1,300 @@
+# Leaderboards.
+#
+# Rankings are never computed from stage_progress at read time. A trigger on
+# stage_progress adds every improvement of a best score to summary rows in
+# leaderboard_entries, one row per (board, user):
+#
+#   global              sum of the player's best stage scores
+#   week:<monday>       points gained on personal bests during that week
+#   class:<code>        the global score, for players in that class
+#
+# leaderboard_counts keeps how many players have each score on each board, so a
+# player's rank is one plus the number of players with more points. That sum
+# covers the distinct scores above theirs, not the players, so it costs the same
+# with 100 users or 100k. A page of the top N is an index range scan that
+# continues from the last row of the previous page.
+#
+# Reads go through a short in-process cache that is refreshed on the auth
+# thread, so the main menu never waits on the database.
+import threading
+import time
+from datetime import date, timedelta
+
+CACHE_TTL = 30  # Seconds a cached page or rank is shown before it is fetched again
+GLOBAL = "global"
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS leaderboard_entries
+(board VARCHAR (64) NOT NULL,
+    user_id INTEGER REFERENCES users (id),
+    score INTEGER NOT NULL DEFAULT 0,
+    stages_cleared INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (board, user_id));
+CREATE INDEX IF NOT EXISTS leaderboard_entries_rank ON leaderboard_entries (board, score, user_id);
+
+CREATE TABLE IF NOT EXISTS leaderboard_counts
+(board VARCHAR (64) NOT NULL,
+    score INTEGER NOT NULL,
+    users INTEGER NOT NULL,
+    PRIMARY KEY (board, score));
+
+ALTER TABLE player_stats ADD COLUMN IF NOT EXISTS class_code VARCHAR (32);
+
+-- Add points to one player's entry on one board and move them in the score counts
+CREATE OR REPLACE FUNCTION leaderboard_add(p_board VARCHAR, p_user INTEGER, p_points INTEGER, p_cleared INTEGER)
+RETURNS VOID AS $$
+DECLARE
+    inserted INTEGER;
+    old_score INTEGER;
+BEGIN
+    INSERT INTO leaderboard_entries (board, user_id) VALUES (p_board, p_user) ON CONFLICT DO NOTHING;
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    SELECT score INTO old_score FROM leaderboard_entries WHERE board = p_board AND user_id = p_user FOR UPDATE;
+    UPDATE leaderboard_entries
+        SET score = old_score + p_points, stages_cleared = stages_cleared + p_cleared, updated_at = CURRENT_TIMESTAMP
+        WHERE board = p_board AND user_id = p_user;
+    IF inserted = 0 THEN
+        UPDATE leaderboard_counts SET users = users - 1 WHERE board = p_board AND score = old_score;
+        DELETE FROM leaderboard_counts WHERE board = p_board AND score = old_score AND users <= 0;
+    END IF;
+    INSERT INTO leaderboard_counts (board, score, users) VALUES (p_board, old_score + p_points, 1)
+        ON CONFLICT (board, score) DO UPDATE SET users = leaderboard_counts.users + 1;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION leaderboard_on_progress() RETURNS TRIGGER AS $$
+DECLARE
+    points INTEGER;
+    cleared INTEGER;
+    player_class VARCHAR;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        points := NEW.best_score;
+        cleared := CASE WHEN NEW.cleared THEN 1 ELSE 0 END;
+    ELSE
+        points := NEW.best_score - OLD.best_score;
+        cleared := CASE WHEN NEW.cleared AND NOT OLD.cleared THEN 1 ELSE 0 END;
+    END IF;
+    IF points <= 0 AND cleared = 0 THEN
+        RETURN NEW;
+    END IF;
+    points := GREATEST(points, 0);
+    PERFORM leaderboard_add('global', NEW.user_id, points, cleared);
+    PERFORM leaderboard_add('week:' || to_char(date_trunc('week', CURRENT_DATE), 'YYYY-MM-DD'), NEW.user_id, points, cleared);
+    SELECT class_code INTO player_class FROM player_stats WHERE user_id = NEW.user_id;
+    IF player_class IS NOT NULL THEN
+        PERFORM leaderboard_add('class:' || player_class, NEW.user_id, points, cleared);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'stage_progress_leaderboard') THEN
+        CREATE TRIGGER stage_progress_leaderboard AFTER INSERT OR UPDATE ON stage_progress
+            FOR EACH ROW EXECUTE FUNCTION leaderboard_on_progress();
+        -- Progress synced before the leaderboards existed
+        INSERT INTO leaderboard_entries (board, user_id, score, stages_cleared)
+            SELECT 'global', user_id, SUM(best_score), COUNT(*) FILTER (WHERE cleared)
+            FROM stage_progress GROUP BY user_id
+            ON CONFLICT DO NOTHING;
+        INSERT INTO leaderboard_counts (board, score, users)
+            SELECT board, score, COUNT(*) FROM leaderboard_entries WHERE board = 'global' GROUP BY board, score
+            ON CONFLICT (board, score) DO UPDATE SET users = EXCLUDED.users;
+    END IF;
+END;
+$$;
+'''
+
+
+def weekly_board(day=None):
+    """Board of the week containing `day` (today by default), weeks start on Monday."""
+    day = day or date.today()
+    return f"week:{(day - timedelta(days=day.weekday())).isoformat()}"
+
+
+def class_board(class_code):
+    return f"class:{class_code}"
+
+
+def display_name(email):
+    """What other players see: the part of the email before the @."""
+    return email.split("@", 1)[0]
+
+
+def create_tables(cursor):
+    """Create the summary tables, functions and trigger (PostgreSQL only)."""
+    cursor.execute(SCHEMA)
+
+
+def fetch_top(cursor, board, limit=10, after=None):
+    """One page of a board, best first.
+
+    `after` is the (score, user_id) of the last row of the previous page. Rows are
+    dicts with rank, user_id, name, score and stages_cleared; tied scores share a rank.
+    """
+    if after is None:
+        cursor.execute(
+            "SELECT e.user_id, u.email, e.score, e.stages_cleared FROM leaderboard_entries e "
+            "JOIN users u ON u.id = e.user_id WHERE e.board = %s "
+            "ORDER BY e.score DESC, e.user_id DESC LIMIT %s",
+            (board, limit))
+    else:
+        cursor.execute(
+            "SELECT e.user_id, u.email, e.score, e.stages_cleared FROM leaderboard_entries e "
+            "JOIN users u ON u.id = e.user_id WHERE e.board = %s AND (e.score, e.user_id) < (%s, %s) "
+            "ORDER BY e.score DESC, e.user_id DESC LIMIT %s",
+            (board, after[0], after[1], limit))
+    rows = cursor.fetchall()
+    if not rows:
+        return []
+
+    # Players above each score on this page, from the counts of the scores above the page's lowest
+    cursor.execute(
+        "SELECT score, users FROM leaderboard_counts WHERE board = %s AND score > %s ORDER BY score DESC",
+        (board, rows[-1][2]))
+    above = {}
+    players = 0
+    for score, users in cursor.fetchall():
+        above[score] = players
+        players += users
+    page = []
+    for user_id, email, score, stages_cleared in rows:
+        rank = above.get(score, players) + 1
+        page.append({"rank": rank, "user_id": user_id, "name": display_name(email), "score": score,
+                     "stages_cleared": stages_cleared})
+    return page
+
+
+def fetch_rank(cursor, board, user_id):
+    """The player's rank on a board as a dict, or None if they have no points there yet."""
+    cursor.execute(
+        "SELECT e.score, e.stages_cleared, "
+        "(SELECT COALESCE(SUM(c.users), 0) FROM leaderboard_counts c WHERE c.board = e.board AND c.score > e.score), "
+        "(SELECT COALESCE(SUM(c.users), 0) FROM leaderboard_counts c WHERE c.board = e.board) "
+        "FROM leaderboard_entries e WHERE e.board = %s AND e.user_id = %s",
+        (board, user_id))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    score, stages_cleared, above, players = row
+    return {"rank": above + 1, "players": players, "score": score, "stages_cleared": stages_cleared}
+
+
+class Leaderboard:
+    """Cached access to the leaderboards for the menus.
+
+    The cached_* methods return immediately with whatever is in the cache (None
+    at first) and fetch a fresh copy in the background once it is CACHE_TTL old.
+    """
+    def __init__(self):
+        self.auth_manager = None
+        self.cache = {}  # key -> (fetched at, value)
+        self.pending = set()  # Keys being fetched
+        self.lock = threading.Lock()
+
+    def init(self, auth_manager):
+        self.auth_manager = auth_manager
+
+    def query(self, fetch, *args):
+        conn = self.auth_manager._connect()
+        try:
+            cursor = conn.cursor()
+            result = fetch(cursor, *args)
+            cursor.close()
+            return result
+        finally:
+            conn.close()
+
+    def top(self, board=GLOBAL, limit=10, after=None):
+        """Blocking: one page of a board."""
+        return self.query(fetch_top, board, limit, after)
+
+    def rank(self, board=GLOBAL, user_id=None):
+        """Blocking: the current (or given) player's rank on a board."""
+        if user_id is None:
+            user = self.auth_manager.get_current_user()
+            if user is None:
+                return None
+            user_id = user["id"]
+        return self.query(fetch_rank, board, user_id)
+
+    def cached(self, key, method, *args):
+        now = time.monotonic()
+        with self.lock:
+            fetched_at, value = self.cache.get(key, (None, None))
+            if (fetched_at is None or now - fetched_at > CACHE_TTL) and key not in self.pending:
+                self.pending.add(key)
+                self.auth_manager.run_in_background(self.refresh, key, method, *args)
+        return value
+
+    def refresh(self, key, method, *args):
+        try:
+            value = method(*args)
+        except Exception as e:
+            # Keep showing the old value, and don't retry before the TTL is up again
+            print(f"Could not load the leaderboard: {e}")
+            with self.lock:
+                value = self.cache.get(key, (None, None))[1]
+        with self.lock:
+            self.cache[key] = (time.monotonic(), value)
+            self.pending.discard(key)
+        return value
+
+    def cached_top(self, board=GLOBAL, limit=10, after=None):
+        return self.cached(("top", board, limit, after), self.top, board, limit, after)
+
+    def cached_rank(self, board=GLOBAL):
+        user = self.auth_manager.get_current_user() if self.auth_manager else None
+        if user is None:
+            return None
+        return self.cached(("rank", board, user["id"]), self.rank, board, user["id"])
+
+    def invalidate(self):
+        """Fetch everything again on next use, e.g. after new results were synced."""
+        with self.lock:
+            self.cache.clear()
+
+    def join_class(self, class_code):
+        """Put the current player in a class, their global score counts on its board from now on.
+
+        They leave the board of the class they were in before, a class_code of None only leaves it.
+        """
+        user = self.auth_manager.get_current_user()
+        if user is None:
+            return False
+        try:
+            conn = self.auth_manager._connect()
+            cursor = conn.cursor()
+            cursor.execute("SELECT class_code FROM player_stats WHERE user_id = %s FOR UPDATE", (user["id"],))
+            row = cursor.fetchone()
+            old_code = row[0] if row else None
+            if old_code and old_code != class_code:
+                cursor.execute("DELETE FROM leaderboard_entries WHERE board = %s AND user_id = %s RETURNING score",
+                               (class_board(old_code), user["id"]))
+                removed = cursor.fetchone()
+                if removed:
+                    cursor.execute("UPDATE leaderboard_counts SET users = users - 1 WHERE board = %s AND score = %s",
+                                   (class_board(old_code), removed[0]))
+                    cursor.execute("DELETE FROM leaderboard_counts WHERE board = %s AND score = %s AND users <= 0",
+                                   (class_board(old_code), removed[0]))
+            cursor.execute("UPDATE player_stats SET class_code = %s WHERE user_id = %s", (class_code, user["id"]))
+            if class_code:
+                cursor.execute(
+                    "SELECT leaderboard_add(%s, user_id, score, stages_cleared) FROM leaderboard_entries "
+                    "WHERE board = %s AND user_id = %s "
+                    "AND NOT EXISTS (SELECT 1 FROM leaderboard_entries WHERE board = %s AND user_id = %s)",
+                    (class_board(class_code), GLOBAL, user["id"], class_board(class_code), user["id"]))
+            conn.commit()
+            cursor.close()
+            conn.close()
+            self.invalidate()
+            return True
+        except Exception as e:
+            print(f"Could not join class {class_code}: {e}")
+            return False
+
+
+leaderboard = Leaderboard()
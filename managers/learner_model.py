@@ -0,0 +1,207 @@
+# Learner model for adaptive questions.
+#
+# Every student has an Elo-style skill rating per operation (+, -, *, /). Each
+# kind of question has a fixed rating too (ITEM_RATINGS, by operation and
+# number range), and the chance that a student answers it correctly is the Elo
+# expectation between the two. After every answer the student's rating moves
+# towards the result by K times the surprise, which is O(1) and needs no answer
+# history. To pick a question, every operation the level asks gets the number
+# range whose expected success is closest to TARGET_SUCCESS, and the operation is
+# drawn with a weight that falls with its distance from the target. Operations the
+# student finds too hard (or too easy) come up rarely, but never stop coming up,
+# so their ratings keep being measured.
+#
+# Ratings live in memory. A battle works on its own copy (so a replay can start
+# from the same numbers) and hands it back when it ends; only then is it written
+# to saves/learner_<user>.json and, for logged in players, the learner_skills
+# table, both on the auth thread.
+import json
+import os
+import threading
+from settings import SAVE_DIR
+from managers.save_manager import write_atomic
+
+OPERATIONS = ("+", "-", "*", "/")
+START_RATING = 1000
+# Rating of a question by operation and number range (MathQuestion's difficulty). Division
+# always uses small numbers, so its range doesn't matter
+ITEM_RATINGS = {
+    "+": {1: 700, 2: 900, 3: 1150},
+    "-": {1: 800, 2: 1000, 3: 1250},
+    "*": {1: 950, 2: 1200, 3: 1550},
+    "/": {1: 1100, 2: 1100, 3: 1100},
+}
+TARGET_SUCCESS = 0.75  # Aim for questions the student gets right three times out of four
+SPREAD = 0.1  # An operation's weight is 1 / (distance from TARGET_SUCCESS + SPREAD)
+K_NEW = 48  # Rating step for the first SETTLE_AFTER answers of an operation, so new students settle fast
+K = 24
+SETTLE_AFTER = 20
+MIN_RATING, MAX_RATING = 100, 3000
+
+
+def expected(rating, item_rating):
+    """Chance that a student with `rating` answers a question rated `item_rating` correctly."""
+    return 1 / (1 + 10 ** ((item_rating - rating) / 400))
+
+
+def clamp_difficulty(operation, difficulty):
+    """The closest number range ITEM_RATINGS has, levels.json may use higher difficulties."""
+    items = ITEM_RATINGS[operation]
+    return min(max(difficulty, min(items)), max(items))
+
+
+class StudentSkills:
+    """One student's ratings: operation -> [rating, answers]."""
+    def __init__(self, user_id=None, ratings=None):
+        self.user_id = user_id  # None for guests
+        self.ratings = {op: [START_RATING, 0] for op in OPERATIONS}
+        for op, (rating, answers) in (ratings or {}).items():
+            if op in self.ratings:
+                self.ratings[op] = [int(rating), int(answers)]
+
+    def copy(self):
+        return StudentSkills(self.user_id, self.ratings)
+
+    def snapshot(self):
+        """The ratings as a flat tuple (rating, answers per operation), e.g. for a replay header."""
+        return tuple(value for op in OPERATIONS for value in self.ratings[op])
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(None, {op: snapshot[2 * i:2 * i + 2] for i, op in enumerate(OPERATIONS)})
+
+    def pick(self, rng, min_difficulty=1, operations=OPERATIONS):
+        """Operation and difficulty (number range) of the next question, among `operations`."""
+        candidates = []
+        weights = []
+        for operation in operations:
+            rating = self.ratings[operation][0]
+            items = ITEM_RATINGS[operation]
+            lowest = clamp_difficulty(operation, min_difficulty)
+            difficulty = min((d for d in items if d >= lowest),
+                             key=lambda d: abs(expected(rating, items[d]) - TARGET_SUCCESS))
+            candidates.append((operation, difficulty))
+            weights.append(1 / (abs(expected(rating, items[difficulty]) - TARGET_SUCCESS) + SPREAD))
+        return rng.choices(candidates, weights)[0]
+
+    def record(self, operation, difficulty, correct):
+        """Update the rating of an operation after an answer (a timeout counts as wrong)."""
+        entry = self.ratings.get(operation)
+        if entry is None:
+            return
+        rating, answers = entry
+        k = K_NEW if answers < SETTLE_AFTER else K
+        item_rating = ITEM_RATINGS[operation][clamp_difficulty(operation, difficulty)]
+        rating += k * ((1 if correct else 0) - expected(rating, item_rating))
+        # Whole numbers, so a replay that starts from a snapshot computes exactly the same ratings
+        entry[0] = max(MIN_RATING, min(MAX_RATING, round(rating)))
+        entry[1] = min(answers + 1, 0xFFFF)
+
+
+class LearnerModel:
+    """Keeps every student's skills in memory and stores them lazily."""
+    def __init__(self):
+        self.save_dir = None
+        self.auth_manager = None
+        self.students = {}  # user id (None for guests) -> StudentSkills
+        self.lock = threading.Lock()
+
+    def init(self, script_dir, auth_manager=None):
+        self.save_dir = os.path.join(script_dir, SAVE_DIR)
+        self.auth_manager = auth_manager
+
+    def current_user_id(self):
+        user = self.auth_manager.get_current_user() if self.auth_manager else None
+        return user["id"] if user else None
+
+    def path(self, user_id):
+        name = f"learner_{user_id}.json" if user_id is not None else "learner_guest.json"
+        return os.path.join(self.save_dir, name)
+
+    def current(self):
+        """The current student's skills, loaded from the local file the first time they play."""
+        user_id = self.current_user_id()
+        with self.lock:
+            skills = self.students.get(user_id)
+            if skills is not None:
+                return skills
+            skills = self.students[user_id] = StudentSkills(user_id, self.load_local(user_id))
+        if user_id is not None:
+            # Another computer may have seen more of this student
+            self.auth_manager.run_in_background(self.fetch, user_id)
+        return skills
+
+    def load_local(self, user_id):
+        if self.save_dir is None:
+            return None
+        try:
+            with open(self.path(user_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not load the learner model: {e}")
+            return None
+
+    def update(self, skills):
+        """Take back a battle's copy of the skills and store them in the background."""
+        with self.lock:
+            stored = self.students.get(skills.user_id)
+            if stored is not None:
+                # Keep whichever estimate saw more answers, per operation (the database copy may have arrived meanwhile)
+                for op in OPERATIONS:
+                    if stored.ratings[op][1] > skills.ratings[op][1]:
+                        skills.ratings[op] = list(stored.ratings[op])
+            self.students[skills.user_id] = skills
+            ratings = {op: list(entry) for op, entry in skills.ratings.items()}
+        if self.save_dir is not None and self.auth_manager:
+            self.auth_manager.run_in_background(self.store, skills.user_id, ratings)
+
+    def store(self, user_id, ratings):
+        """Auth thread: write the ratings to the local file and, for players with an account, the database."""
+        try:
+            write_atomic(self.path(user_id), json.dumps(ratings).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not save the learner model: {e}")
+        if user_id is None:
+            return
+        try:
+            conn = self.auth_manager._connect()
+            cursor = conn.cursor()
+            for op, (rating, answers) in ratings.items():
+                cursor.execute(
+                    "INSERT INTO learner_skills (user_id, operation, rating, answers) VALUES (%s, %s, %s, %s) "
+                    "ON CONFLICT (user_id, operation) DO UPDATE SET rating = EXCLUDED.rating, "
+                    "answers = EXCLUDED.answers, updated_at = CURRENT_TIMESTAMP "
+                    "WHERE EXCLUDED.answers >= learner_skills.answers",
+                    (user_id, op, rating, answers))
+            conn.commit()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            print(f"Could not sync the learner model: {e}")
+
+    def fetch(self, user_id):
+        """Auth thread: use the database's ratings where they saw more answers than the local ones."""
+        try:
+            conn = self.auth_manager._connect()
+            cursor = conn.cursor()
+            cursor.execute("SELECT operation, rating, answers FROM learner_skills WHERE user_id = %s", (user_id,))
+            rows = cursor.fetchall()
+            cursor.close()
+            conn.close()
+        except Exception as e:
+            print(f"Could not load the learner model from the database: {e}")
+            return
+        with self.lock:
+            local = self.students[user_id].ratings
+            merged = {op: list(entry) for op, entry in local.items()}
+            for op, rating, answers in rows:
+                if op in merged and answers > merged[op][1]:
+                    merged[op] = [rating, answers]
+            # Swap in a new object, battles already running keep their own copy
+            self.students[user_id] = StudentSkills(user_id, merged)
+
+
+# Shared by the battles and the main game
+learner_model = LearnerModel()
@@ -0,0 +1,242 @@
+# Level and stage definitions.
+#
+# The source of truth is assets/data/levels.json. Compile it after editing:
+#
+#   python -m managers.level_data
+#
+# This validates the file and writes assets/data/levels.bin, a compact
+# struct-of-arrays table that loads with a handful of array.frombytes() calls no
+# matter how many stages there are. If the compiled table is missing or older than
+# the JSON it is rebuilt on first use, so forgetting to compile is never fatal.
+import array
+import json
+import os
+import struct
+import sys
+from managers.save_manager import write_atomic
+
+TABLE_VERSION = 1
+MAGIC = b"FQLV"
+# magic, version, byte order, source size, source mtime (ns)
+HEADER = struct.Struct("<4sHBqq")
+
+# Table name -> (numeric columns with their array typecodes, string columns)
+SCHEMA = {
+    "levels": (
+        (("id", "H"), ("enemy_hp", "i"), ("enemy_damage", "d"),
+         ("question_difficulty", "H"), ("timer_seconds", "H")),
+        ("name", "description"),
+    ),
+    "stages": (
+        (("id", "H"), ("map_x", "i"), ("map_y", "i"), ("radius", "H")),
+        ("sprite",),
+    ),
+}
+
+
+def source_path(script_dir):
+    return os.path.join(script_dir, "assets", "data", "levels.json")
+
+
+def compiled_path(script_dir):
+    return os.path.join(script_dir, "assets", "data", "levels.bin")
+
+
+def validate(data):
+    """Raise ValueError if the level definitions are malformed."""
+    if data.get("version") != TABLE_VERSION:
+        raise ValueError(f"levels.json has version {data.get('version')}, expected {TABLE_VERSION}")
+    for table, (columns, strings) in SCHEMA.items():
+        rows = data.get(table)
+        if not isinstance(rows, list) or not rows:
+            raise ValueError(f"levels.json needs a non-empty '{table}' list")
+        seen = set()
+        for row in rows:
+            for name, typecode in columns:
+                value = row.get(name)
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"{table} entry {row.get('id')}: '{name}' must be a number")
+                if typecode != "d" and not isinstance(value, int):
+                    raise ValueError(f"{table} entry {row.get('id')}: '{name}' must be a whole number")
+                if typecode in "HI" and value < 0:
+                    raise ValueError(f"{table} entry {row.get('id')}: '{name}' can't be negative")
+            for name in strings:
+                if not isinstance(row.get(name), str) or not row[name]:
+                    raise ValueError(f"{table} entry {row.get('id')}: '{name}' must be a non-empty string")
+            if row["id"] in seen:
+                raise ValueError(f"{table}: duplicate id {row['id']}")
+            seen.add(row["id"])
+
+    level_ids = {row["id"] for row in data["levels"]}
+    if 1 not in level_ids:
+        raise ValueError("levels.json must define level 1, other levels fall back to it")
+    for row in data["levels"]:
+        if row["enemy_hp"] <= 0 or row["timer_seconds"] <= 0:
+            raise ValueError(f"level {row['id']}: enemy_hp and timer_seconds must be positive")
+
+
+class Table:
+    """One struct-of-arrays table: a typed array per numeric column, a UTF-8 blob per string column."""
+    def __init__(self, columns, strings):
+        self.columns = columns  # name -> array
+        self.strings = strings  # name -> (offsets array, bytes)
+        self.count = len(columns["id"])
+        self.rows_by_id = {row_id: i for i, row_id in enumerate(columns["id"])}
+
+    @classmethod
+    def from_rows(cls, rows, columns, strings):
+        arrays = {name: array.array(typecode, (row[name] for row in rows)) for name, typecode in columns}
+        blobs = {}
+        for name in strings:
+            encoded = [row[name].encode("utf-8") for row in rows]
+            offsets = array.array("I", [0])
+            for chunk in encoded:
+                offsets.append(offsets[-1] + len(chunk))
+            blobs[name] = (offsets, b"".join(encoded))
+        return cls(arrays, blobs)
+
+    def get(self, index, name):
+        """A single value from row `index`. Whole-number floats come back as ints."""
+        if name in self.strings:
+            offsets, blob = self.strings[name]
+            return blob[offsets[index]:offsets[index + 1]].decode("utf-8")
+        value = self.columns[name][index]
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def row(self, row_id):
+        """Every field of the row with the given id as a dict, or None."""
+        index = self.rows_by_id.get(row_id)
+        if index is None:
+            return None
+        return {name: self.get(index, name) for name in list(self.columns) + list(self.strings)}
+
+
+class LevelTable:
+    """Battle settings per level and map placement per stage."""
+    def __init__(self, levels, stages):
+        self.levels = levels
+        self.stages = stages
+
+    @classmethod
+    def from_json(cls, data):
+        validate(data)
+        return cls(*(Table.from_rows(data[name], *SCHEMA[name]) for name in ("levels", "stages")))
+
+    def level_settings(self, level_id):
+        """Battle settings for a level, defaulting to level 1 if it has none of its own."""
+        return self.levels.row(level_id) or self.levels.row(1)
+
+    def stage_rows(self):
+        """(id, sprite, map_x, map_y, radius) for every stage, spawn point included."""
+        stages = self.stages
+        return [(stages.get(i, "id"), stages.get(i, "sprite"), stages.get(i, "map_x"),
+                 stages.get(i, "map_y"), stages.get(i, "radius")) for i in range(stages.count)]
+
+    def last_stage_id(self):
+        return max(self.stages.columns["id"])
+
+    # ----- Binary format -----
+
+    def to_bytes(self, source_size, source_mtime):
+        parts = [HEADER.pack(MAGIC, TABLE_VERSION, sys.byteorder == "little", source_size, source_mtime)]
+        for name, (columns, strings) in SCHEMA.items():
+            table = getattr(self, name)
+            parts.append(struct.pack("<I", table.count))
+            for column, _ in columns:
+                parts.append(table.columns[column].tobytes())
+            for column in strings:
+                offsets, blob = table.strings[column]
+                parts.append(offsets.tobytes())
+                parts.append(struct.pack("<I", len(blob)))
+                parts.append(blob)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data, source_size, source_mtime):
+        """Decode a compiled table, or return None if it is stale, truncated or from another version."""
+        if len(data) < HEADER.size:
+            return None
+        magic, version, little_endian, size, mtime = HEADER.unpack_from(data, 0)
+        if (magic != MAGIC or version != TABLE_VERSION or bool(little_endian) != (sys.byteorder == "little")
+                or size != source_size or mtime != source_mtime):
+            return None
+        pos = HEADER.size
+        tables = []
+        for columns, strings in SCHEMA.values():
+            if pos + 4 > len(data):
+                return None
+            (count,) = struct.unpack_from("<I", data, pos)
+            pos += 4
+            arrays = {}
+            for column, typecode in columns:
+                arrays[column] = array.array(typecode)
+                end = pos + count * arrays[column].itemsize
+                if end > len(data):
+                    return None
+                arrays[column].frombytes(data[pos:end])
+                pos = end
+            blobs = {}
+            for column in strings:
+                offsets = array.array("I")
+                end = pos + (count + 1) * offsets.itemsize
+                if end + 4 > len(data):
+                    return None
+                offsets.frombytes(data[pos:end])
+                (blob_size,) = struct.unpack_from("<I", data, end)
+                pos = end + 4
+                if pos + blob_size > len(data) or offsets[-1] != blob_size:
+                    return None
+                blobs[column] = (offsets, data[pos:pos + blob_size])
+                pos += blob_size
+            tables.append(Table(arrays, blobs))
+        return cls(*tables)
+
+
+def build_table(script_dir):
+    """Validate levels.json and write the compiled table next to it."""
+    source = source_path(script_dir)
+    with open(source, "r", encoding="utf-8") as f:
+        table = LevelTable.from_json(json.load(f))
+    stat = os.stat(source)
+    # Written atomically, so an interrupted compile never leaves half a table behind
+    write_atomic(compiled_path(script_dir), table.to_bytes(stat.st_size, stat.st_mtime_ns))
+    print(f"Compiled {table.levels.count} levels and {table.stages.count} stages")
+    return table
+
+
+def load_table(script_dir):
+    """Load the compiled table, recompiling it first if levels.json changed."""
+    stat = os.stat(source_path(script_dir))
+    try:
+        with open(compiled_path(script_dir), "rb") as f:
+            table = LevelTable.from_bytes(f.read(), stat.st_size, stat.st_mtime_ns)
+        if table:
+            return table
+        print("Level table is out of date or damaged, recompiling levels.json")
+    except (OSError, struct.error, ValueError):
+        pass  # Missing or damaged, recompile it
+    try:
+        return build_table(script_dir)
+    except OSError as e:
+        # Read-only install: use the definitions without caching them
+        print(f"Could not write the compiled level table: {e}")
+        with open(source_path(script_dir), "r", encoding="utf-8") as f:
+            return LevelTable.from_json(json.load(f))
+
+
+_tables = {}  # script_dir -> LevelTable
+
+
+def get_level_table(script_dir):
+    """The level table for this game directory, loaded once and shared by Levels and Level."""
+    table = _tables.get(script_dir)
+    if table is None:
+        table = _tables[script_dir] = load_table(script_dir)
+    return table
+
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    build_table(sys.argv[1] if len(sys.argv) > 1 else root)
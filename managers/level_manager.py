@@ -1,7 +1,11 @@
-import pygame
 import os
 from gameplay.battle import Battle
 from gameplay.levels import Level  # Combined Level class
+from managers.asset_manager import assets
+from managers.battle_assets import battle_assets
+from managers.level_data import get_level_table
+from managers.save_manager import SaveData, save_manager
+from managers.sync_queue import sync_queue
 
 class Levels:
     def __init__(self, script_dir):
@@ -14,55 +18,27 @@ class Levels:
         self.hero_type = None
         self.audio_manager = None
         self.game_instance = None
+        self.save = None
+        self.table = get_level_table(script_dir)
+        self.last_level_id = self.table.last_stage_id()
         self.load_levels()
 
     def load_levels(self):
         """Load level sprites and define their positions on the map."""
         LEVEL_SCALE = 0.15
-        level_names = ["spawn_point"] + [f"stage_{i}" for i in range(1, 21)]  # Includes spawn and 20 levels
+        # Positions and interaction radii come from assets/data/levels.json
+        level_data = self.table.stage_rows()
 
-        # Load and scale images once
-        for name in level_names:
+        # Load and scale images once, shared with any later Map
+        for _, name, _, _, _ in level_data:
             image_path = os.path.join(self.script_dir, "assets", "images", "levels", f"{name}.png")
-            original_img = pygame.image.load(image_path)
-            scaled_img = pygame.transform.scale(
-                original_img,
-                (
-                    int(original_img.get_width() * LEVEL_SCALE),
-                    int(original_img.get_height() * LEVEL_SCALE)
-                )
-            )
-            self.level_images[name] = scaled_img
-
-        # Define level positions and interaction radii
-        level_data = [
-            (0, "spawn_point", 1930, 1830, 0),
-            (1, "stage_1", 3000, 1830, 75),
-            (2, "stage_2", 4190, 1450, 75),
-            (3, "stage_3", 3375, 550, 75),
-            (4, "stage_4", 4715, 2575, 75),
-            (5, "stage_5", 5400, 1775, 75),
-            (6, "stage_6", 6350, 1225, 75),
-            (7, "stage_7", 6350, 2700, 75),
-            (8, "stage_8", 6300, 4500, 75),
-            (9, "stage_9", 6300, 6400, 75),
-            (10, "stage_10", 7880, 6150, 75),
-            (11, "stage_11", 9700, 4700, 75),
-            (12, "stage_12", 9600, 3050, 75),
-            (13, "stage_13", 7550, 4700, 75),
-            (14, "stage_14", 6830, 3550, 75),
-            (15, "stage_15", 7160, 1735, 75),
-            (16, "stage_16", 7975, 1835, 75),
-            (17, "stage_17", 8465, 1000, 75),
-            (18, "stage_18", 9050, 1835, 75),
-            (19, "stage_19", 9825, 1600, 75),
-            (20, "stage_20", 9700, 600, 75),
-        ]
+            self.level_images[name] = assets.load_scaled(image_path, scale=LEVEL_SCALE)
 
         self.levels = [
             {
                 "id": lvl_id,
                 "img": self.level_images[name],
+                "locked_img": self.create_locked_image(self.level_images[name]),
                 "map_x": x,
                 "map_y": y,
                 "width": self.level_images[name].get_width(),
@@ -73,12 +49,39 @@ class Levels:
             for lvl_id, name, x, y, radius in level_data
         ]
 
-    def set_context(self, screen, hero_type, audio_manager=None, game_instance=None):
-        """Set the screen, hero type, audio_manager and game_instance needed for the enter_level method."""
+    def create_locked_image(self, image):
+        """Dimmed copy of a level icon, drawn while the level is locked."""
+        locked_img = image.copy()
+        locked_img.set_alpha(100)
+        return locked_img
+
+    def set_context(self, screen, hero_type, audio_manager=None, game_instance=None, save=None):
+        """Set the screen, hero type, audio_manager and game_instance needed for the enter_level method.
+
+        Pass a save to continue a previous game, otherwise a new one is started.
+        """
         self.screen = screen
         self.hero_type = hero_type
         self.audio_manager = audio_manager
         self.game_instance = game_instance
+        if save is not None:
+            self.apply_save(save)
+        else:
+            self.save = SaveData(hero_type, self.last_level_id + 1)
+        # Get the furthest unlocked stage ready while the player walks there
+        battle_assets.prefetch_level(self.script_dir, self.next_stage_id(), hero_type)
+
+    def next_stage_id(self):
+        """The highest unlocked level, which is where the player is most likely headed."""
+        unlocked = [level["id"] for level in self.levels if level["unlocked"]]
+        return max(unlocked) if unlocked else None
+
+    def apply_save(self, save):
+        """Restore the unlocked levels from a save."""
+        self.save = save
+        for level in self.levels:
+            if level["id"] < save.stage_count:
+                level["unlocked"] = save.unlocked[level["id"]]
 
     def get_level_by_id(self, level_id):
         """Get a level by its ID."""
@@ -90,17 +93,12 @@ class Levels:
 
     def draw_levels(self, screen, map_x, map_y):
         """Draw all levels on the map at their correct positions."""
-        for level in self.levels:
-            level_screen_x = map_x + level["map_x"]
-            level_screen_y = map_y + level["map_y"]
-
-            if not level["unlocked"]:
-                # Dim locked levels
-                locked_img = level["img"].copy()
-                locked_img.set_alpha(100)
-                screen.blit(locked_img, (level_screen_x, level_screen_y))
-            else:
-                screen.blit(level["img"], (level_screen_x, level_screen_y))
+        # Dim locked levels, and draw everything with a single blits() call
+        screen.blits([
+            (level["img"] if level["unlocked"] else level["locked_img"],
+             (map_x + level["map_x"], map_y + level["map_y"]))
+            for level in self.levels
+        ], doreturn=False)
 
     def check_proximity(self, char_map_x, char_map_y):
         """Check if character is near any level and return the level ID if so."""
@@ -123,10 +121,19 @@ class Levels:
         level = self.get_level_by_id(level_id)
         if level and level["unlocked"]:
             self.active_level = level_id
+            battle_assets.prefetch_level(self.script_dir, level_id, self.hero_type)
+
+    def save_progress(self, level_id, victory, hp_left):
+        """Record a battle result and autosave in the background."""
+        for level in self.levels:
+            if level["id"] < self.save.stage_count:
+                self.save.unlocked[level["id"]] = level["unlocked"]
+        self.save.record_result(level_id, victory, hp_left)
+        save_manager.autosave(self.save)
 
     def unlock_level(self, level_id):
         """Unlock a level."""
-        if level_id > 20:
+        if level_id > self.last_level_id:
             return  # Prevent unlocking beyond max level
         level = self.get_level_by_id(level_id)
         if level:
@@ -137,6 +144,11 @@ class Levels:
         if self.active_level is not None and self.screen is not None:
             print(f"Level {self.active_level} is clicked")
 
+            # Battle assets are preloaded while walking the map, so this is usually instant
+            scene_key = assets.preload("battle", self.script_dir, hero=self.hero_type)
+            if self.game_instance:
+                self.game_instance.show_loading(scene_key)
+
             level = Level(self.script_dir, self.active_level)
 
             battle = Battle(
@@ -153,11 +165,16 @@ class Levels:
             if victory:
                 print(f"Victory! Level {self.active_level} completed.")
                 next_level_id = self.active_level + 1
-                if next_level_id <= 20:
+                if next_level_id <= self.last_level_id:
                     self.unlock_level(next_level_id)
+                    battle_assets.prefetch_level(self.script_dir, next_level_id, self.hero_type)
                 if on_enter:
                     on_enter(self.active_level, victory=True)
             else:
                 print(f"Defeat! Try level {self.active_level} again.")
                 if on_enter:
-                    on_enter(self.active_level, victory=False)
\ No newline at end of file
+                    on_enter(self.active_level, victory=False)
+
+            self.save_progress(self.active_level, victory, battle.player.hp)
+            sync_queue.record(self.active_level, victory, battle.get_score(), battle.get_duration_ms(),
+                              self.save.highest_unlocked())
\ No newline at end of file
@@ -0,0 +1,153 @@
+# Salted scrypt password hashes, computed in a worker process.
+#
+# Tune the cost for the machine the game is installed on:
+#
+#   python -m managers.password_hasher
+#
+# This times scrypt and writes the cost that takes about TARGET_MS to
+# assets/data/kdf.json. Without it DEFAULT_PARAMS is used.
+#
+# Stored hashes look like "scrypt$<n>$<r>$<p>$<salt>$<key>" (base64). Accounts
+# created before this have an unsalted SHA-256 hex digest, which still verifies
+# and is flagged for a rehash so AuthManager can upgrade it on the next login.
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+DEFAULT_PARAMS = {"n": 2 ** 14, "r": 8, "p": 1}
+TARGET_MS = 250
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def params_path(script_dir):
+    return os.path.join(script_dir, "assets", "data", "kdf.json")
+
+
+def load_params(script_dir):
+    """The calibrated scrypt cost, or the defaults if it hasn't been calibrated."""
+    try:
+        with open(params_path(script_dir), "r", encoding="utf-8") as f:
+            params = json.load(f)
+        return {key: int(params[key]) for key in DEFAULT_PARAMS}
+    except FileNotFoundError:
+        return dict(DEFAULT_PARAMS)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not read the password hashing cost, using defaults: {e}")
+        return dict(DEFAULT_PARAMS)
+
+
+def derive(password, salt, n, r, p):
+    # scrypt needs about 128 * r * n bytes, OpenSSL's default limit is only 32 MB
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * (n + p + 2) + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password(password, params):
+    """A new salted hash in the stored format."""
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = derive(password, salt, params["n"], params["r"], params["p"])
+    return f"scrypt${params['n']}${params['r']}${params['p']}${b64(salt)}${b64(key)}"
+
+
+def legacy_hash(password):
+    """The old unsalted SHA-256 hex digest."""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def verify_password(password, stored, params):
+    """Return (matches, needs_rehash) for a stored hash in either format."""
+    if not stored.startswith("scrypt$"):
+        return hmac.compare_digest(legacy_hash(password), stored), True
+    try:
+        _, n, r, p, salt, key = stored.split("$")
+        n, r, p = int(n), int(r), int(p)
+        salt, key = base64.b64decode(salt), base64.b64decode(key)
+    except ValueError:
+        return False, False
+    matches = hmac.compare_digest(derive(password, salt, n, r, p), key)
+    return matches, (n, r, p) != (params["n"], params["r"], params["p"])
+
+
+def calibrate(target_ms=TARGET_MS, r=8, p=1):
+    """Double scrypt's n until one hash takes at least target_ms on this machine."""
+    n = 2 ** 12
+    while True:
+        start = time.perf_counter()
+        derive("calibration", b"0" * SALT_BYTES, n, r, p)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms >= target_ms or n >= 2 ** 20:
+            return {"n": n, "r": r, "p": p}, elapsed_ms
+        n *= 2
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords in a worker process.
+
+    hash() and verify() block until the worker is done, so call them from a
+    background thread (AuthManager runs its requests on one) and the render
+    thread never waits on the KDF.
+    """
+    def __init__(self):
+        self.params = dict(DEFAULT_PARAMS)
+        self.pool = None
+
+    def init(self, script_dir):
+        self.params = load_params(script_dir)
+
+    def get_pool(self):
+        if self.pool is None:
+            # Spawn rather than fork, a forked copy of the game would inherit SDL's state
+            self.pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return self.pool
+
+    def warm_up(self):
+        """Start the worker process ahead of time, e.g. when the login screen opens."""
+        self.get_pool().submit(int)
+
+    def run(self, function, *args):
+        try:
+            return self.get_pool().submit(function, *args).result()
+        except BrokenProcessPool:
+            # The worker died (or couldn't start), do this one on the calling thread
+            print("Password hashing worker stopped, hashing on this thread instead")
+            self.pool = None
+            return function(*args)
+
+    def hash(self, password):
+        return self.run(hash_password, password, self.params)
+
+    def verify(self, password, stored):
+        """Return (matches, needs_rehash)."""
+        return self.run(verify_password, password, stored, self.params)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+
+# Shared by AuthManager
+password_hasher = PasswordHasher()
+
+
+if __name__ == "__main__":
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    params, elapsed_ms = calibrate()
+    os.makedirs(os.path.dirname(params_path(root)), exist_ok=True)
+    with open(params_path(root), "w", encoding="utf-8") as f:
+        json.dump(params, f)
+    print(f"scrypt n={params['n']} r={params['r']} p={params['p']} takes {elapsed_ms:.0f} ms, "
+          f"saved to {params_path(root)}")
@@ -0,0 +1,326 @@
+# Battle replays.
+#
+#   python -m managers.replay saves/replays/battle-20261019-101500123-L3.fqr             # watch it
+#   python -m managers.replay saves/replays/battle-20261019-101500123-L3.fqr --headless  # check it, 100x speed
+#
+# Battle and PVPBattle record everything their outcome depends on: the seed of
+# their question generator, the level (or the PvP settings and who won the coin
+# toss), the learner model's skills the questions were picked for, and every
+# answer, timeout and question with the time it happened. Times are battle time
+# in milliseconds, not counting time spent paused. The file is a struct-packed
+# header followed by the events, each one a varint time delta from the previous
+# event, a code byte and a varint argument, so a whole battle is a few hundred
+# bytes.
+#
+# The player rebuilds the battle from the header, drives it from a virtual clock
+# and applies the events when their time comes, either headless as fast as the
+# battle logic runs or drawn at normal speed. Recorded questions are checked
+# against the regenerated ones, so a replay that no longer matches the code
+# (e.g. after levels.json changed) is reported instead of silently diverging.
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from settings import SAVE_DIR, FPS
+from managers.save_manager import write_atomic
+
+REPLAY_VERSION = 2
+MAGIC = b"FQRP"
+# magic, version, mode, first player, difficulty, timer seconds, seed, level, hero 1, hero 2,
+# the student's skills when the battle started (rating and answers per operation, all 0 without
+# adaptive questions), recorded at (unix time), event count, CRC32 of the events
+HEADER = struct.Struct("<4sHBBBHIH8s8s8HdII")
+KEEP_REPLAYS = 20
+
+BATTLE, PVP = 0, 1
+MODES = {BATTLE: "battle", PVP: "pvp"}
+
+# Event codes. QUESTION carries a checksum of the question text, ANSWER the index of the
+# chosen button and END the result (0 left early, 1 player / player 1 won, 2 enemy / player 2 won)
+QUESTION, ANSWER, TIMEOUT, END = 1, 2, 3, 4
+HAS_ARG = {QUESTION, ANSWER, END}
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def question_checksum(text):
+    return zlib.crc32(text.encode("utf-8")) & 0xFFFF
+
+
+class Replay:
+    """The recording of one battle: its settings and its events as (time ms, code, arg)."""
+    def __init__(self, mode, seed, level_id=0, heroes=("boy", "girl"), first_player=0, difficulty=0,
+                 timer_seconds=0, skills=None):
+        self.mode = mode
+        self.seed = seed
+        self.level_id = level_id
+        self.heroes = heroes
+        self.first_player = first_player
+        self.difficulty = difficulty
+        self.timer_seconds = timer_seconds
+        self.skills = skills  # StudentSkills.snapshot() at the start, None if questions weren't adaptive
+        self.recorded_at = 0.0
+        self.events = []
+
+    def duration_ms(self):
+        return self.events[-1][0] if self.events else 0
+
+    def result(self):
+        """The recorded END result, or None if the recording stops before the end."""
+        return self.events[-1][2] if self.events and self.events[-1][1] == END else None
+
+    def to_bytes(self):
+        body = bytearray()
+        previous = 0
+        for t, code, arg in self.events:
+            write_varint(body, t - previous)
+            body.append(code)
+            if code in HAS_ARG:
+                write_varint(body, arg)
+            previous = t
+        header = HEADER.pack(MAGIC, REPLAY_VERSION, self.mode, self.first_player, self.difficulty,
+                             self.timer_seconds, self.seed, self.level_id, self.heroes[0].encode("ascii"),
+                             self.heroes[1].encode("ascii"), *(self.skills or (0,) * 8), self.recorded_at,
+                             len(self.events), zlib.crc32(body))
+        return header + bytes(body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a replay file, raising ValueError if it is damaged or from another version."""
+        try:
+            (magic, version, mode, first_player, difficulty, timer_seconds, seed, level_id, hero1, hero2,
+             *skills, recorded_at, count, checksum) = HEADER.unpack_from(data, 0)
+        except struct.error:
+            raise ValueError("replay file is truncated")
+        if magic != MAGIC:
+            raise ValueError("not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        body = data[HEADER.size:]
+        if zlib.crc32(body) != checksum or mode not in MODES:
+            raise ValueError("replay file is damaged")
+
+        heroes = (hero1.rstrip(b"\0").decode("ascii"), hero2.rstrip(b"\0").decode("ascii"))
+        replay = cls(mode, seed, level_id, heroes, first_player, difficulty, timer_seconds,
+                     tuple(skills) if any(skills) else None)
+        replay.recorded_at = recorded_at
+        offset = t = 0
+        try:
+            for _ in range(count):
+                delta, offset = read_varint(body, offset)
+                code = body[offset]
+                offset += 1
+                arg = 0
+                if code in HAS_ARG:
+                    arg, offset = read_varint(body, offset)
+                t += delta
+                replay.events.append((t, code, arg))
+        except IndexError:
+            raise ValueError("replay file is damaged")
+        return replay
+
+
+def load_replay(path):
+    with open(path, "rb") as f:
+        return Replay.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Collects a battle's events while it is played. Times are battle time in ms."""
+    def __init__(self, mode, seed, **settings):
+        self.replay = Replay(mode, seed, **settings)
+
+    def record(self, t, code, arg=0):
+        # Never step back in time, so every delta fits a varint
+        t = max(t, self.replay.events[-1][0] if self.replay.events else 0)
+        self.replay.events.append((t, code, arg))
+
+    def question(self, t, text):
+        self.record(t, QUESTION, question_checksum(text))
+
+    def answer(self, t, choice):
+        self.record(t, ANSWER, choice)
+
+    def timeout(self, t):
+        self.record(t, TIMEOUT)
+
+    def end(self, t, result):
+        self.record(t, END, result)
+
+    def save(self, script_dir):
+        """Write the replay to saves/replays, keeping the newest KEEP_REPLAYS. Returns the path."""
+        replay = self.replay
+        replay.recorded_at = time.time()
+        directory = os.path.join(script_dir, SAVE_DIR, "replays")
+        suffix = f"-L{replay.level_id}" if replay.mode == BATTLE else ""
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(replay.recorded_at))
+        name = f"{MODES[replay.mode]}-{stamp}{int(replay.recorded_at * 1000) % 1000:03d}{suffix}.fqr"
+        path = os.path.join(directory, name)
+        try:
+            write_atomic(path, replay.to_bytes())
+            replays = sorted((os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".fqr")),
+                             key=os.path.getmtime)
+            for old in replays[:-KEEP_REPLAYS]:
+                os.remove(old)
+        except OSError as e:
+            print(f"Could not save the replay: {e}")
+            return None
+        return path
+
+
+class ReplayPlayer:
+    """Drives a battle from a replay on a virtual clock.
+
+    Each step() moves the clock on by `speed` frames of 1 / FPS seconds and applies
+    the events that are due. Headless, the battle skips the pauses after its final
+    message, so a replay runs as fast as the battle logic allows.
+    """
+    def __init__(self, replay, speed=1.0, headless=False):
+        self.replay = replay
+        self.speed = speed
+        self.headless = headless
+        self.time = 0.0  # Virtual battle time in seconds
+        self.index = 0  # Next event
+        self.mismatches = []  # (time ms, what differed)
+        self.result = None
+
+    def now(self):
+        """The battle's clock while it is replayed."""
+        return self.time
+
+    def create_battle(self, screen, script_dir, audio_manager=None):
+        """Build the battle the replay was recorded in, driven by this player."""
+        replay = self.replay
+        if replay.mode == PVP:
+            from gameplay.pvp_battle import PVPBattle
+            battle = PVPBattle(screen, script_dir, replay.heroes[0], replay.heroes[1], audio_manager, replay=self)
+            battle.start_replay()
+        else:
+            from gameplay.battle import Battle
+            from gameplay.levels import Level
+            battle = Battle(screen, script_dir, Level(script_dir, replay.level_id), replay.heroes[0], audio_manager,
+                            replay=self)
+        self.apply_due(battle)  # The first question is asked at time 0
+        return battle
+
+    def step(self, battle):
+        """Advance the clock by one frame and apply the events that are now due."""
+        self.time += self.speed / FPS
+        self.apply_due(battle)
+
+    def apply_due(self, battle):
+        events = self.replay.events
+        frame_time = self.time
+        while self.index < len(events) and events[self.index][0] <= frame_time * 1000:
+            # Run the event at exactly the recorded time, not at the end of the frame, so the
+            # next question's timer and the answer latencies match the recording
+            self.time = events[self.index][0] / 1000
+            self.apply(battle, *events[self.index])
+            self.index += 1
+        self.time = frame_time
+
+    def apply(self, battle, t, code, arg):
+        if code == QUESTION:
+            if question_checksum(battle.current_question.question_text) != arg:
+                self.mismatches.append((t, f"question {battle.current_question.question_text!r} differs"))
+        elif code == ANSWER:
+            if not battle.running or arg >= len(battle.current_question.choices):
+                self.mismatches.append((t, f"answer {arg} can't be given"))
+                return
+            battle.selected_answer = battle.current_question.choices[arg]
+            battle.check_answer()
+        elif code == TIMEOUT:
+            if battle.running:
+                battle.time_out()
+        elif code == END:
+            battle.running = False
+            self.result = battle.replay_result()
+            if self.result != arg:
+                self.mismatches.append((t, f"ended with result {self.result} instead of {arg}"))
+
+    def finish(self, battle):
+        """Apply whatever is left, e.g. the END recorded after the final message."""
+        self.time = max(self.time, self.replay.duration_ms() / 1000)
+        self.apply_due(battle)
+        if self.result is None:
+            self.result = battle.replay_result()
+
+    def run(self, battle, on_frame=None):
+        """Play the whole replay. `on_frame` is called after every step, e.g. to draw."""
+        while battle.running and self.index < len(self.replay.events):
+            self.step(battle)
+            battle.update_timer()
+            if on_frame:
+                on_frame()
+        self.finish(battle)
+        return self.result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back a recorded battle.")
+    parser.add_argument("path", help="A .fqr file from saves/replays")
+    parser.add_argument("--headless", action="store_true", help="Don't open a window, just run the battle logic")
+    parser.add_argument("--speed", type=float, help="Playback speed (default 1, or 100 headless)")
+    args = parser.parse_args(argv)
+
+    replay = load_replay(args.path)
+    speed = args.speed or (100.0 if args.headless else 1.0)
+    print(f"{MODES[replay.mode]} replay: level {replay.level_id}, heroes {replay.heroes[0]}/{replay.heroes[1]}, "
+          f"{len(replay.events)} events, {replay.duration_ms() / 1000:.1f}s, "
+          f"recorded {time.strftime('%Y-%m-%d %H:%M', time.localtime(replay.recorded_at))}")
+
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from managers import display
+    from managers.asset_manager import assets
+    script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(script_dir)  # The fonts are loaded relative to the game directory
+    pygame.init()
+    screen = display.create_display("Final Quiztasy replay")
+    assets.init_atlases(script_dir)
+
+    player = ReplayPlayer(replay, speed, args.headless)
+    battle = player.create_battle(screen, script_dir)
+    clock = pygame.time.Clock()
+
+    def draw_frame():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                battle.running = False
+        battle.draw()
+        display.present()
+        clock.tick(FPS)
+
+    start = time.perf_counter()
+    result = player.run(battle, None if args.headless else draw_frame)
+    elapsed = time.perf_counter() - start
+    pygame.quit()
+
+    print(f"Result {result} (recorded {replay.result()}), played in {elapsed:.2f}s")
+    for t, problem in player.mismatches:
+        print(f"  {t / 1000:8.2f}s  {problem}")
+    return 1 if player.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# Single player save files.
+#
+# A save is a small binary file: a struct-packed header, a bitset with one bit
+# per unlocked stage, and a fixed-size stats record per stage. Files are written
+# to a temporary file and renamed over the old one, so a crash mid-save never
+# leaves a half-written save behind.
+#
+# Autosaves are debounced and written on a background thread, so finishing a
+# battle never waits on the disk. Progress is sent to PostgreSQL separately by
+# managers/sync_queue.py.
+import os
+import struct
+import threading
+import time
+import zlib
+from settings import SAVE_DIR, AUTOSAVE_DELAY
+
+SAVE_VERSION = 1
+MAGIC = b"FQSV"
+# magic, version, hero, saved at (unix time), stage count, CRC32 of everything after the header
+HEADER = struct.Struct("<4sH8sdHI")
+# wins, losses, best remaining hp
+STAGE_STATS = struct.Struct("<HHf")
+
+
+class SaveData:
+    """Progress of one single player run."""
+    def __init__(self, hero="boy", stage_count=21):
+        self.hero = hero
+        self.unlocked = [stage_id == 1 for stage_id in range(stage_count)]  # Only level 1 by default
+        self.stats = [[0, 0, 0.0] for _ in range(stage_count)]  # wins, losses, best hp
+        self.saved_at = 0.0
+
+    @property
+    def stage_count(self):
+        return len(self.unlocked)
+
+    def highest_unlocked(self):
+        return max((stage_id for stage_id, unlocked in enumerate(self.unlocked) if unlocked), default=1)
+
+    def record_result(self, level_id, victory, hp_left=0.0):
+        """Count a battle result for a stage."""
+        if not 0 <= level_id < self.stage_count:
+            return
+        stats = self.stats[level_id]
+        if victory:
+            stats[0] = min(stats[0] + 1, 0xFFFF)
+            stats[2] = max(stats[2], float(hp_left))
+        else:
+            stats[1] = min(stats[1] + 1, 0xFFFF)
+
+    def to_bytes(self):
+        bits = bytearray((self.stage_count + 7) // 8)
+        for stage_id, unlocked in enumerate(self.unlocked):
+            if unlocked:
+                bits[stage_id // 8] |= 1 << (stage_id % 8)
+        body = bytes(bits) + b"".join(STAGE_STATS.pack(*stats) for stats in self.stats)
+        header = HEADER.pack(MAGIC, SAVE_VERSION, self.hero.encode("ascii"), self.saved_at,
+                             self.stage_count, zlib.crc32(body))
+        return header + body
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a save file, raising ValueError if it is damaged or from another version."""
+        try:
+            magic, version, hero, saved_at, stage_count, checksum = HEADER.unpack_from(data, 0)
+        except struct.error:
+            raise ValueError("save file is truncated")
+        if magic != MAGIC:
+            raise ValueError("not a save file")
+        if version != SAVE_VERSION:
+            raise ValueError(f"unsupported save version {version}")
+        body = data[HEADER.size:]
+        bitset_size = (stage_count + 7) // 8
+        if len(body) != bitset_size + stage_count * STAGE_STATS.size or zlib.crc32(body) != checksum:
+            raise ValueError("save file is damaged")
+
+        save = cls(hero.rstrip(b"\0").decode("ascii"), stage_count)
+        save.saved_at = saved_at
+        save.unlocked = [bool(body[i // 8] & (1 << (i % 8))) for i in range(stage_count)]
+        save.stats = [list(STAGE_STATS.unpack_from(body, bitset_size + i * STAGE_STATS.size))
+                      for i in range(stage_count)]
+        return save
+
+
+def write_atomic(path, data):
+    """Write a file by renaming a fully written temporary file over it."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class SaveManager:
+    """Loads saves and writes autosaves in the background.
+
+    autosave() only snapshots the progress (a few hundred bytes) on the calling
+    thread. A worker thread waits AUTOSAVE_DELAY seconds for the results to settle
+    and writes the newest snapshot.
+    """
+    def __init__(self):
+        self.save_dir = None
+        self.auth_manager = None
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # Keeps a flush() from the main thread and the worker in order
+        self.wake = threading.Event()
+        self.pending = None  # (path, bytes) waiting to be written
+        self.due = 0.0
+        self.worker = None
+
+    def init(self, script_dir, auth_manager=None):
+        self.save_dir = os.path.join(script_dir, SAVE_DIR)
+        self.auth_manager = auth_manager
+
+    def current_user_id(self):
+        user = self.auth_manager.get_current_user() if self.auth_manager else None
+        return user["id"] if user else None
+
+    def save_path(self, user_id=None):
+        """Each account gets its own save, everyone else shares the guest save."""
+        name = f"user_{user_id}.sav" if user_id is not None else "guest.sav"
+        return os.path.join(self.save_dir, name)
+
+    def load(self):
+        """The current player's save, or None if there isn't a usable one."""
+        if self.save_dir is None:
+            return None
+        path = self.save_path(self.current_user_id())
+        with self.lock:
+            pending = self.pending
+        try:
+            if pending is not None and pending[0] == path:
+                # An autosave that hasn't been written yet is newer than the file
+                return SaveData.from_bytes(pending[1])
+            with open(path, "rb") as f:
+                return SaveData.from_bytes(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not load save {path}: {e}")
+            return None
+
+    def autosave(self, save):
+        """Snapshot the progress now and write it shortly afterwards on the save thread."""
+        if self.save_dir is None:
+            return
+        save.saved_at = time.time()
+        snapshot = (self.save_path(self.current_user_id()), save.to_bytes())
+        with self.lock:
+            self.pending = snapshot
+            self.due = time.monotonic() + AUTOSAVE_DELAY
+        self.start_worker()
+        self.wake.set()
+
+    def start_worker(self):
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self.worker_loop, daemon=True)
+            self.worker.start()
+
+    def worker_loop(self):
+        """Background thread: write the newest snapshot once no new one arrived for a while."""
+        while True:
+            self.wake.wait()
+            with self.lock:
+                delay = self.due - time.monotonic()
+                if delay <= 0:
+                    self.wake.clear()
+            if delay > 0:
+                time.sleep(min(delay, 0.5))
+                continue
+            self.flush()
+
+    def flush(self):
+        """Write the pending snapshot right away, e.g. before quitting."""
+        with self.write_lock:
+            with self.lock:
+                snapshot, self.pending = self.pending, None
+            if snapshot is None:
+                return
+            path, data = snapshot
+            try:
+                write_atomic(path, data)
+            except OSError as e:
+                print(f"Could not write save {path}: {e}")
+
+
+# Shared by the map, the level manager and the game modes menu
+save_manager = SaveManager()
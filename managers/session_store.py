@@ -0,0 +1,87 @@
+# Remembered logins.
+#
+# After a successful login the session token is written to saves/session.json,
+# signed with a per-install key (saves/session.key) so the file can't be edited
+# to impersonate another account. On the next launch AuthManager restores the
+# user from it without touching the network, then checks the token against the
+# sessions table in the background.
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from settings import SAVE_DIR, SESSION_DAYS
+from managers.save_manager import write_atomic
+
+
+def token_hash(token):
+    """What the database stores instead of the token itself."""
+    return hashlib.sha256(token.encode("ascii")).hexdigest()
+
+
+def new_token():
+    return secrets.token_urlsafe(32), time.time() + SESSION_DAYS * 24 * 60 * 60
+
+
+class SessionStore:
+    """Signed session token kept on disk between launches."""
+    def __init__(self, script_dir):
+        self.path = os.path.join(script_dir, SAVE_DIR, "session.json")
+        self.key_path = os.path.join(script_dir, SAVE_DIR, "session.key")
+
+    def signing_key(self):
+        """The per-install signing key, created the first time it is needed."""
+        try:
+            with open(self.key_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            key = secrets.token_bytes(32)
+            write_atomic(self.key_path, key)
+            try:
+                os.chmod(self.key_path, 0o600)
+            except OSError:
+                pass
+            return key
+
+    def sign(self, payload):
+        return hmac.new(self.signing_key(), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def save(self, user, token, expires_at):
+        """Remember a login."""
+        payload = json.dumps({"id": user["id"], "email": user["email"], "token": token, "expires_at": expires_at},
+                             sort_keys=True)
+        try:
+            write_atomic(self.path, json.dumps({"session": payload, "signature": self.sign(payload)}).encode("utf-8"))
+        except OSError as e:
+            print(f"Could not remember the login: {e}")
+
+    def load(self):
+        """The remembered session as a dict, or None if there is none or it is invalid or expired."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            payload = stored["session"]
+            if not hmac.compare_digest(self.sign(payload), stored["signature"]):
+                print("Remembered login has an invalid signature, ignoring it")
+                self.clear()
+                return None
+            session = json.loads(payload)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Could not read the remembered login: {e}")
+            return None
+        if session["expires_at"] < time.time():
+            self.clear()
+            return None
+        return session
+
+    def clear(self):
+        """Forget the remembered login."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not forget the login: {e}")
@@ -0,0 +1,162 @@
+# Write-behind sync of single player progress to PostgreSQL.
+#
+# Battle results are appended to a local journal (saves/sync_queue.jsonl) the
+# moment they happen. A background thread sends them to the database in batches:
+# repeated results for the same stage are coalesced into one upsert, and when the
+# database can't be reached it retries with exponential backoff. The journal is
+# only trimmed after a batch was committed, so results survive restarts and
+# offline sessions.
+import json
+import os
+import threading
+import time
+from settings import SAVE_DIR
+from managers.save_manager import write_atomic
+from managers.leaderboard import leaderboard
+
+RETRY_MIN = 1.0  # Seconds before the first retry after a failed flush
+RETRY_MAX = 60.0
+BATCH_DELAY = 1.0  # Wait this long after an event so results close together share a batch
+
+
+def coalesce(events):
+    """Merge events per (user, stage) into the rows of a single upsert."""
+    rows = {}
+    levels = {}  # user id -> highest unlocked level
+    for event in events:
+        key = (event["user_id"], event["stage"])
+        row = rows.setdefault(key, {"cleared": False, "attempts": 0, "best_score": 0, "best_time_ms": None})
+        row["attempts"] += 1
+        row["best_score"] = max(row["best_score"], event["score"])
+        if event["cleared"]:
+            row["cleared"] = True
+            if row["best_time_ms"] is None or event["time_ms"] < row["best_time_ms"]:
+                row["best_time_ms"] = event["time_ms"]
+        levels[event["user_id"]] = max(levels.get(event["user_id"], 1), event["level"])
+    return rows, levels
+
+
+class SyncQueue:
+    """Durable queue of progress events with a background flusher."""
+    def __init__(self):
+        self.path = None
+        self.auth_manager = None
+        self.events = []  # Recorded but not yet committed, oldest first
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.flusher = None
+
+    def init(self, script_dir, auth_manager):
+        """Open the journal and start sending anything left over from earlier sessions."""
+        self.path = os.path.join(script_dir, SAVE_DIR, "sync_queue.jsonl")
+        self.auth_manager = auth_manager
+        self.events = self.read_journal()
+        if self.events:
+            print(f"{len(self.events)} progress updates waiting to be synced")
+            self.start_flusher()
+
+    def read_journal(self):
+        events = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        pass  # A line cut off by a crash, the rest is still good
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Could not read the sync queue: {e}")
+        return events
+
+    def record(self, stage, cleared, score, time_ms, level):
+        """Queue a battle result for the logged in player. Returns immediately."""
+        user = self.auth_manager.get_current_user() if self.auth_manager else None
+        if user is None or self.path is None:
+            return  # Guests only keep their progress in the local save
+        event = {"user_id": user["id"], "stage": stage, "cleared": bool(cleared),
+                 "score": int(score), "time_ms": int(time_ms), "level": level, "at": time.time()}
+        with self.lock:
+            self.events.append(event)
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event) + "\n")
+            except OSError as e:
+                print(f"Could not write the sync queue: {e}")
+            self.start_flusher()
+        self.wake.set()
+
+    def start_flusher(self):
+        if self.flusher is None or not self.flusher.is_alive():
+            self.flusher = threading.Thread(target=self.flusher_loop, daemon=True)
+            self.flusher.start()
+
+    def flusher_loop(self):
+        """Background thread: send batches until the queue is empty, backing off while the DB is down."""
+        retry_delay = RETRY_MIN
+        while True:
+            self.wake.wait(timeout=5)
+            self.wake.clear()
+            time.sleep(BATCH_DELAY)
+            with self.lock:
+                batch = list(self.events)
+                if not batch:
+                    self.flusher = None  # record() starts a new one
+                    return
+            if self.send(batch):
+                retry_delay = RETRY_MIN
+                self.commit(len(batch))
+                leaderboard.invalidate()  # The new results moved the player on the boards
+            else:
+                print(f"Progress sync failed, retrying in {retry_delay:.0f}s")
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, RETRY_MAX)
+                self.wake.set()
+
+    def send(self, batch):
+        """Upsert a batch of events in one transaction. Returns True once it is committed."""
+        rows, levels = coalesce(batch)
+        try:
+            from psycopg2.extras import execute_values
+            conn = self.auth_manager._connect()
+            try:
+                cursor = conn.cursor()
+                execute_values(cursor, '''
+                    INSERT INTO stage_progress (user_id, stage_id, cleared, attempts, best_score, best_time_ms)
+                    VALUES %s
+                    ON CONFLICT (user_id, stage_id) DO UPDATE SET
+                        cleared = stage_progress.cleared OR EXCLUDED.cleared,
+                        attempts = stage_progress.attempts + EXCLUDED.attempts,
+                        best_score = GREATEST(stage_progress.best_score, EXCLUDED.best_score),
+                        best_time_ms = LEAST(stage_progress.best_time_ms, EXCLUDED.best_time_ms),
+                        updated_at = CURRENT_TIMESTAMP''',
+                    [(user_id, stage, row["cleared"], row["attempts"], row["best_score"], row["best_time_ms"])
+                     for (user_id, stage), row in rows.items()])
+                execute_values(cursor, '''
+                    UPDATE player_stats SET level = GREATEST(player_stats.level, v.level)
+                    FROM (VALUES %s) AS v (user_id, level)
+                    WHERE player_stats.user_id = v.user_id''',
+                    list(levels.items()))
+                conn.commit()
+                cursor.close()
+            finally:
+                conn.close()
+            return True
+        except Exception as e:
+            print(f"Database error syncing progress: {e}")
+            return False
+
+    def commit(self, count):
+        """Drop the first `count` events now that they are in the database, and trim the journal."""
+        with self.lock:
+            del self.events[:count]
+            try:
+                write_atomic(self.path, "".join(json.dumps(event) + "\n" for event in self.events).encode("utf-8"))
+            except OSError as e:
+                print(f"Could not trim the sync queue: {e}")
+
+
+# Shared by the level manager and the main game
+sync_queue = SyncQueue()
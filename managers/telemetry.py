@@ -0,0 +1,228 @@
+# Gameplay telemetry.
+#
+# emit() puts one tuple on an in-memory ring and returns. The ring is a bounded
+# deque: append and popleft are atomic, so the game thread never takes a lock
+# and never touches the disk. A background thread drains the ring every
+# FLUSH_INTERVAL seconds (sooner once FLUSH_AT events are waiting) and appends
+# the batch as JSON lines to a gzip log in saves/telemetry/. Every batch is its
+# own gzip member, so a crash can only cut off the batch being written and the
+# rest of the file still reads with gzip.open(). Logs rotate at ROTATE_BYTES and
+# only the newest KEEP_LOGS are kept.
+#
+# With TELEMETRY_UPLOAD set in settings.py each batch is also inserted into the
+# telemetry_events table. That is best effort, the local log is the record.
+#
+# If the game emits faster than the flusher drains, the ring overwrites the
+# oldest events; the gap in sequence numbers is logged as a "dropped" event.
+import gzip
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from settings import SAVE_DIR, TELEMETRY, TELEMETRY_UPLOAD
+
+RING_SIZE = 8192
+FLUSH_AT = 1024  # Wake the flusher early once this many events are waiting
+FLUSH_INTERVAL = 2.0  # Seconds between flushes otherwise
+ROTATE_BYTES = 1024 * 1024  # Start a new log once the current one is this big (compressed)
+KEEP_LOGS = 10
+
+# Field names of every event kind, emit() takes the values in this order
+FIELDS = {
+    "question": ("mode", "stage", "difficulty", "text", "answer"),
+    # outcome is "correct", "wrong" or "timeout", damage went to the side with target_hp left
+    "answer": ("mode", "stage", "outcome", "latency_ms", "damage", "target_hp"),
+    "battle_end": ("mode", "stage", "result", "score", "duration_ms", "frames", "frame_ms", "worst_frame_ms"),
+    "scene": ("name", "ms"),
+    "dropped": ("count",),
+}
+
+
+def encode(session, event):
+    """One ring entry as a log record."""
+    seq, at, user_id, kind, values = event
+    record = {"session": session, "seq": seq, "t": round(at, 3), "user": user_id, "kind": kind}
+    record.update(zip(FIELDS[kind], values))
+    return record
+
+
+def read_log(path):
+    """Every record of a telemetry log, e.g. for analysis scripts."""
+    records = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                records.append(json.loads(line))
+        except (EOFError, ValueError):
+            pass  # The last batch was cut off by a crash, the ones before it are complete
+    return records
+
+
+class FrameStats:
+    """Frame count plus average and worst frame time of a scene, for its end event."""
+    def __init__(self):
+        self.frames = 0
+        self.total_ms = 0
+        self.worst_ms = 0
+
+    def add(self, clock):
+        """Count the frame a pygame Clock just ticked, without the time it slept."""
+        ms = clock.get_rawtime()
+        self.frames += 1
+        self.total_ms += ms
+        if ms > self.worst_ms:
+            self.worst_ms = ms
+
+    def values(self):
+        """frames, average ms and worst ms, in the order of the battle_end fields."""
+        return self.frames, round(self.total_ms / self.frames, 2) if self.frames else 0.0, self.worst_ms
+
+
+class Telemetry:
+    """Structured gameplay events, buffered in memory and written in batches."""
+    def __init__(self):
+        self.enabled = TELEMETRY
+        self.ring = deque(maxlen=RING_SIZE)
+        self.counter = itertools.count()
+        self.session = uuid.uuid4().hex[:12]  # Tells apart the runs in a log
+        self.directory = None
+        self.auth_manager = None
+        self.user_id = None  # Logged in player, set by AuthManager and stamped on every event
+        self.log_path = None
+        self.next_seq = 0  # First sequence number not flushed yet
+        self.flush_lock = threading.Lock()  # Between the flusher and flush() on exit
+        self.wake = threading.Event()
+        self.flusher = None
+        self.table_ready = False
+        self.upload_failing = False
+
+    def init(self, script_dir, auth_manager=None):
+        """Pick the log directory and start the flusher. Events emitted before this are kept."""
+        self.directory = os.path.join(script_dir, SAVE_DIR, "telemetry")
+        self.auth_manager = auth_manager
+        if self.enabled and self.flusher is None:
+            self.flusher = threading.Thread(target=self.flusher_loop, daemon=True)
+            self.flusher.start()
+
+    def set_user(self, user_id):
+        """The player whose events follow (None for guests). Called on login and logout."""
+        self.user_id = user_id
+
+    def emit(self, kind, *values):
+        """Record an event. Called on the game thread, so it only appends to the ring."""
+        if not self.enabled:
+            return
+        self.ring.append((next(self.counter), time.time(), self.user_id, kind, values))
+        if len(self.ring) >= FLUSH_AT and not self.wake.is_set():
+            self.wake.set()
+
+    def flusher_loop(self):
+        """Background thread: write whatever is in the ring every FLUSH_INTERVAL seconds."""
+        while True:
+            self.wake.wait(timeout=FLUSH_INTERVAL)
+            self.wake.clear()
+            self.flush()
+
+    def drain(self):
+        """Take every event out of the ring, adding a "dropped" event for any it overwrote."""
+        events = []
+        try:
+            while True:
+                event = self.ring.popleft()
+                if event[0] > self.next_seq:
+                    events.append((self.next_seq, event[1], event[2], "dropped", (event[0] - self.next_seq,)))
+                self.next_seq = event[0] + 1
+                events.append(event)
+        except IndexError:
+            pass
+        return events
+
+    def flush(self):
+        """Write the events waiting in the ring. Safe to call from any thread, e.g. on exit."""
+        if self.directory is None:
+            return
+        with self.flush_lock:
+            events = self.drain()
+            if not events:
+                return
+            records = [encode(self.session, event) for event in events]
+            try:
+                self.write(records)
+            except OSError as e:
+                print(f"Could not write telemetry: {e}")
+            if TELEMETRY_UPLOAD and self.auth_manager:
+                self.upload(records)
+
+    def write(self, records):
+        """Append the records to the current log as one gzip member, rotating it when it is full."""
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        path = self.current_log()
+        with open(path, "ab") as f:
+            f.write(gzip.compress(data.encode("utf-8")))
+            full = f.tell() >= ROTATE_BYTES
+        if full:
+            self.log_path = None
+
+    def current_log(self):
+        if self.log_path is None:
+            os.makedirs(self.directory, exist_ok=True)
+            logs = self.logs()
+            if logs and os.path.getsize(logs[-1]) < ROTATE_BYTES:
+                self.log_path = logs[-1]  # Keep filling the last session's log
+            else:
+                name = f"telemetry-{time.strftime('%Y%m%d-%H%M%S')}-{self.session[:4]}.jsonl.gz"
+                self.log_path = os.path.join(self.directory, name)
+                logs.append(self.log_path)
+                for old in logs[:-KEEP_LOGS]:
+                    os.remove(old)
+        return self.log_path
+
+    def logs(self):
+        """Paths of the telemetry logs, oldest first."""
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.startswith("telemetry-"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, name) for name in names]
+
+    def upload(self, records):
+        """Insert a batch into telemetry_events. Failed batches are only kept in the local log."""
+        try:
+            from psycopg2.extras import execute_values
+            conn = self.auth_manager._connect()
+            try:
+                cursor = conn.cursor()
+                if not self.table_ready:
+                    cursor.execute('''CREATE TABLE IF NOT EXISTS telemetry_events
+                    (session VARCHAR (32) NOT NULL,
+                        seq INTEGER NOT NULL,
+                        user_id INTEGER NULL REFERENCES users (id),
+                        at TIMESTAMP NOT NULL,
+                        kind VARCHAR (32) NOT NULL,
+                        data JSONB NOT NULL,
+                        PRIMARY KEY (session, seq))''')
+                execute_values(
+                    cursor,
+                    "INSERT INTO telemetry_events (session, seq, user_id, at, kind, data) VALUES %s "
+                    "ON CONFLICT DO NOTHING",
+                    [(r["session"], r["seq"], r["user"], r["t"], r["kind"],
+                      json.dumps({k: v for k, v in r.items() if k not in ("session", "seq", "user", "t", "kind")}))
+                     for r in records],
+                    template="(%s, %s, %s, to_timestamp(%s), %s, %s)")
+                conn.commit()
+                cursor.close()
+            finally:
+                conn.close()
+            self.table_ready = True
+            self.upload_failing = False
+        except Exception as e:
+            if not self.upload_failing:  # Once per outage, not every batch
+                print(f"Could not upload telemetry: {e}")
+            self.upload_failing = True
+
+
+# Shared by the battles, the screens and the main game
+telemetry = Telemetry()
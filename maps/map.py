@@ -1,10 +1,13 @@
 import pygame
 import os
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
 from ui.back_button import BackButton
 from .map_character_movement import MapCharacterMovement
 from ui.button import Button
 from managers.level_manager import Levels
+from managers.asset_manager import assets
+from managers.game_clock import GameClock, lerp
+from managers import display
 
 class Map:
     def __init__(self, screen, script_dir, go_back_callback, audio_manager, hero_type=None, game_instance=None):
@@ -26,7 +29,7 @@ class Map:
             self.audio_manager.play_music()
 
         # Load and scale the map
-        self.map_original = pygame.image.load(os.path.join(script_dir, "assets", "images", "map", "lspu_map.png"))
+        self.map_original = assets.load_image(os.path.join(script_dir, "assets", "images", "map", "lspu_map.png"))
         SCALE_FACTOR = 3
         self.map_width = int(self.map_original.get_width() * SCALE_FACTOR)
         self.map_height = int(self.map_original.get_height() * SCALE_FACTOR)
@@ -54,17 +57,23 @@ class Map:
             self.screen,
             self.hero_type,
             self.audio_manager,
-            game_instance=self.game_instance  # Assuming Map is created with game_instance reference
+            game_instance=self.game_instance,  # Assuming Map is created with game_instance reference
+            save=getattr(self.game_instance, "save_data", None)  # Set when continuing a saved game
         )
 
         # Initialize enter button (but don't create it yet - will be created dynamically)
         self.enter_button = None
 
-        # Initialize clock for the run method
-        self.clock = pygame.time.Clock()
+        # Fixed-timestep clock for the run method
+        self.clock = GameClock()
+        self.previous_map_pos = (self.map_x, self.map_y)
 
-        # Set the character to spawn at level 0
-        self.spawn_at_level(0)
+        # Spawn at level 0, or at the furthest unlocked level when continuing a saved game
+        furthest_level = self.levels_manager.save.highest_unlocked()
+        self.spawn_at_level(furthest_level if furthest_level > 1 else 0)
+
+        # Warm up the battle assets while the player walks to a level
+        assets.preload("battle", script_dir, hero=self.hero_type)
 
     def spawn_at_level(self, level_id):
         """Spawn the character at the specified level."""
@@ -92,8 +101,14 @@ class Map:
         # Path to button images
         idle_img = os.path.join(self.script_dir, "assets", "images", "buttons", "enter level", "enter_btn_img.png")
         hover_img = os.path.join(self.script_dir, "assets", "images", "buttons", "enter level", "enter_btn_hover.png")
-        # Create button - now using the levels_manager's enter_level method
-        self.enter_button = Button(x=x, y=y, idle_img=idle_img, hover_img=hover_img, action=self.levels_manager.enter_level, scale=0.5, audio_manager=self.audio_manager)
+        # Create button - enters the level through the levels_manager's enter_level method
+        self.enter_button = Button(x=x, y=y, idle_img=idle_img, hover_img=hover_img, action=self.enter_level, scale=0.5, audio_manager=self.audio_manager)
+
+    def enter_level(self):
+        """Fight the active level's battle, then pick up the map where it was."""
+        self.levels_manager.enter_level()
+        # The battle ran its own loop, don't replay the time it took as catch-up movement
+        self.clock.reset()
 
     def go_back(self):
         if self.audio_manager:
@@ -114,6 +129,7 @@ class Map:
             'height': self.map_height
         }
         # Call the character movement handler
+        self.previous_map_pos = (self.map_x, self.map_y)
         map_adjustment, character_pos = self.character_movement.handle_movement(
             map_bounds,
             (self.map_x, self.map_y),
@@ -158,12 +174,16 @@ class Map:
 
     def draw(self):
         """Draw the map, levels, and player icon on the screen."""
-        self.screen.fill((0, 0, 0))
-        self.screen.blit(self.map, (self.map_x, self.map_y))
+        # Interpolate between the last two simulation steps so movement stays smooth at any frame rate
+        alpha = self.clock.alpha()
+        map_x = round(lerp(self.previous_map_pos[0], self.map_x, alpha))
+        map_y = round(lerp(self.previous_map_pos[1], self.map_y, alpha))
+        display.clear((0, 0, 0))
+        display.draw_background(self.map, (map_x, map_y))
         # Draw levels on the map using the levels manager
-        self.levels_manager.draw_levels(self.screen, self.map_x, self.map_y)
+        self.levels_manager.draw_levels(self.screen, map_x, map_y)
         # Draw character
-        self.character_movement.draw(self.screen)
+        self.character_movement.draw(self.screen, alpha)
         # Draw enter button if it exists and is visible
         if self.enter_button and self.enter_button.visible:
             self.enter_button.draw(self.screen)
@@ -192,13 +212,17 @@ class Map:
         while self.running:
             # Handle events
             self.handle_events()
-            # Handle character movement - this should be called every frame
-            self.move_character()
+            # Handle character movement once per fixed simulation step
+            for _ in self.clock.steps():
+                self.move_character()
             # Update animation
             self.update_character_animation()
+            # Finish background preloading in small slices
+            assets.update()
+            self.audio_manager.update()
             # Draw everything
             self.draw()
             # Update display
-            pygame.display.flip()
+            display.present()
             # Cap the frame rate
-            self.clock.tick(FPS)
\ No newline at end of file
+            self.clock.tick()
\ No newline at end of file
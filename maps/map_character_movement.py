@@ -1,6 +1,8 @@
 import pygame
 import sys
 import os
+from managers.asset_manager import assets
+from managers.game_clock import lerp
 
 class MapCharacterMovement:
     def __init__(self, hero_type, script_dir, initial_x, initial_y):
@@ -11,7 +13,11 @@ class MapCharacterMovement:
         # Character position
         self.character_x = initial_x
         self.character_y = initial_y
-        self.character_speed = 10 # 10 normal
+        self.character_speed = 10 # 10 normal, in pixels per simulation step (see TICK_RATE)
+
+        # Position before the last simulation step, used to interpolate rendering
+        self.previous_x = initial_x
+        self.previous_y = initial_y
 
         # Animation properties
         self.direction = "front"  # Default direction is front
@@ -36,41 +42,41 @@ class MapCharacterMovement:
         }
 
         # Load back animations
-        self.animations["back"]["stand"] = pygame.image.load(
+        self.animations["back"]["stand"] = assets.load_image(
             os.path.join(base_path, "back and walk", f"{self.hero_type}_back_stand.png")
-        ).convert_alpha()
-        self.animations["back"]["walk_left"] = pygame.image.load(
+        )
+        self.animations["back"]["walk_left"] = assets.load_image(
             os.path.join(base_path, "back and walk", f"{self.hero_type}_back_walkl.png")
-        ).convert_alpha()
-        self.animations["back"]["walk_right"] = pygame.image.load(
+        )
+        self.animations["back"]["walk_right"] = assets.load_image(
             os.path.join(base_path, "back and walk", f"{self.hero_type}_back_walkr.png")
-        ).convert_alpha()
+        )
 
         # Load front animations
-        self.animations["front"]["stand"] = pygame.image.load(
+        self.animations["front"]["stand"] = assets.load_image(
             os.path.join(base_path, "front and walk", f"{self.hero_type}_front_stand.png")
-        ).convert_alpha()
-        self.animations["front"]["walk_left"] = pygame.image.load(
+        )
+        self.animations["front"]["walk_left"] = assets.load_image(
             os.path.join(base_path, "front and walk", f"{self.hero_type}_front_walkl.png")
-        ).convert_alpha()
-        self.animations["front"]["walk_right"] = pygame.image.load(
+        )
+        self.animations["front"]["walk_right"] = assets.load_image(
             os.path.join(base_path, "front and walk", f"{self.hero_type}_front_walkr.png")
-        ).convert_alpha()
+        )
 
         # Load sideway animations
-        self.animations["left"]["stand"] = pygame.image.load(
+        self.animations["left"]["stand"] = assets.load_image(
             os.path.join(base_path, "sideway and walk", f"{self.hero_type}_left_stand.png")
-        ).convert_alpha()
-        self.animations["left"]["walk"] = pygame.image.load(
+        )
+        self.animations["left"]["walk"] = assets.load_image(
             os.path.join(base_path, "sideway and walk", f"{self.hero_type}_left_walk.png")
-        ).convert_alpha()
+        )
 
-        self.animations["right"]["stand"] = pygame.image.load(
+        self.animations["right"]["stand"] = assets.load_image(
             os.path.join(base_path, "sideway and walk", f"{self.hero_type}_right_stand.png")
-        ).convert_alpha()
-        self.animations["right"]["walk"] = pygame.image.load(
+        )
+        self.animations["right"]["walk"] = assets.load_image(
             os.path.join(base_path, "sideway and walk", f"{self.hero_type}_right_walk.png")
-        ).convert_alpha()
+        )
 
         # Scale all animations to an appropriate size
         scale_factor = 3.0  # Adjust as needed
@@ -122,6 +128,10 @@ class MapCharacterMovement:
                 return self.animations["front"][frame]
 
     def handle_movement(self, map_bounds, map_pos, screen_size):
+        """Advance the character by one fixed simulation step."""
+        self.previous_x = self.character_x
+        self.previous_y = self.character_y
+
         # Unpack parameters
         map_x, map_y = map_pos
         screen_width, screen_height = screen_size
@@ -319,13 +329,13 @@ class MapCharacterMovement:
 
         return (map_x, map_y), (self.character_x, self.character_y)
 
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
         # Get current character frame
         character_image = self.get_current_frame()
 
-        # Calculate character position (centered at character_x, character_y)
-        char_x = self.character_x - character_image.get_width() // 2
-        char_y = self.character_y - character_image.get_height() // 2
+        # Calculate character position (centered at character_x, character_y), interpolated between steps
+        char_x = round(lerp(self.previous_x, self.character_x, alpha)) - character_image.get_width() // 2
+        char_y = round(lerp(self.previous_y, self.character_y, alpha)) - character_image.get_height() // 2
 
         # Draw character
         screen.blit(character_image, (char_x, char_y))
\ No newline at end of file
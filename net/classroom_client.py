@@ -0,0 +1,104 @@
+import queue
+import socket
+import threading
+from net import protocol
+
+
+class ClassroomClient:
+    """Connection to a classroom server, used by Battle in classroom mode.
+
+    A background thread reads from the socket and decodes messages into a queue.
+    The battle loop calls poll() once per frame, so the game never blocks on the
+    network. Messages are (type, fields, strings) tuples; a (None, (), [reason])
+    message means the connection was lost.
+
+    The reader also keeps the lobby state (the room's level, who is in it, whether
+    the quiz has started), so the lobby screen can watch it without taking the
+    messages meant for the battle.
+    """
+    def __init__(self, host, port, room, name, level_id=1, question_set=""):
+        self.address = (host, port)
+        self.room = room
+        self.hello = protocol.hello(room, name, level_id, question_set)
+        self.sock = None
+        self.messages = queue.Queue()
+        self.reader = None
+        self.player_id = None
+        self.is_host = False
+        self.level_id = level_id  # The room's level, from WELCOME
+        self.roster = {}  # player id -> name of everyone in the room, in joining order
+        self.started = False  # The first question has arrived
+        self.failed = None  # Why the connection ended, or the server's error
+
+    def connect(self, timeout=5):
+        """Open the connection and join the room. Raises OSError if the server can't be reached."""
+        self.sock = socket.create_connection(self.address, timeout=timeout)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(self.hello)
+        self.reader = threading.Thread(target=self.reader_loop, daemon=True)
+        self.reader.start()
+
+    def reader_loop(self):
+        sock = self.sock
+        frames = protocol.FrameReader()
+        reason = "Connection closed"
+        try:
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                for message_type, payload in frames.feed(data):
+                    fields, strings = protocol.decode(message_type, payload)
+                    if message_type == protocol.WELCOME:
+                        self.player_id, self.is_host, self.level_id = fields[:3]
+                    elif message_type == protocol.JOINED:
+                        self.roster[fields[0]] = strings[0]
+                    elif message_type == protocol.LEFT:
+                        self.roster.pop(fields[0], None)
+                        self.is_host = fields[1] == self.player_id  # The room may have been handed over
+                    elif message_type == protocol.QUESTION:
+                        self.started = True
+                    elif message_type == protocol.ERROR:
+                        self.failed = strings[0]
+                    self.messages.put((message_type, fields, strings))
+        except (OSError, protocol.ProtocolError) as e:
+            reason = str(e)
+        self.failed = self.failed or reason
+        self.messages.put((None, (), [reason]))
+
+    def poll(self):
+        """Every message received since the last call."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def send(self, frame):
+        if self.sock is None:
+            return
+        try:
+            self.sock.sendall(frame)
+        except OSError as e:
+            print(f"Could not reach the classroom server: {e}")
+
+    def start_room(self):
+        """Start the quiz (only the host can)."""
+        self.send(protocol.encode(protocol.START))
+
+    def send_answer(self, question_id, choice):
+        self.send(protocol.answer(question_id, choice))
+
+    def close(self):
+        """Close the socket, which also ends the reader thread."""
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)  # Wakes up the reader's recv()
+            except OSError:
+                pass
+            self.sock.close()
+            self.sock = None
+        if self.reader is not None and self.reader is not threading.current_thread():
+            self.reader.join(timeout=1)
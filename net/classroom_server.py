@@ -0,0 +1,251 @@
+# Headless classroom quiz server.
+#
+#   python -m net.classroom_server --port 7777
+#
+# Students join a room with a room code. The first to join hosts it and picks the
+# level (its enemy HP, damage and timer come from assets/data/levels.json) and
+# optionally a custom question set. Once the host starts the room every student
+# gets the same question at the same time and fights their own copy of the
+# enemy. Timers run on the server, so a slow or paused client can't stretch them.
+#
+# One process hosts any number of rooms: each room is a single asyncio task and a
+# question is encoded once per round, whatever the number of students.
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+from gameplay.questions import QuestionGenerator
+from managers.level_data import get_level_table
+from net import protocol
+
+PLAYER_HP = 10  # Same as Player.hp
+HELLO_TIMEOUT = 10  # Seconds a new connection gets to say HELLO
+ROUND_GAP = 1.5  # Seconds between the end of a round and the next question
+WRITE_BUFFER_LIMIT = 64 * 1024  # Clients this far behind are disconnected instead of buffered
+
+
+class Client:
+    """One connected student and their own battle against the room's enemy."""
+    def __init__(self, player_id, name, writer, enemy_hp):
+        self.player_id = player_id
+        self.name = name
+        self.writer = writer
+        self.hp = PLAYER_HP
+        self.enemy_hp = enemy_hp
+        self.correct_answers = 0
+        self.answered = None  # Id of the last question this client answered
+        self.finished = False
+
+    def send(self, frame):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT:
+            print(f"Dropping {self.name}, not reading fast enough")
+            transport.abort()
+            return
+        self.writer.write(frame)
+
+    def score(self):
+        # Same formula as Battle.get_score
+        return self.correct_answers * 100 + int(self.hp * 10)
+
+
+class Room:
+    """A classroom: one host, many students, one question at a time."""
+    def __init__(self, code, level_id, settings, question_set=None):
+        self.code = code
+        self.level_id = level_id
+        self.settings = settings
+        self.question_set = question_set
+        self.clients = {}  # player id -> Client
+        self.host_id = None
+        self.task = None
+        self.question_ids = itertools.count(1)
+        self.question_id = 0
+        self.correct_choice = None
+        self.all_answered = asyncio.Event()
+
+    def active_clients(self):
+        return [client for client in self.clients.values() if not client.finished]
+
+    def broadcast(self, frame, clients=None):
+        for client in clients if clients is not None else self.clients.values():
+            client.send(frame)
+
+    def join(self, client):
+        if self.host_id is None:
+            self.host_id = client.player_id
+        self.clients[client.player_id] = client
+        client.send(protocol.encode(protocol.WELCOME, client.player_id, client.player_id == self.host_id,
+                                    self.level_id, self.settings["timer_seconds"], client.hp, client.enemy_hp))
+        # Room changes go out as one small frame per join or leave, the newcomer gets everyone
+        # already there once. A full roster per join would grow with the room, past MAX_FRAME
+        client.send(b"".join(protocol.joined(c.player_id, c.name) for c in self.clients.values()))
+        self.broadcast(protocol.joined(client.player_id, client.name),
+                       [c for c in self.clients.values() if c is not client])
+
+    def leave(self, client):
+        self.clients.pop(client.player_id, None)
+        if client.player_id == self.host_id:
+            # Hand the room to whoever joined next
+            self.host_id = next(iter(self.clients), None)
+        if self.clients:
+            self.broadcast(protocol.left(client.player_id, self.host_id or 0))
+        self.check_round_done()
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def next_question(self):
+        if self.question_set:
+            return QuestionGenerator.get_custom_question(self.question_set)
+        return QuestionGenerator.get_random_question(self.settings["question_difficulty"])
+
+    async def run(self):
+        """Ask questions until every student has won or lost."""
+        timer = self.settings["timer_seconds"]
+        while self.active_clients():
+            question = self.next_question()
+            self.question_id = (next(self.question_ids) - 1) % 0xFFFF + 1  # 0 means "no question"
+            self.correct_choice = question.correct_choice
+            self.all_answered.clear()
+            self.broadcast(protocol.question(self.question_id, timer, question.question_text, question.choices),
+                           self.active_clients())
+            try:
+                await asyncio.wait_for(self.all_answered.wait(), timeout=timer)
+            except asyncio.TimeoutError:
+                pass
+
+            # Anyone who didn't answer in time takes damage, like Battle.update_timer
+            for client in self.active_clients():
+                if client.answered != self.question_id:
+                    self.resolve(client, None)
+            self.question_id = 0
+            await asyncio.sleep(ROUND_GAP)
+
+    def submit(self, client, question_id, choice):
+        """Handle an ANSWER. Late or repeated answers are ignored."""
+        if client.finished or question_id != self.question_id or client.answered == question_id:
+            return
+        self.resolve(client, choice)
+        self.check_round_done()
+
+    def resolve(self, client, choice):
+        """Apply one answer (None for a timeout) with the Level's rules and tell the client."""
+        client.answered = self.question_id
+        correct = choice == self.correct_choice
+        if correct:
+            client.enemy_hp -= 1
+            client.correct_answers += 1
+        else:
+            client.hp = max(0, client.hp - self.settings["enemy_damage"])
+        client.send(protocol.encode(protocol.RESULT, self.question_id, correct, self.correct_choice,
+                                    client.hp, max(0, client.enemy_hp)))
+        if client.enemy_hp <= 0 or client.hp <= 0:
+            client.finished = True
+            client.send(protocol.encode(protocol.END, client.enemy_hp <= 0, client.score()))
+
+    def check_round_done(self):
+        if self.question_id and all(c.answered == self.question_id for c in self.active_clients()):
+            self.all_answered.set()
+
+
+class ClassroomServer:
+    def __init__(self, script_dir):
+        self.script_dir = script_dir
+        self.table = get_level_table(script_dir)
+        self.rooms = {}  # room code -> Room
+        self.player_ids = itertools.count(1)
+        self.question_sets = {}  # name -> list of questions
+        self.custom_manager = None
+
+    async def load_question_set(self, name):
+        """Fetch a custom question set from the database without blocking the event loop."""
+        if name not in self.question_sets:
+            if self.custom_manager is None:
+                from managers.custom_manager import CustomManager
+                self.custom_manager = CustomManager()
+            loop = asyncio.get_running_loop()
+            question_set = await loop.run_in_executor(None, self.custom_manager.get_question_set_by_name, name)
+            if not question_set:
+                return None  # Not cached, the database may just be unreachable right now
+            self.question_sets[name] = question_set
+        return self.question_sets[name]
+
+    async def open_room(self, code, level_id, question_set_name):
+        question_set = None
+        if question_set_name:
+            question_set = await self.load_question_set(question_set_name)
+            if not question_set:
+                raise protocol.ProtocolError(f"question set '{question_set_name}' not found")
+        room = self.rooms.get(code)
+        if room is None:  # Someone else may have opened it while the set was loading
+            room = self.rooms[code] = Room(code, level_id, self.table.level_settings(level_id), question_set)
+        return room
+
+    async def handle_client(self, reader, writer):
+        client = room = None
+        try:
+            message_type, payload = await asyncio.wait_for(protocol.read_frame(reader), HELLO_TIMEOUT)
+            if message_type != protocol.HELLO:
+                raise protocol.ProtocolError("expected HELLO")
+            (version, level_id), (code, name, question_set_name) = protocol.decode(message_type, payload)
+            if version != protocol.PROTOCOL_VERSION:
+                raise protocol.ProtocolError(f"unsupported protocol version {version}")
+
+            room = self.rooms.get(code) or await self.open_room(code, level_id, question_set_name)
+            if room.task is not None:
+                raise protocol.ProtocolError("this room has already started")
+            client = Client(next(self.player_ids), name[:protocol.MAX_NAME], writer, room.settings["enemy_hp"])
+            room.join(client)
+
+            while True:
+                message_type, payload = await protocol.read_frame(reader)
+                fields, _ = protocol.decode(message_type, payload)
+                if message_type == protocol.ANSWER:
+                    room.submit(client, *fields)
+                elif message_type == protocol.START and client.player_id == room.host_id:
+                    room.start()
+        except protocol.ProtocolError as e:
+            writer.write(protocol.error(str(e)))
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            if client is not None:
+                room.leave(client)
+                if not room.clients:
+                    if room.task is not None:
+                        room.task.cancel()
+                    self.rooms.pop(room.code, None)
+            writer.close()
+
+    async def serve(self, host, port):
+        return await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+
+
+async def serve_forever(script_dir, host, port):
+    server = await ClassroomServer(script_dir).serve(host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Classroom server listening on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host Final Quiztasy classroom quiz rooms.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=7777)
+    args = parser.parse_args(argv)
+    script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        asyncio.run(serve_forever(script_dir, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# Wire format shared by the classroom server, its clients and LAN PvP matches.
+#
+# Every message is one frame: a 2 byte big-endian length, a 1 byte message type
+# and a struct-packed payload. Strings are a 2 byte length followed by UTF-8.
+# A question with four choices is about 40 bytes, so one box can push rounds to
+# thousands of clients without the encoding showing up in a profile.
+import struct
+
+PROTOCOL_VERSION = 2
+MAX_FRAME = 4096
+MAX_NAME = 32  # Characters of a player name, longer ones are cut
+
+# Client -> server
+HELLO = 0x01  # version, room code, player name, level id, question set name ("" = generated)
+START = 0x02  # host starts the room
+ANSWER = 0x03  # question id, choice index
+
+# Server -> client
+WELCOME = 0x81  # player id, is host, level id, timer seconds, player hp, enemy hp
+QUESTION = 0x82  # question id, seconds to answer, text, choices
+RESULT = 0x83  # question id, correct, correct choice, player hp, enemy hp
+END = 0x84  # victory, score
+ERROR = 0x85  # message
+JOINED = 0x86  # player id, name: someone is in the room (a newcomer gets one per player already there)
+LEFT = 0x87  # player id, host's player id: someone left the room
+
+# LAN PvP, between two games (see net/pvp_netplay.py). Seq numbers let a resent message be recognised
+PVP_HELLO = 0x10  # version, match id (0 = new match), hero (guest -> host)
+PVP_SETUP = 0x11  # match id, seed, timer seconds, difficulty, player 1 hero, player 2 hero (host -> guest)
+PVP_TOSS = 0x12  # seq, player 1's call (host -> guest)
+PVP_ANSWER = 0x13  # seq, turn, choice index, elapsed ms (guest -> host)
+PVP_STATE = 0x14  # seq, turn, current player, player 1 hp, player 2 hp, outcome, winner, ms left (host -> guest)
+PVP_PING = 0x15  # sender's clock in ms
+PVP_PONG = 0x16  # the ping's clock value echoed back
+
+LENGTH = struct.Struct(">H")
+HEADER = struct.Struct(">HB")  # length (type + payload), type
+
+# Fixed-size parts of each payload, strings follow them
+FIXED = {
+    HELLO: struct.Struct(">BH"),  # version, level id
+    START: struct.Struct(">"),
+    ANSWER: struct.Struct(">HB"),
+    WELCOME: struct.Struct(">I?HHfH"),
+    QUESTION: struct.Struct(">HHB"),  # question id, seconds, number of choices
+    RESULT: struct.Struct(">H?BfH"),
+    END: struct.Struct(">?I"),
+    ERROR: struct.Struct(">"),
+    JOINED: struct.Struct(">I"),
+    LEFT: struct.Struct(">II"),
+    PVP_HELLO: struct.Struct(">BI"),
+    PVP_SETUP: struct.Struct(">IIHB"),
+    PVP_TOSS: struct.Struct(">IB"),
+    PVP_ANSWER: struct.Struct(">IHBI"),
+    PVP_STATE: struct.Struct(">IHBBBBBH"),
+    PVP_PING: struct.Struct(">I"),
+    PVP_PONG: struct.Struct(">I"),
+}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def pack_str(text):
+    data = text.encode("utf-8")
+    return LENGTH.pack(len(data)) + data
+
+
+def unpack_str(payload, offset):
+    (size,) = LENGTH.unpack_from(payload, offset)
+    offset += LENGTH.size
+    return payload[offset:offset + size].decode("utf-8"), offset + size
+
+
+def encode(message_type, *fields, strings=()):
+    """Build one frame from the fixed fields and any trailing strings."""
+    payload = FIXED[message_type].pack(*fields) + b"".join(pack_str(text) for text in strings)
+    if len(payload) + 1 > MAX_FRAME:
+        raise ProtocolError(f"message of {len(payload)} bytes is too large")
+    return HEADER.pack(len(payload) + 1, message_type) + payload
+
+
+def decode(message_type, payload):
+    """Split a payload back into (fixed fields, strings)."""
+    fixed = FIXED.get(message_type)
+    if fixed is None:
+        raise ProtocolError(f"unknown message type {message_type:#x}")
+    try:
+        fields = fixed.unpack_from(payload, 0)
+        strings = []
+        offset = fixed.size
+        while offset < len(payload):
+            text, offset = unpack_str(payload, offset)
+            strings.append(text)
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"malformed message {message_type:#x}: {e}")
+    return fields, strings
+
+
+# ----- Message helpers -----
+
+def hello(room, name, level_id=1, question_set=""):
+    return encode(HELLO, PROTOCOL_VERSION, level_id, strings=(room, name, question_set))
+
+
+def question(question_id, seconds, text, choices):
+    return encode(QUESTION, question_id, seconds, len(choices), strings=[text] + [str(c) for c in choices])
+
+
+def answer(question_id, choice):
+    return encode(ANSWER, question_id, choice)
+
+
+def error(message):
+    return encode(ERROR, strings=(message,))
+
+
+def joined(player_id, name):
+    return encode(JOINED, player_id, strings=(name,))
+
+
+def left(player_id, host_id):
+    return encode(LEFT, player_id, host_id)
+
+
+class FrameReader:
+    """Turns a byte stream into (type, payload) pairs. Used by the blocking client."""
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer += data
+        frames = []
+        while len(self.buffer) >= LENGTH.size:
+            (size,) = LENGTH.unpack_from(self.buffer, 0)
+            if size == 0 or size > MAX_FRAME:
+                raise ProtocolError(f"bad frame length {size}")
+            if len(self.buffer) < LENGTH.size + size:
+                break
+            frame = bytes(self.buffer[LENGTH.size:LENGTH.size + size])
+            del self.buffer[:LENGTH.size + size]
+            frames.append((frame[0], frame[1:]))
+        return frames
+
+
+async def read_frame(reader):
+    """Read one (type, payload) pair from an asyncio stream."""
+    (size,) = LENGTH.unpack(await reader.readexactly(LENGTH.size))
+    if size == 0 or size > MAX_FRAME:
+        raise ProtocolError(f"bad frame length {size}")
+    frame = await reader.readexactly(size)
+    return frame[0], frame[1:]
@@ -0,0 +1,329 @@
+# LAN PvP between two machines.
+#
+# One player hosts the match (Player 1) and the other joins it by address
+# (Player 2). The host's game is authoritative: it runs the turn timer, judges
+# every answer and sends the guest the resulting state. Only answers and these
+# small state updates cross the network. Questions and the coin toss come from a
+# random seed both games get in the handshake, so each side generates the same
+# ones locally. A whole match is a few hundred bytes plus a ping every couple of
+# seconds.
+#
+# A dropped connection is retried for RECONNECT_TIMEOUT seconds. Meanwhile the
+# host stops the turn timer. Once the players are back in touch each side resends
+# whatever the other may have missed, and sequence numbers filter out duplicates.
+import random
+import secrets
+import socket
+import threading
+import time
+from settings import PVP_PORT
+from net import protocol
+
+HEARTBEAT = 2.0  # Seconds between pings
+DEAD_AFTER = 6.0  # A connection that stays silent this long is treated as lost
+RECONNECT_TIMEOUT = 20.0  # Seconds to wait for the other player to come back
+ANSWER_SLACK = 0.25  # Clock jitter (s) allowed when checking how long the guest took to answer
+TOSS_CHOICES = ("heads", "tails")
+OUTCOMES = (None, "correct", "wrong", "timeout")
+
+
+def clock_ms():
+    return int(time.monotonic() * 1000) & 0xFFFFFFFF
+
+
+class Connection:
+    """One TCP connection to the other player's game."""
+    def __init__(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(0.5)  # So the reader wakes up to send pings
+        self.sock = sock
+        self.frames = protocol.FrameReader()
+        self.inbox = []
+
+    def receive(self, session):
+        """The next (type, fields, strings), or None if nothing arrived for a while. Raises OSError once the connection is gone."""
+        while not self.inbox:
+            try:
+                data = self.sock.recv(4096)
+            except socket.timeout:
+                return None
+            if not data:
+                raise ConnectionError("connection closed")
+            session.bytes_received += len(data)
+            self.inbox.extend(self.frames.feed(data))
+        message_type, payload = self.inbox.pop(0)
+        fields, strings = protocol.decode(message_type, payload)
+        return message_type, fields, strings
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class NetplaySession:
+    """The link between the two games of a LAN match, run on background threads.
+
+    PVPBattle reads the latest state with the take_* methods once per frame and
+    never waits on the network.
+    """
+    def __init__(self, role, hero, address="", port=PVP_PORT, timer_seconds=15, difficulty=1):
+        self.is_host = role == "host"
+        self.player = 1 if self.is_host else 2
+        self.address = (address, port)
+        self.heroes = {self.player: hero}
+        self.timer_seconds = timer_seconds
+        self.difficulty = difficulty
+        self.match_id = 0
+        self.seed = 0
+
+        self.lock = threading.Lock()  # Guards the connection and the received state below
+        self.send_lock = threading.Lock()
+        self.conn = None
+        self.listener = None
+        self.ready = False  # Handshake done, seed and heroes known
+        self.connected = False
+        # The guest gives up if it can't reach the host in time, the host waits for a guest as long as it takes
+        self.lost_at = None if self.is_host else time.monotonic()
+        self.failed = None  # Why the match can't go on
+        self.closed = False
+
+        self.seq = 0  # Last sequence number sent
+        self.remote_seq = 0  # Last sequence number received
+        self.rtt = 0.0  # Smoothed round trip time in seconds
+        self.toss_choice = None
+        self.toss_frame = None  # Host: resent after a reconnect
+        self.state = None  # Guest: latest state not yet taken by the battle
+        self.answers = {}  # Host: turn -> (choice, elapsed seconds, time received)
+        self.pending_answer = None  # Guest: (turn, frame) until the host's state moves past that turn
+        self.resync = False  # Host: the guest reconnected and needs a fresh state
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.started_at = time.monotonic()
+
+    # ----- Connection handling (background threads) -----
+
+    def start(self):
+        """Start hosting or joining. Raises OSError if the host can't listen on its port."""
+        if self.is_host:
+            self.listener = socket.create_server(self.address)
+            self.listener.settimeout(0.5)
+            self.address = self.listener.getsockname()[:2]
+            target = self.accept_loop
+        else:
+            target = self.connect_loop
+        threading.Thread(target=target, daemon=True).start()
+
+    def gave_up(self):
+        if self.lost_at is not None and time.monotonic() - self.lost_at > RECONNECT_TIMEOUT:
+            self.failed = self.failed or "The other player did not come back"
+        return self.failed is not None or self.closed
+
+    def accept_loop(self):
+        while not self.gave_up():
+            try:
+                sock, _ = self.listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self.serve_guest, args=(Connection(sock),), daemon=True).start()
+
+    def serve_guest(self, conn):
+        """Host side of one connection: check the HELLO, send the match setup, then read until it drops."""
+        try:
+            message = None
+            deadline = time.monotonic() + DEAD_AFTER
+            while message is None and time.monotonic() < deadline:
+                message = conn.receive(self)
+            if message is None or message[0] != protocol.PVP_HELLO:
+                raise protocol.ProtocolError("expected HELLO")
+            _, (version, match_id), (hero,) = message
+            if version != protocol.PROTOCOL_VERSION:
+                raise protocol.ProtocolError(f"unsupported protocol version {version}")
+            with self.lock:
+                if self.match_id and match_id != self.match_id:
+                    raise protocol.ProtocolError("a match is already in progress")
+                if not self.match_id:
+                    self.match_id = secrets.randbits(31) + 1
+                    self.seed = secrets.randbits(32)
+                    self.heroes[2] = hero
+                else:
+                    self.resync = True
+        except (OSError, protocol.ProtocolError) as e:
+            try:
+                conn.sock.sendall(protocol.error(str(e)))
+            except OSError:
+                pass
+            conn.close()
+            return
+
+        self.attach(conn)
+        self.send(protocol.encode(protocol.PVP_SETUP, self.match_id, self.seed, self.timer_seconds, self.difficulty,
+                                  strings=(self.heroes[1], self.heroes[2])))
+        if self.toss_frame:
+            self.send(self.toss_frame)
+        self.ready = True
+        self.run_connection(conn)
+
+    def connect_loop(self):
+        """Guest side: connect, and reconnect with backoff whenever the connection drops."""
+        delay = 0.25
+        while not self.gave_up():
+            try:
+                conn = Connection(socket.create_connection(self.address, timeout=DEAD_AFTER))
+            except OSError:
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+                continue
+            delay = 0.25
+            self.attach(conn)
+            self.send(protocol.encode(protocol.PVP_HELLO, protocol.PROTOCOL_VERSION, self.match_id,
+                                      strings=(self.heroes[2],)))
+            if self.pending_answer:
+                self.send(self.pending_answer[1])
+            self.run_connection(conn)
+
+    def attach(self, conn):
+        with self.lock:
+            old, self.conn = self.conn, conn
+            self.connected = True
+            self.lost_at = None
+        if old is not None:
+            old.close()
+
+    def run_connection(self, conn):
+        """Read messages and keep the connection alive with pings until it drops."""
+        last_heard = last_ping = time.monotonic()
+        reason = "closed"
+        try:
+            while not self.closed:
+                message = conn.receive(self)
+                now = time.monotonic()
+                if message is not None:
+                    last_heard = now
+                    self.handle(*message)
+                elif now - last_heard > DEAD_AFTER:
+                    raise ConnectionError("the other player stopped responding")
+                if now - last_ping >= HEARTBEAT:
+                    last_ping = now
+                    self.send(protocol.encode(protocol.PVP_PING, clock_ms()), conn)
+        except (OSError, protocol.ProtocolError) as e:
+            reason = str(e)
+        with self.lock:
+            if self.conn is conn:  # Not already replaced by a newer connection
+                self.conn = None
+                self.connected = False
+                self.lost_at = time.monotonic()
+                if not self.closed:
+                    print(f"Lost the LAN match connection ({reason}), reconnecting...")
+        conn.close()
+
+    def handle(self, message_type, fields, strings):
+        if message_type == protocol.PVP_PING:
+            self.send(protocol.encode(protocol.PVP_PONG, fields[0]))
+        elif message_type == protocol.PVP_PONG:
+            sample = ((clock_ms() - fields[0]) & 0xFFFFFFFF) / 1000
+            self.rtt = sample if not self.rtt else self.rtt * 0.8 + sample * 0.2
+        elif message_type == protocol.ERROR:
+            self.failed = strings[0]
+            self.close_connection()
+        elif message_type == protocol.PVP_SETUP and not self.is_host:
+            self.match_id, self.seed, self.timer_seconds, self.difficulty = fields
+            self.heroes = {1: strings[0], 2: strings[1]}
+            self.ready = True
+        elif message_type in (protocol.PVP_TOSS, protocol.PVP_ANSWER, protocol.PVP_STATE):
+            with self.lock:
+                if fields[0] <= self.remote_seq:
+                    return  # Resent after a reconnect, already seen
+                self.remote_seq = fields[0]
+                if message_type == protocol.PVP_TOSS:
+                    self.toss_choice = TOSS_CHOICES[fields[1]]
+                elif message_type == protocol.PVP_ANSWER:
+                    _, turn, choice, elapsed_ms = fields
+                    self.answers[turn] = (choice, elapsed_ms / 1000, time.time())
+                else:
+                    _, turn, current_player, p1_hp, p2_hp, outcome, winner, ms_left = fields
+                    self.state = (turn, current_player, p1_hp, p2_hp, OUTCOMES[outcome], winner, ms_left / 1000, time.time())
+                    if self.pending_answer and turn > self.pending_answer[0]:
+                        self.pending_answer = None
+
+    def send(self, frame, conn=None):
+        with self.send_lock:
+            conn = conn or self.conn
+            if conn is None:
+                return  # Resent once the connection is back, where it matters
+            try:
+                conn.sock.sendall(frame)
+                self.bytes_sent += len(frame)
+            except OSError:
+                pass  # The reader notices the drop and reconnects
+
+    def next_frame(self, message_type, *fields):
+        with self.lock:
+            self.seq += 1
+            return protocol.encode(message_type, self.seq, *fields)
+
+    # ----- Used by PVPBattle and CoinToss -----
+
+    def rng(self, label):
+        """A random generator that produces the same numbers in both games."""
+        return random.Random(f"{self.seed}:{label}")
+
+    def grace(self):
+        """How much longer than the timer the host waits for the guest's answer to arrive."""
+        return self.rtt + ANSWER_SLACK
+
+    def answer_time(self, claimed, observed):
+        """Seconds the guest took to answer, trusting their clock only as far as the network delay explains."""
+        return max(claimed, observed - self.rtt - ANSWER_SLACK)
+
+    def send_toss(self, choice):
+        self.toss_frame = self.next_frame(protocol.PVP_TOSS, TOSS_CHOICES.index(choice))
+        self.send(self.toss_frame)
+
+    def send_answer(self, turn, choice, elapsed):
+        frame = self.next_frame(protocol.PVP_ANSWER, turn, choice, int(max(0, elapsed) * 1000))
+        self.pending_answer = (turn, frame)
+        self.send(frame)
+
+    def send_state(self, turn, current_player, p1_hp, p2_hp, outcome, winner, time_left):
+        self.send(self.next_frame(protocol.PVP_STATE, turn, current_player, int(p1_hp), int(p2_hp),
+                                  OUTCOMES.index(outcome), winner or 0, int(min(time_left, 65.535) * 1000)))
+
+    def take_state(self):
+        """Guest: the newest state from the host, if one arrived since the last call."""
+        with self.lock:
+            state, self.state = self.state, None
+            return state
+
+    def take_answer(self, turn):
+        """Host: the guest's answer for this turn, if it has arrived."""
+        with self.lock:
+            return self.answers.pop(turn, None)
+
+    def take_resync(self):
+        """Host: True once after the guest reconnects."""
+        with self.lock:
+            resync, self.resync = self.resync, False
+            return resync
+
+    def bytes_per_second(self):
+        return (self.bytes_sent + self.bytes_received) / max(1.0, time.monotonic() - self.started_at)
+
+    def close_connection(self):
+        with self.lock:
+            conn = self.conn
+        if conn is not None:
+            conn.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.listener is not None:
+            self.listener.close()
+        self.close_connection()
+        print(f"LAN match traffic: {self.bytes_sent} B sent, {self.bytes_received} B received "
+              f"({self.bytes_per_second():.0f} B/s)")
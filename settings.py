@@ -1,20 +1,64 @@
-import pygame
 import os
 
-# Initialize Pygame
-pygame.init()
-
 # ================================
 # 🛠️ GAME SETTINGS
 # ================================
 
-SCREEN_WIDTH = 1920
+SCREEN_WIDTH = 1920  # Size of the canvas every screen is laid out on
 SCREEN_HEIGHT = 1080
+# e.g. (1280, 720) to fit the canvas into a smaller window, None opens it 1:1. This only scales the
+# finished frame, the game still draws at full canvas resolution, so it costs frame time rather than saving it
+WINDOW_SIZE = None
+RENDER_BACKEND = "software"  # "texture" draws large backgrounds on the GPU through pygame._sdl2
+SCALE_QUALITY = "linear"  # "nearest" or "linear" filtering when the canvas is scaled to the window
 FPS = 60
+TICK_RATE = 60  # Simulation steps per second, independent of the frame rate
+IDLE_FPS = 15  # Menu frame rate after IDLE_AFTER seconds without input
+IDLE_AFTER = 3.0
+
+# Save files, relative to the game directory
+SAVE_DIR = "saves"
+AUTOSAVE_DELAY = 2.0  # Seconds to wait for more results before writing an autosave
+SESSION_DAYS = 30  # How long a login is remembered
+
+# LAN PvP: None plays both players on this machine, "host" hosts a match, or the host's address joins one
+PVP_NETPLAY = None
+PVP_PORT = 7778
+
+# Classroom quiz (see net/classroom_server.py): None plays single player on the LSPU map, or
+# ("server address", "ROOM CODE") joins that room. Whoever opens a room picks CLASSROOM_LEVEL
+CLASSROOM = None
+CLASSROOM_PORT = 7777
+CLASSROOM_LEVEL = 1
+
+# Pick single player questions from the student's skill per operation (see managers/learner_model.py)
+ADAPTIVE_QUESTIONS = True
+
+# Gameplay events logged to saves/telemetry (see managers/telemetry.py), optionally also sent to the database
+TELEMETRY = True
+TELEMETRY_UPLOAD = False
 
 # Font settings
 FONT_PATH = os.path.join("assets", "fonts", "press_start_2p.ttf")
 FONT_SIZE = 24
 
-# Load font
-game_font = pygame.font.Font(FONT_PATH, FONT_SIZE)
\ No newline at end of file
+# Loaded on first use so importing settings stays cheap and doesn't need pygame.init()
+_game_font = None
+
+
+def get_game_font():
+    """Return the shared game font, loading it the first time it is needed."""
+    global _game_font
+    if _game_font is None:
+        import pygame
+        if not pygame.font.get_init():
+            pygame.font.init()
+        _game_font = pygame.font.Font(FONT_PATH, FONT_SIZE)
+    return _game_font
+
+
+def __getattr__(name):
+    # Keep `from settings import game_font` working without loading the font at import time
+    if name == "game_font":
+        return get_game_font()
+    raise AttributeError(f"module 'settings' has no attribute '{name}'")
@@ -1,5 +1,6 @@
 import pygame
 import time
+from managers.asset_manager import assets
 
 class Button:
     def __init__(self, x, y, idle_img, hover_img, click_img=None, action=None, scale=1.0, audio_manager=None, freeze_duration=0):
@@ -26,7 +27,7 @@ class Button:
 
     def load_image(self, img):
         """Helper method to load an image from file or return the surface if already loaded."""
-        return pygame.image.load(img).convert_alpha() if isinstance(img, str) else img
+        return assets.load_image(img) if isinstance(img, str) else img
 
     def draw(self, screen):
         """Draw the button on the screen."""
@@ -2,6 +2,7 @@ import pygame
 import os
 from ui.button import Button
 from .back_button import BackButton
+from managers.save_manager import save_manager
 
 
 class GameModes:
@@ -88,6 +89,7 @@ class GameModes:
         for button in self.buttons.values():
             button.active = True  # Re-enable buttons when leaving prompt
         if self.game_instance:
+            self.game_instance.save_data = None  # Start from level 1
             if hasattr(self.game_instance, 'hero_selection'):
                 self.game_instance.hero_selection.show()
             elif hasattr(self.game_instance, 'game_instance') and hasattr(self.game_instance.game_instance,
@@ -100,6 +102,13 @@ class GameModes:
         for button in self.buttons.values():
             button.active = True  # Re-enable buttons when leaving prompt
 
+        save = save_manager.load()
+        if save is None:
+            print("No saved game found, starting a new game instead")
+            self.start_new_game()
+        elif self.game_instance:
+            self.game_instance.continue_game(save)
+
     def create_button(self, script_dir, name, position, action=None, button_scale=None):
         """Helper method to create buttons with scaling."""
         # Use the provided scale or default to the class scale
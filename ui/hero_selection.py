@@ -4,7 +4,9 @@ import time
 import random
 from .button import Button
 from .back_button import BackButton
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from managers.asset_manager import assets
+from managers import display
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CLASSROOM
 
 CONFIRMATION_DELAY = pygame.USEREVENT + 1
 
@@ -95,7 +97,7 @@ class HeroSelection:
 
         self.selected_hero = None
         self.selection_time = None
-        self.voiceline_sound = None
+        self.voiceline_channel = None
 
     def create_button(self, name, position, scale=1.0, freeze_duration=0):
         """Helper to create buttons with optional freeze duration."""
@@ -116,14 +118,10 @@ class HeroSelection:
         if not self.audio_manager.audio_enabled:  # 🔇 Check if audio is muted
             print(f"Audio is muted. Skipping {hero} voiceline.")
             return
-        if self.voiceline_sound:
-            self.voiceline_sound.stop()
-        try:
-            random_voiceline = random.choice(self.voicelines[hero])
-            self.voiceline_sound = pygame.mixer.Sound(random_voiceline)
-            self.voiceline_sound.play()
-        except Exception as e:
-            print(f"Error playing voiceline: {e}")
+        if self.voiceline_channel:
+            self.voiceline_channel.stop()
+        random_voiceline = random.choice(self.voicelines[hero])
+        self.voiceline_channel = self.audio_manager.play_sound(random_voiceline, "voice", priority=1)
 
     def pre_select_hero(self, hero):
         """Initial hero selection that starts a 1-second delay before confirmation."""
@@ -132,6 +130,9 @@ class HeroSelection:
         # Play hero voiceline immediately
         self.play_random_voiceline(hero)
 
+        # Start loading this hero's map while the player confirms
+        assets.preload("map", self.game_instance.script_dir, hero=hero)
+
         # Set the button to "clicked" image
         for button_name, button in self.buttons.items():
             if button_name == hero:
@@ -161,8 +162,8 @@ class HeroSelection:
         freeze_duration = 0
         start_time = time.time()
         while time.time() - start_time < freeze_duration:
-            self.draw()
-            pygame.display.update()
+            self.game_instance.draw()
+            display.present()
 
         # Select the hero's OST based on selection
         hero_ost_path = os.path.join(self.game_instance.script_dir, "assets", "audio", "ost", self.selected_hero, f"{self.selected_hero}_map_ost.mp3")
@@ -175,6 +176,11 @@ class HeroSelection:
         for button in self.buttons.values():
             button.active = True
 
+        # Join the classroom quiz instead of the map when one is set up (see CLASSROOM in settings.py)
+        if CLASSROOM is not None:
+            self.game_instance.classroom.start_battle(self.selected_hero)
+            return
+
         # Call the map function
         self.game_instance.map(hero_ost_path)
 
@@ -209,10 +215,7 @@ class HeroSelection:
 
     def draw(self):
         """Draw the hero selection screen."""
-        frame_surface = self.background_menu.get_frame()
-        frame_surface = pygame.transform.scale(frame_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.screen.blit(frame_surface, (0, 0))
-
+        # The menu video behind this screen is drawn by FinalQuiztasy.draw()
         if self.visible:
             # Draw the main border
             self.screen.blit(self.border_img, self.border_rect.topleft)
@@ -232,8 +235,6 @@ class HeroSelection:
                 # Draw back button only when confirmation is not showing
                 self.back_button.draw()
 
-        pygame.display.update()
-
     def show(self):
         """Show the hero selection screen."""
         self.visible = True
@@ -250,9 +251,9 @@ class HeroSelection:
         """Hide the hero selection screen."""
         self.visible = False
         self.confirmation_active = False
-        if self.voiceline_sound:
-            self.voiceline_sound.stop()
-            self.voiceline_sound = None
+        if self.voiceline_channel:
+            self.voiceline_channel.stop()
+            self.voiceline_channel = None
         print("Hero selection screen closed.")
 
     def go_back(self):
@@ -0,0 +1,24 @@
+import pygame
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH, FONT_SIZE
+
+class LoadingScreen:
+    def __init__(self, screen):
+        """Simple progress bar shown while a scene's assets finish loading."""
+        self.screen = screen
+        self.font = pygame.font.Font(FONT_PATH, FONT_SIZE)
+        self.bar_rect = pygame.Rect(0, 0, 800, 30)
+        self.bar_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)
+
+    def draw(self, progress, label="Loading..."):
+        """Draw the loading screen for a progress value between 0.0 and 1.0."""
+        self.screen.fill((0, 0, 0))
+
+        text = self.font.render(label, True, (255, 255, 255))
+        text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
+        self.screen.blit(text, text_rect)
+
+        # Bar outline and filled portion
+        pygame.draw.rect(self.screen, (255, 255, 255), self.bar_rect, 3)
+        fill_rect = self.bar_rect.inflate(-10, -10)
+        fill_rect.width = int(fill_rect.width * max(0.0, min(progress, 1.0)))
+        pygame.draw.rect(self.screen, (255, 215, 0), fill_rect)
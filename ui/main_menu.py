@@ -4,13 +4,10 @@ from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_PATH, FONT_SIZE
 from .button import Button
 from managers.audio_manager import AudioManager
 from managers.auth_manager import AuthManager
-from .game_modes import GameModes
+from managers.leaderboard import leaderboard
 from .back_button import BackButton
-from .hero_selection import HeroSelection
 from .option import Options
 from .exit import Exit
-from auth.login_screen import LoginScreen
-from auth.logout_screen import LogoutScreen
 
 class MainMenu:
     def __init__(self, screen, audio_manager, script_dir, exit_callback=None, game_instance=None):
@@ -22,8 +19,8 @@ class MainMenu:
         self.visible = True
         self.show_game_logo = True
 
-        # Initialize auth manager
-        self.auth_manager = AuthManager()
+        # Initialize auth manager, logged in already if the last login was remembered
+        self.auth_manager = AuthManager(script_dir)
 
         # Load assets
         self.load_assets()
@@ -33,14 +30,38 @@ class MainMenu:
         self.options_handler = Options(screen, audio_manager, script_dir)
         self.exit_handler = Exit(screen, script_dir, exit_callback, audio_manager)
 
-        # Initialize login screen and logout
-        self.login_screen = LoginScreen(screen, script_dir, self.auth_manager, audio_manager, self.on_login_close)
-        self.logout_screen = LogoutScreen(screen, script_dir, self.auth_manager, audio_manager, self.on_logout_close)
+        # Login and logout screens are built the first time they are opened
+        self._login_screen = None
+        self._logout_screen = None
 
         # Only create GameModes if game_instance is None
         if not self.game_instance:
+            from .game_modes import GameModes
             self.game_modes = GameModes(self.screen, self.audio_manager, self.script_dir, scale=1.0, game_instance=self)
 
+    @property
+    def login_screen(self):
+        if self._login_screen is None:
+            from auth.login_screen import LoginScreen
+            self._login_screen = LoginScreen(self.screen, self.script_dir, self.auth_manager, self.audio_manager, self.on_login_close)
+        return self._login_screen
+
+    @property
+    def logout_screen(self):
+        if self._logout_screen is None:
+            from auth.logout_screen import LogoutScreen
+            self._logout_screen = LogoutScreen(self.screen, self.script_dir, self.auth_manager, self.audio_manager, self.on_logout_close)
+        return self._logout_screen
+
+    def is_login_screen_visible(self):
+        """Check the login/register screens without building them"""
+        login_screen = self._login_screen
+        return login_screen is not None and (login_screen.visible or login_screen.register_screen.visible)
+
+    def is_logout_screen_visible(self):
+        """Check the logout screen without building it"""
+        return self._logout_screen is not None and self._logout_screen.visible
+
     def load_assets(self):
         # Load game logo
         game_logo_img = os.path.join(self.script_dir, "assets", "images", "logo", "logo.png")
@@ -261,8 +282,7 @@ class MainMenu:
         self.exit_handler.exit_game()
 
     def handle_events(self, event):
-        if self.login_screen.visible or (
-                hasattr(self.login_screen, 'register_screen') and self.login_screen.register_screen.visible):
+        if self.is_login_screen_visible():
             previous_user = self.auth_manager.get_current_user()
             self.login_screen.handle_events(event)
             current_user = self.auth_manager.get_current_user()
@@ -272,7 +292,7 @@ class MainMenu:
                 print("Login status changed - updating button")  # Debug output
                 self.update_login_button()
 
-        elif self.logout_screen.visible:
+        elif self.is_logout_screen_visible():
             previous_user = self.auth_manager.get_current_user()
             self.logout_screen.handle_events(event)
             current_user = self.auth_manager.get_current_user()
@@ -291,10 +311,9 @@ class MainMenu:
                 button.update(event)
 
         # For Game Modes
-        if self.game_instance and self.game_instance.game_modes.visible:
-            self.game_instance.game_modes.update(event)
-        elif hasattr(self, 'game_modes') and self.game_modes.visible:
-            self.game_modes.update(event)
+        game_modes = self.visible_game_modes()
+        if game_modes:
+            game_modes.update(event)
 
     def draw(self):
         # Only draw UI elements if main menu is visible
@@ -305,7 +324,7 @@ class MainMenu:
         if self.show_game_logo and not self.exit_handler.show_exit_confirmation and not self.options_handler.show_settings and not self.is_game_modes_visible():
             self.screen.blit(self.game_logo, self.game_logo_rect.topleft)
 
-        any_screen_active = (self.login_screen.visible or (hasattr(self.login_screen, 'register_screen') and self.login_screen.register_screen.visible) or self.logout_screen.visible or self.exit_handler.show_exit_confirmation or self.options_handler.show_settings or self.is_game_modes_visible())
+        any_screen_active = (self.is_login_screen_visible() or self.is_logout_screen_visible() or self.exit_handler.show_exit_confirmation or self.options_handler.show_settings or self.is_game_modes_visible())
         # Draw based on current state
         if self.exit_handler.show_exit_confirmation:
             self.exit_handler.draw()
@@ -328,16 +347,14 @@ class MainMenu:
             self.draw_login_status()
 
         # Draw game modes if visible
-        if self.game_instance and hasattr(self.game_instance, 'game_modes') and self.game_instance.game_modes.visible:
-            self.game_instance.game_modes.draw()
-        elif hasattr(self, 'game_modes') and self.game_modes.visible:
-            self.game_modes.draw()
+        game_modes = self.visible_game_modes()
+        if game_modes:
+            game_modes.draw()
 
         # Draw login screen if visible
-        if self.login_screen.visible or (
-                hasattr(self.login_screen, 'register_screen') and self.login_screen.register_screen.visible):
+        if self.is_login_screen_visible():
             self.login_screen.draw()
-        elif self.logout_screen.visible:
+        elif self.is_logout_screen_visible():
             self.logout_screen.draw()
 
     def draw_login_status(self):
@@ -356,13 +373,23 @@ class MainMenu:
             text_surf = self.login_font.render(status_text, True, pygame.Color('white'))
             self.screen.blit(text_surf, (175, 100))
 
+            # Global rank under the name, from the leaderboard cache (fetched in the background)
+            rank = leaderboard.cached_rank() if current_user else None
+            if rank:
+                rank_surf = self.login_font.render(f"Rank #{rank['rank']} of {rank['players']}", True, pygame.Color('gold'))
+                self.screen.blit(rank_surf, (175, 100 + text_surf.get_height() + 8))
+
+    def visible_game_modes(self):
+        """Return the game modes screen if it is visible, without building it"""
+        if self.game_instance:
+            return self.game_instance.visible_screen("game_modes")
+        elif hasattr(self, 'game_modes') and self.game_modes.visible:
+            return self.game_modes
+        return None
+
     def is_game_modes_visible(self):
         """Helper method to check if game modes is visible regardless of where it's stored"""
-        if self.game_instance and hasattr(self.game_instance, 'game_modes'):
-            return self.game_instance.game_modes.visible
-        elif hasattr(self, 'game_modes'):
-            return self.game_modes.visible
-        return False
+        return self.visible_game_modes() is not None
 
     def show(self):
         """Make the main menu visible."""
@@ -386,7 +413,6 @@ class MainMenu:
         self.update_login_button()
 
         # Hide game modes based on where it exists
-        if self.game_instance and hasattr(self.game_instance, 'game_modes'):
-            self.game_instance.game_modes.hide()
-        elif hasattr(self, 'game_modes'):
-            self.game_modes.hide()
\ No newline at end of file
+        game_modes = self.visible_game_modes()
+        if game_modes:
+            game_modes.hide()
\ No newline at end of file
@@ -1,19 +1,45 @@
-import cv2
-import numpy as np
+import threading
 import pygame
-import sys
 
 class MenuBackground:
     def __init__(self, file_path, speed=0.5):
-        self.cap = cv2.VideoCapture(file_path)
-        if not self.cap.isOpened():
-            print("Error: Could not open video file.")
-            sys.exit()
+        self.file_path = file_path
         self.speed = speed
         self.frame_counter = 0
+        self.cap = None
+        self.cv2 = None
+        self.np = None
+
+        # Shown until the video is ready, so the menu can appear before OpenCV has loaded
+        self.placeholder = pygame.Surface((16, 9))
+        self.placeholder.fill((0, 0, 0))
+
+        # Importing OpenCV/NumPy and opening the video is slow, so do it off the main thread
+        self.loader = threading.Thread(target=self.open_video, daemon=True)
+        self.loader.start()
+
+    def open_video(self):
+        """Import the video libraries and open the capture (runs on the loader thread)."""
+        import cv2
+        import numpy as np
+        cap = cv2.VideoCapture(self.file_path)
+        if not cap.isOpened():
+            print("Error: Could not open video file.")
+            return
+        self.cv2 = cv2
+        self.np = np
+        self.cap = cap
+
+    def is_ready(self):
+        return self.cap is not None
+
+    def get_frame(self, frames=1.0):
+        """Advance the video by `frames` game frames (more than 1 when the menu runs at its idle rate)."""
+        if self.cap is None:
+            return self.placeholder
 
-    def get_frame(self):
-        self.frame_counter += self.speed
+        cv2 = self.cv2
+        self.frame_counter += self.speed * frames
         self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.frame_counter)
 
         ret, frame = self.cap.read()
@@ -23,8 +49,10 @@ class MenuBackground:
             ret, frame = self.cap.read()
 
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = np.rot90(frame)
+        frame = self.np.rot90(frame)
         return pygame.surfarray.make_surface(frame)
 
     def close(self):
-        self.cap.release()
\ No newline at end of file
+        self.loader.join()
+        if self.cap is not None:
+            self.cap.release()
@@ -4,7 +4,9 @@ import time
 import random
 from ui.button import Button
 from .back_button import BackButton
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from managers.asset_manager import assets
+from managers import display
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, PVP_NETPLAY
 
 CONFIRMATION_DELAY = pygame.USEREVENT + 1
 
@@ -19,6 +21,8 @@ class PVPHeroSelection:
 
         # Player turn tracking
         self.current_player = 1  # Start with Player 1
+        # In a LAN match each machine only picks its own player's hero
+        self.local_player = None if PVP_NETPLAY is None else (1 if PVP_NETPLAY == "host" else 2)
         self.selected_heroes = {1: None, 2: None}  # Store selections for both players
 
         # Load player selection borders
@@ -131,7 +135,7 @@ class PVPHeroSelection:
         )
 
         self.selection_time = None
-        self.voiceline_sound = None
+        self.voiceline_channel = None
 
         # Status text for player turn indication
         self.font = pygame.font.Font(None, 48)
@@ -157,14 +161,10 @@ class PVPHeroSelection:
         if not self.audio_manager.audio_enabled:
             print(f"Audio is muted. Skipping {hero} voiceline.")
             return
-        if self.voiceline_sound:
-            self.voiceline_sound.stop()
-        try:
-            random_voiceline = random.choice(self.voicelines[hero])
-            self.voiceline_sound = pygame.mixer.Sound(random_voiceline)
-            self.voiceline_sound.play()
-        except Exception as e:
-            print(f"Error playing voiceline: {e}")
+        if self.voiceline_channel:
+            self.voiceline_channel.stop()
+        random_voiceline = random.choice(self.voicelines[hero])
+        self.voiceline_channel = self.audio_manager.play_sound(random_voiceline, "voice", priority=1)
 
     def pre_select_hero(self, hero, player):
         """Initial hero selection that starts confirmation."""
@@ -173,6 +173,10 @@ class PVPHeroSelection:
         # Play hero voiceline immediately
         self.play_random_voiceline(hero)
 
+        # Once both heroes are known, start loading the battle while Player 2 confirms
+        if player == 2 and self.selected_heroes[1] and self.local_player is None:
+            assets.preload("pvp_battle", self.game_instance.script_dir, p1_hero=self.selected_heroes[1], p2_hero=hero)
+
         # Set the button to "clicked" image
         buttons_dict = self.buttons_p1 if player == 1 else self.buttons_p2
         for button_name, button in buttons_dict.items():
@@ -203,7 +207,7 @@ class PVPHeroSelection:
         self.confirmation_active = False
 
         # If it was Player 1, move to Player 2
-        if self.temp_player == 1:
+        if self.temp_player == 1 and self.local_player is None:
             self.current_player = 2
             # Enable Player 2 buttons
             for button in self.buttons_p2.values():
@@ -213,18 +217,22 @@ class PVPHeroSelection:
             self.status_rect = self.status_text.get_rect(center=(SCREEN_WIDTH // 2, 150))
         else:  # Both players have selected
             # Store selections in game instance
-            self.game_instance.p1_hero = self.selected_heroes[1]
-            self.game_instance.p2_hero = self.selected_heroes[2]
-
-            print(f"PVP match setup: Player 1 ({self.selected_heroes[1]}) vs Player 2 ({self.selected_heroes[2]})")
+            if self.local_player is None:
+                self.game_instance.p1_hero = self.selected_heroes[1]
+                self.game_instance.p2_hero = self.selected_heroes[2]
+                print(f"PVP match setup: Player 1 ({self.selected_heroes[1]}) vs Player 2 ({self.selected_heroes[2]})")
+            else:
+                # The other player's hero arrives when the machines connect
+                setattr(self.game_instance, f"p{self.local_player}_hero", self.temp_selected_hero)
+                print(f"LAN match setup: Player {self.local_player} ({self.temp_selected_hero})")
 
             # Add a small delay to see the selection
             self.selection_time = time.time()
             freeze_duration = 1  # Short delay to see the final selection
             start_time = time.time()
             while time.time() - start_time < freeze_duration:
-                self.draw()
-                pygame.display.update()
+                self.game_instance.draw()
+                display.present()
 
             # Hide this screen
             self.hide()
@@ -279,10 +287,7 @@ class PVPHeroSelection:
 
     def draw(self):
         """Draw the PVP hero selection screen."""
-        frame_surface = self.background_menu.get_frame()
-        frame_surface = pygame.transform.scale(frame_surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.screen.blit(frame_surface, (0, 0))
-
+        # The menu video behind this screen is drawn by FinalQuiztasy.draw()
         if self.visible:
             # Draw the status text showing whose turn it is
             self.screen.blit(self.status_text, self.status_rect)
@@ -307,25 +312,25 @@ class PVPHeroSelection:
                 # Draw back button only when confirmation is not showing
                 self.back_button.draw()
 
-        pygame.display.update()
-
     def show(self):
         """Show the PVP hero selection screen."""
         self.visible = True
-        self.current_player = 1  # Reset to Player 1
+        self.current_player = self.local_player or 1  # Reset to Player 1
         self.selected_heroes = {1: None, 2: None}  # Clear previous selections
         self.confirmation_active = False
         self.selection_time = None
+        self.status_text = self.font.render(f"Player {self.current_player}'s Turn", True, (255, 255, 255))
+        self.status_rect = self.status_text.get_rect(center=(SCREEN_WIDTH // 2, 150))
 
-        # Enable Player 1 buttons, disable Player 2
+        # Enable the current player's buttons, disable the other's
         for button in self.buttons_p1.values():
             button.visible = True
-            button.active = True
+            button.active = self.current_player == 1
             button.image = button.idle_img
 
         for button in self.buttons_p2.values():
             button.visible = True
-            button.active = False
+            button.active = self.current_player == 2
             button.image = button.idle_img
 
         print("PVP Hero selection screen opened.")
@@ -334,9 +339,9 @@ class PVPHeroSelection:
         """Hide the hero selection screen."""
         self.visible = False
         self.confirmation_active = False
-        if self.voiceline_sound:
-            self.voiceline_sound.stop()
-            self.voiceline_sound = None
+        if self.voiceline_channel:
+            self.voiceline_channel.stop()
+            self.voiceline_channel = None
         print("PVP Hero selection screen closed.")
 
     def go_back(self):